@@ -4,6 +4,7 @@ from scrub import __version__
 from scrub import scrubme
 from scrub.utils import diff_results
 from scrub.utils import scrub_utilities
+from scrub.tools.parsers import translate_results
 
 
 help_message = ('User Documentation: https://nasa.github.io/scrub\n' +
@@ -13,7 +14,9 @@ help_message = ('User Documentation: https://nasa.github.io/scrub\n' +
                 'diff\n' +
                 diff_results.diff.__doc__ + '\n\n'
                 'get-conf\n' +
-                scrub_utilities.create_conf_file.__doc__ + '\n')
+                scrub_utilities.create_conf_file.__doc__ + '\n\n'
+                'translate-batch\n' +
+                translate_results.translate_batch.__doc__ + '\n')
 
 
 def main():
@@ -39,6 +42,10 @@ def main():
             # Run analysis
             scrubme.parse_arguments()
 
+        elif 'translate-batch' in sys.argv:
+            # Translate the results files
+            return translate_results.parse_batch_arguments()
+
         elif 'diff' in sys.argv:
             # Run analysis
             diff_results.parse_arguments()
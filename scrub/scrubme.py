@@ -11,6 +11,8 @@ from scrub import __version__
 from scrub.utils.filtering import do_filtering
 from scrub.utils import do_clean
 from scrub.utils import scrub_utilities
+from scrub.utils import path_cache
+from scrub.utils import line_cache
 from scrub.tools.parsers import translate_results
 
 
@@ -28,6 +30,7 @@ def parse_arguments():
     parser.add_argument('--tools', nargs='+', default=[])
     parser.add_argument('--targets', nargs='+', default=None)
     parser.add_argument('-d', '--define', action="append")
+    parser.add_argument('--filter-profile', action='store_true')
 
     # Parse the arguments
     args = vars(parser.parse_args(sys.argv[2:]))
@@ -42,11 +45,11 @@ def parse_arguments():
 
     # Run analysis
     main(pathlib.Path(args['config']).resolve(), args['clean'], logging_level, args['tools'], args['targets'],
-         args['define'])
+         args['define'], args['filter_profile'])
 
 
 def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_logging=logging.INFO, tools=None,
-         targets=None, override_values=None):
+         targets=None, override_values=None, filter_profile=False):
     """
     This function runs all applicable tools present within the configuration file.
 
@@ -63,6 +66,8 @@ def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_l
             Default value: None
         - define: List of override values for SCRUB analysis [list of strings] [optional]
             Default value: None
+        - filter_profile: Should SCRUB record the cost and effect of every filtering stage and rule? [bool] [optional]
+            Default value: False
     """
 
     # Read in the configuration data
@@ -76,6 +81,11 @@ def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_l
     execution_status = []
     scrub_path = pathlib.Path(__file__).resolve().parent
 
+    # Discard the paths, source files, and results of any previous run in this process
+    path_cache.clear()
+    line_cache.source_line_cache.clear()
+    translate_results.clear_results_cache()
+
     # Clean the previous SCRUB data from the current directory
     if clean:
         do_clean.clean_directory(scrub_conf_data.get('source_dir'))
@@ -83,6 +93,10 @@ def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_l
     # Initialize the SCRUB storage directory
     scrub_utilities.initialize_storage_dir(scrub_conf_data)
 
+    # Remove the filtering profile from any previous run
+    if filter_profile and scrub_conf_data.get('filter_profile_file').exists():
+        scrub_conf_data.get('filter_profile_file').unlink()
+
     # Make sure the working directory exists
     if not scrub_conf_data.get('scrub_working_dir').exists():
         print('ERROR: Working directory ' + str(scrub_conf_data.get('scrub_working_dir')) + ' does not exist.')
@@ -177,13 +191,13 @@ def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_l
                 if scrub_conf_data.get(tool_name + '_import'):
                     scrub_utilities.create_dir(sarif_import_dir, True, True)
 
-                    # Iterate through the existing SARIF files, process them, and drop them into the expected directory
-                    for sarif_file in list(scrub_conf_data.get('sarif_results_dir').glob('*.sarif')):
-                        if sarif_file.stem != tool_name:
-                            translate_results.format_sarif_for_upload(sarif_file,
-                                                                      sarif_import_dir.joinpath(sarif_file.name),
-                                                                      scrub_conf_data.get('source_dir'),
-                                                                      tool_name)
+                    # Process the existing SARIF files in parallel and drop them into the expected directory
+                    import_files = [(sarif_file,
+                                     sarif_import_dir.joinpath(translate_results.get_sarif_stem(sarif_file) + '.sarif'))
+                                    for sarif_file in scrub_conf_data.get('sarif_results_dir').glob('*.sarif*')
+                                    if translate_results.get_sarif_stem(sarif_file) != tool_name]
+                    translate_results.prepare_sarif_imports(import_files, scrub_conf_data.get('source_dir'), tool_name,
+                                                            scrub_conf_data.get('sarif_import_cache_dir'))
 
                 # Create the log file
                 analysis_log_file = scrub_conf_data.get('scrub_log_dir').joinpath(tool_name + '.log')
@@ -267,7 +281,8 @@ def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_l
                     # Perform filtering and track execution time, if necessary
                     if perform_filtering:
                         start_time = time.time()
-                        filtering_status = do_filtering.run_analysis(scrub_conf_data, console_logging)
+                        filtering_status = do_filtering.run_analysis(scrub_conf_data, console_logging,
+                                                                     filter_profile_enabled=filter_profile)
                         execution_time = time.time() - start_time
 
                         # Update the execution status
@@ -299,7 +314,8 @@ def main(conf_file=pathlib.Path('./scrub.cfg').resolve(), clean=False, console_l
         scrub_utilities.create_dir(viewable_results_dir, False)
 
         # Create symbolic links for the output files
-        file_extensions = ['*.scrub', 'sarif_results/*.sarif', '*_metrics.csv']
+        file_extensions = ['*.scrub', 'sarif_results/*.sarif', 'sarif_results/*.sarif.gz', 'scrub_all.sarif*',
+                           '*_metrics.csv']
         for extension in file_extensions:
             for scrub_file in scrub_conf_data.get('scrub_analysis_dir').glob(extension):
                 symlink_path = viewable_results_dir.joinpath(scrub_file.name)
@@ -7,6 +7,7 @@ import shutil
 import subprocess
 import pathlib
 from scrub.utils import scrub_utilities
+from scrub.utils import results_database
 from scrub.utils.filtering import create_file_list
 from scrub.tools.parsers import translate_results
 from scrub.tools.parsers import parse_metrics
@@ -378,17 +379,34 @@ def perform_upload(tool_conf_data):
                 tool_name = filename.stem
                 tool_defect_types.append(tool_name)
 
-    # Get the defects and metrics if they exist
-    for tool_name in tool_defect_types:
-        scrub_file = tool_conf_data.get('scrub_analysis_dir').joinpath(tool_name + '.scrub')
+    # Get the defects and metrics from the results database, if it is up to date
+    if results_database.is_current(tool_conf_data.get('results_database_file'),
+                                   tool_conf_data.get('scrub_analysis_dir')):
+        # Only retrieve the defects for the files that are part of the review
+        defect_list = results_database.query_findings(tool_conf_data.get('results_database_file'),
+                                                      tool_conf_data.get('source_dir'), sources=tool_defect_types,
+                                                      files=file_list)
+
+        # Add the metrics, if they exist
+        for tool_name in tool_defect_types:
+            tool_metrics = results_database.query_metrics(tool_conf_data.get('results_database_file'),
+                                                          tool_conf_data.get('source_dir'), tool_name)
+            if tool_metrics:
+                metrics_list.update({tool_name: tool_metrics})
+
+    # Otherwise, parse the SCRUB output files directly
+    else:
+        for tool_name in tool_defect_types:
+            scrub_file = tool_conf_data.get('scrub_analysis_dir').joinpath(tool_name + '.scrub')
 
-        # Add the defects to the review
-        defect_list = defect_list + translate_results.parse_scrub(scrub_file, tool_conf_data.get('source_dir'))
+            # Add the defects to the review
+            defect_list = defect_list + translate_results.parse_scrub(scrub_file, tool_conf_data.get('source_dir'))
 
-        # Add the metrics files, if they exist
-        metrics_file = tool_conf_data.get('scrub_analysis_dir').joinpath(tool_name + '_metrics.csv')
-        if metrics_file.exists():
-            metrics_list.update({tool_name: parse_metrics.parse_csv(metrics_file, tool_conf_data.get('source_dir'))})
+            # Add the metrics files, if they exist
+            metrics_file = tool_conf_data.get('scrub_analysis_dir').joinpath(tool_name + '_metrics.csv')
+            if metrics_file.exists():
+                metrics_list.update({tool_name: parse_metrics.parse_csv(metrics_file,
+                                                                        tool_conf_data.get('source_dir'))})
 
     # Create XML data for uploading files
     file_xml_data = create_batch_xml_file_upload(file_list, tool_conf_data.get('collaborator_review_id'),
@@ -2,15 +2,17 @@ import pathlib
 import logging
 import traceback
 from scrub.utils import scrub_utilities
+from scrub.utils import results_database
 from scrub.tools.parsers import translate_results
 
 
-def distribute_warnings(warning_file, source_dir):
+def distribute_warnings(warning_file, source_dir, results_database_file=None):
     """This function moves warnings to be co-located with the source file of interest.
 
     Inputs:
         - warning_file: Full path to the file containing SCRUB-formatted warnings [string]
         - source_dir: Full path to the top-level directory of the source code [string]
+        - results_database_file: Full path to an up to date results database [string] [optional]
 
     Outputs:
         - A series of .scrub directories and output files will be created as necessary
@@ -29,8 +31,11 @@ def distribute_warnings(warning_file, source_dir):
     # Update the source root to make it absolute
     source_dir = source_dir.resolve()
 
-    # Parse all the findings from the warning file
-    warnings = translate_results.parse_scrub(warning_file, source_dir)
+    # Get all the findings from the results database or the warning file
+    if results_database_file:
+        warnings = results_database.query_findings(results_database_file, source_dir, sources=[warning_type])
+    else:
+        warnings = translate_results.parse_scrub(warning_file, source_dir)
 
     # Iterate through everything warning
     for warning in warnings:
@@ -106,9 +111,17 @@ def run_analysis(baseline_conf_data, console_logging=logging.INFO, override=Fals
             # Get a list of the filtered SCRUB output files
             filtered_output_files = tool_conf_data.get('scrub_analysis_dir').glob('*.scrub')
 
+            # Use the results database if it is up to date
+            if results_database.is_current(tool_conf_data.get('results_database_file'),
+                                           tool_conf_data.get('scrub_analysis_dir')):
+                results_database_file = tool_conf_data.get('results_database_file')
+            else:
+                results_database_file = None
+
             # Move the warnings to the appropriate directories
             for filtered_output_file in filtered_output_files:
-                distributed_files = distribute_warnings(filtered_output_file, tool_conf_data.get('source_dir'))
+                distributed_files = distribute_warnings(filtered_output_file, tool_conf_data.get('source_dir'),
+                                                        results_database_file)
 
                 # Check each of the generated files for formatting
                 for distributed_file in distributed_files:
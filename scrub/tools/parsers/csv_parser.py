@@ -4,6 +4,24 @@ import datetime
 import shutil
 import pathlib
 from scrub.tools.parsers import translate_results
+from scrub.utils import results_database
+
+
+def get_results(input_file, source_dir, database_file):
+    """This function gets the findings of a SCRUB output file, from the results database if it is up to date.
+
+    Inputs:
+        - input_file: Absolute path to the SCRUB output file [Path object]
+        - source_dir: Absolute path to the source root directory [Path object]
+        - database_file: Absolute path to an up to date results database, or None to read the file [Path object]
+
+    Outputs:
+        - scrub_results: Findings of the SCRUB output file [iterable of dicts]
+    """
+
+    if database_file is not None:
+        return results_database.query_findings(database_file, source_dir, sources=[input_file.stem])
+    return translate_results.iterate_results(input_file, source_dir)
 
 
 def parse_warnings(input_dir, output_format='legacy'):
@@ -11,6 +29,11 @@ def parse_warnings(input_dir, output_format='legacy'):
     source_dir = pathlib.Path(input_dir).parent
     output_dir = input_dir.joinpath('csv_output')
     timestamp = datetime.datetime.now(datetime.UTC)
+    database_file = input_dir.joinpath('results.db')
+
+    # Use the results database if it is up to date
+    if not results_database.is_current(database_file, input_dir):
+        database_file = None
 
     # Make the output directory if it doesn't already exist
     if output_dir.exists():
@@ -33,7 +56,7 @@ def parse_warnings(input_dir, output_format='legacy'):
             for input_file in input_files:
 
                 # Parse the SCRUB files
-                scrub_results = translate_results.parse_scrub(input_file, source_dir)
+                scrub_results = get_results(input_file, source_dir, database_file)
 
                 # Iterate through every result
                 for result in scrub_results:
@@ -49,7 +72,7 @@ def parse_warnings(input_dir, output_format='legacy'):
             for input_file in input_files:
 
                 # Parse the SCRUB files
-                scrub_results = translate_results.parse_scrub(input_file, source_dir)
+                scrub_results = get_results(input_file, source_dir, database_file)
 
                 # Iterate through every result
                 for result in scrub_results:
@@ -0,0 +1,168 @@
+import hashlib
+import collections
+from scrub.utils import line_cache
+from scrub.utils import path_cache
+
+FINGERPRINT_KEY = 'scrubContextHash/v1'
+CONTEXT_LINES = 2
+HASH_SIZE = 8
+LINE_HASH_BYTE_BUDGET = 16 * 1024 * 1024
+
+# Hash of every line of the most recently fingerprinted source files, keyed by absolute file path and evicted in least
+# recently used order once the total size of the hashes exceeds LINE_HASH_BYTE_BUDGET
+line_hash_cache = collections.OrderedDict()
+cached_bytes = 0
+
+
+def hash_value(value):
+    """This function computes a short, stable hash of a value.
+
+    Inputs:
+        - value: Value to be hashed [bytes]
+
+    Outputs:
+        - digest: Hash of the value [bytes]
+    """
+
+    return hashlib.blake2b(value, digest_size=HASH_SIZE).digest()
+
+
+def get_line_hashes(source_file):
+    """This function gets the hash of every line of a source file, reading and hashing the file only once.
+
+    Whitespace is removed from every line before it is hashed, so changes to indentation and line endings do not change
+    the hashes.
+
+    Inputs:
+        - source_file: Absolute path to the source file of interest [Path object]
+
+    Outputs:
+        - line_hashes: Concatenated HASH_SIZE byte hash of every line in the file, or None if the file could not be
+                       read [bytes]
+    """
+
+    global cached_bytes
+
+    # Check the cache
+    cache_key = str(source_file)
+    if cache_key in line_hash_cache:
+        line_hash_cache.move_to_end(cache_key)
+        return line_hash_cache[cache_key]
+
+    # Hash every line of the file
+    try:
+        data, line_offsets = line_cache.source_line_cache.get_file(source_file)
+        line_hashes = b''.join(hash_value(b''.join(data[line_offsets[i]:line_offsets[i + 1]].split()))
+                               for i in range(len(line_offsets) - 1))
+    except OSError:
+        line_hashes = None
+    entry_size = len(line_hashes) if line_hashes is not None else 0
+
+    # Evict the least recently used files until there is room
+    while line_hash_cache and cached_bytes + entry_size > LINE_HASH_BYTE_BUDGET:
+        evicted_hashes = line_hash_cache.popitem(last=False)[1]
+        cached_bytes = cached_bytes - (len(evicted_hashes) if evicted_hashes is not None else 0)
+
+    # Add the file to the cache
+    line_hash_cache[cache_key] = line_hashes
+    cached_bytes = cached_bytes + entry_size
+
+    return line_hashes
+
+
+def get_context_hash(source_file, line_number):
+    """This function computes a hash of the source lines surrounding a line of interest.
+
+    Inputs:
+        - source_file: Absolute path to the source file of interest [Path object]
+        - line_number: Line of interest, starting from 1 [int]
+
+    Outputs:
+        - context_hash: Hash of the surrounding lines, a marker containing the line number if the line is past the end
+                        of the file, or None if the file could not be read [bytes]
+    """
+
+    # Get the line hashes
+    line_hashes = get_line_hashes(source_file)
+    if line_hashes is None:
+        return None
+
+    # Lines past the end of the file have no context, so they are distinguished by their line number
+    line_count = len(line_hashes) // HASH_SIZE
+    if line_number > line_count:
+        return 'out of range:{}'.format(line_number).encode()
+
+    # Combine the hashes of the surrounding lines
+    first_line = max(line_number - CONTEXT_LINES, 1)
+    last_line = min(line_number + CONTEXT_LINES, line_count)
+
+    return hash_value(line_hashes[(first_line - 1) * HASH_SIZE:last_line * HASH_SIZE])
+
+
+def create_fingerprint(warning, source_root):
+    """This function computes a fingerprint for a warning that is stable across runs.
+
+    The fingerprint is computed from the rule, the path relative to the source root, and the contents of the
+    surrounding source lines, so it does not change when unrelated lines are added or removed elsewhere in the file. If
+    the source file can not be read, the line number is used instead of the surrounding lines.
+
+    Inputs:
+        - warning: Warning of interest [dict]
+        - source_root: Absolute path of source root directory [Path object]
+
+    Outputs:
+        - fingerprint: Hexadecimal fingerprint of the warning [string]
+    """
+
+    # Normalize the path
+    source_root = path_cache.resolve_path(source_root)
+    source_file = path_cache.resolve_path(warning['file'], source_root)
+    normalized_path = path_cache.get_relative_path(source_file, source_root).as_posix()
+
+    # Get the contents of the surrounding lines
+    context_hash = get_context_hash(source_file, int(warning['line']))
+    if context_hash is None:
+        context_hash = str(warning['line']).encode()
+
+    return hashlib.sha256(b'\0'.join([warning['query'].encode('utf-8', errors='replace'),
+                                      normalized_path.encode('utf-8', errors='replace'),
+                                      context_hash])).hexdigest()
+
+
+def create_partial_fingerprints(warning, source_root, fingerprint_counts=None):
+    """This function creates the SARIF partialFingerprints object for a warning.
+
+    Warnings with identical fingerprints are distinguished by the order in which they occur, in the same way as other
+    SARIF producers.
+
+    Inputs:
+        - warning: Warning of interest [dict]
+        - source_root: Absolute path of source root directory [Path object]
+        - fingerprint_counts: Number of times each fingerprint has been seen in the current run [dict] [optional]
+
+    Outputs:
+        - partial_fingerprints: SARIF partialFingerprints object [dict]
+    """
+
+    # Create the fingerprint
+    fingerprint = create_fingerprint(warning, source_root)
+
+    # Count the occurrences of the fingerprint
+    occurrence = 1
+    if fingerprint_counts is not None:
+        occurrence = fingerprint_counts.get(fingerprint, 0) + 1
+        fingerprint_counts[fingerprint] = occurrence
+
+    return {FINGERPRINT_KEY: '{}:{}'.format(fingerprint, occurrence)}
+
+
+def clear():
+    """This function removes every file from the cache, along with the source lines the hashes were computed from. It
+    should be called at the start of every run, so that source files that have changed since the previous run are read
+    and hashed again.
+    """
+
+    global cached_bytes
+    line_hash_cache.clear()
+    cached_bytes = 0
+    line_cache.source_line_cache.clear()
@@ -1,9 +1,10 @@
 import re
-import json
 import gzip
+import logging
 import pathlib
 import xml.etree.ElementTree
 from scrub.tools.parsers import translate_results
+from scrub.utils import json_codec
 
 ID_PREFIX = 'coverity'
 warning_count = 1
@@ -71,46 +72,43 @@ def parse_cc(raw_input_file, threshold):
 def parse_json(raw_input_file):
     """This function parses the Coverity internal JSON results format into SCRUB formatted results.
 
+    The issues are decoded from the file one at a time and yielded as soon as they are converted, so neither the
+    complete JSON document nor the complete list of issues is ever held in memory.
+
     Inputs:
         - raw_input_file: Absolute path to the file containing raw Coverity warnings [string]
 
     Outputs:
-        - coverity_issues: List of SCRUB formatted Coverity issues [list of SCRUB]
+        - coverity_issue: SCRUB formatted Coverity issues, yielded one at a time [generator of SCRUB]
     """
 
     # Initialize variables
     global warning_count
-    coverity_issues = []
-
-    # Read in the input file
-    with open(raw_input_file, 'r') as input_fh:
-        input_data = json.load(input_fh)
 
-    # Iterate through every issue
-    for issue in input_data['issues']:
+    # Iterate through every issue in the input file
+    for issue in json_codec.load_array(raw_input_file, 'issues'):
         # Parse issue data
+        checker_properties = issue.get('checkerProperties') or {}
         warning_id = '%s%03d' % (ID_PREFIX, warning_count)
         warning_file = pathlib.Path(issue['mainEventFilePathname'])
         warning_line = int(issue['mainEventLineNumber'])
         warning_checker = issue['checkerName']
-        warning_description = issue['checkerProperties']['subcategoryLongDescription'].encode("unicode_escape").decode("utf-8")
+        warning_description = (checker_properties.get('subcategoryLongDescription') or
+                               issue.get('checkerName')).encode("unicode_escape").decode("utf-8")
         warning_code_flow = []
 
-        if issue['checkerProperties']['impact'].lower() == 'high':
+        impact = str(checker_properties.get('impact', '')).lower()
+        if impact == 'high':
             ranking = 'High'
-        elif issue['checkerProperties']['impact'].lower() == 'medium':
+        elif impact == 'medium':
             ranking = 'Med'
-        elif issue['checkerProperties']['impact'].lower() == 'low':
-            ranking = 'Low'
-        elif issue['checkerProperties']['impact'].lower() == 'audit':
-            ranking = 'Low'
         else:
             ranking = 'Low'
 
         # Get the warning description
-        for event in issue['events']:
+        for event in issue.get('events', []):
             if event['eventTag'] != 'caretline':
-                event_file =event['strippedFilePathname']
+                event_file = pathlib.Path(event['strippedFilePathname'])
                 event_line = event['lineNumber']
                 event_description = '{}: {}'.format(event['eventTag'],
                                                     event['eventDescription']).encode("unicode_escape").decode("utf-8")
@@ -118,44 +116,56 @@ def parse_json(raw_input_file):
                 # Add to the code flow
                 warning_code_flow.append(translate_results.create_code_flow(event_file, event_line, event_description))
 
-        coverity_issues.append(translate_results.create_warning(warning_id, warning_file, warning_line,
-                                                                warning_description, 'coverity', ranking,
-                                                                warning_checker, code_flow=warning_code_flow))
-
         # Increment the warning count
         warning_count = warning_count + 1
 
-    return coverity_issues
+        yield translate_results.create_warning(warning_id, warning_file, warning_line, warning_description,
+                                               'coverity', ranking, warning_checker, code_flow=warning_code_flow)
 
 
-# def parse_warnings(coverity_results_file, coverity_metrics_file, cc_threshold, parsed_output_file):
-def parse_warnings(analysis_dir, tool_config_data):
-    """This function handles the parsing of Coverity data to generate a SCRUB formatted output file.
+def iterate_findings(analysis_dir, tool_config_data):
+    """This function gets every Coverity finding, one at a time, so they can be written out as they are parsed.
 
     Inputs:
-        - coverity_results_file:
-        - coverity_metrics_file:
-        - cc_threshold:
-        - parsed_output_file:
+        - analysis_dir: Absolute path to the Coverity analysis directory [Path object]
+        - tool_config_data: Dictionary of Coverity configuration variables [dict]
+
+    Outputs:
+        - coverity_finding: SCRUB formatted Coverity findings, yielded one at a time [generator of SCRUB]
     """
 
     # Initialize variables
     cc_threshold = int(tool_config_data.get('coverity_cc_threshold'))
     coverity_metrics_file = analysis_dir.joinpath('output/FUNCTION.metrics.xml.gz')
-    parsed_output_file = tool_config_data.get('raw_results_dir').joinpath('coverity_raw.scrub')
 
     # Select the correct parser
     if tool_config_data.get('coverity_json'):
         # Parse the JSON Coverity results
-        coverity_findings = parse_json(analysis_dir.joinpath('coverity.json'))
+        yield from parse_json(analysis_dir.joinpath('coverity.json'))
     else:
         # Parse the SARIF Coverity results
-        coverity_findings = translate_results.parse_sarif(analysis_dir.joinpath('coverity.sarif'),
-                                                          tool_config_data.get('source_dir'))
+        logging.warning('\tCOVERITY_JSON: False is deprecated and will be removed in a future release.')
+        yield from translate_results.parse_sarif(analysis_dir.joinpath('coverity.sarif'),
+                                                 tool_config_data.get('source_dir'))
 
     # Parse the metrics file, if necessary
     if cc_threshold >= 0:
-        coverity_findings = coverity_findings + parse_cc(coverity_metrics_file, cc_threshold)
+        yield from parse_cc(coverity_metrics_file, cc_threshold)
+
+
+# def parse_warnings(coverity_results_file, coverity_metrics_file, cc_threshold, parsed_output_file):
+def parse_warnings(analysis_dir, tool_config_data):
+    """This function handles the parsing of Coverity data to generate a SCRUB formatted output file.
+
+    Inputs:
+        - coverity_results_file:
+        - coverity_metrics_file:
+        - cc_threshold:
+        - parsed_output_file:
+    """
+
+    # Initialize variables
+    parsed_output_file = tool_config_data.get('raw_results_dir').joinpath('coverity_raw.scrub')
 
-    # Create the output file
-    translate_results.create_scrub_output_file(coverity_findings, parsed_output_file)
+    # Create the output file, writing each finding as it is parsed
+    translate_results.create_scrub_output_file(iterate_findings(analysis_dir, tool_config_data), parsed_output_file)
@@ -1,8 +1,8 @@
 import re
-import os
 import pathlib
 import logging
 from scrub.tools.parsers import translate_results
+from scrub.utils import path_cache
 
 WARNING_LEVEL = 'Low'
 ID_PREFIX = 'gbuild'
@@ -93,7 +93,8 @@ def parse_doublecheck_warnings(raw_input_file, parsed_output_file):
             # Find the file and line number
             for warning_line_itr in raw_warning:
                 if "\", line" in warning_line_itr:
-                    warning_file = os.path.abspath(list(filter(None, re.split('"', warning_line_itr.strip())))[0])
+                    warning_file = path_cache.resolve_path(list(filter(None,
+                                                                       re.split('"', warning_line_itr.strip())))[0])
                     warning_line = int(list(filter(None, re.split(':', re.split('line ',
                                                                                 warning_line_itr.strip())[-1])))[0])
                     break
@@ -129,7 +130,8 @@ def parse_doublecheck_warnings(raw_input_file, parsed_output_file):
             # Find the file and line number
             for warning_line_itr in raw_warning:
                 if "\", line" in warning_line_itr:
-                    warning_file = os.path.abspath(list(filter(None, re.split('"', warning_line_itr.strip())))[0])
+                    warning_file = path_cache.resolve_path(list(filter(None,
+                                                                       re.split('"', warning_line_itr.strip())))[0])
                     warning_line = int(list(filter(None, re.split(':', re.split('line ',
                                                                                 warning_line_itr.strip())[-1])))[0])
                     break
@@ -1,6 +1,7 @@
 import pathlib
 import logging
 from scrub.tools.parsers import translate_results
+from scrub.utils import path_cache
 
 WARNING_LEVEL = 'Low'
 ID_PREFIX = 'gcc'
@@ -54,7 +55,7 @@ def parse_warnings(analysis_dir, tool_config_data, raw_input_file=None, parsed_o
             description = True
 
             # Split the line and store the data
-            warning_file = pathlib.Path(line.split(':')[0].strip()).resolve()
+            warning_file = path_cache.resolve_path(line.split(':')[0].strip())
             warning_line = int(line.split(':')[1].strip())
             warning_message = ['GCC Compiler Warning:', '\t' + line.rstrip()]
             warning_id = ID_PREFIX + str(warning_count).zfill(3)
@@ -2,6 +2,7 @@ import re
 import pathlib
 import logging
 from scrub.tools.parsers import translate_results
+from scrub.utils import path_cache
 
 WARNING_LEVEL = 'Low'
 ID_PREFIX = 'javac'
@@ -46,7 +47,7 @@ def parse_warnings(analysis_dir, tool_config_data, raw_input_file=None, parsed_o
         if (' warning: ' in line) or (' error: ' in line):
             # Split the line and store the file name and line
             line_split = list(filter(None, re.split('[ :]', line.strip())))
-            warning_file = pathlib.Path(line_split[0]).resolve()
+            warning_file = path_cache.resolve_path(line_split[0])
             warning_line = line_split[1]
 
             # Split the line and store the message and type of warning
@@ -1,6 +1,6 @@
-import json
-import pathlib
 from scrub.tools.parsers import translate_results
+from scrub.utils import path_cache
+from scrub.utils import json_codec
 
 WARNING_LEVEL = 'Low'
 ID_PREFIX = 'pylint'
@@ -26,14 +26,14 @@ def parse_warnings(analysis_dir, tool_config_data, raw_input_file=None, parsed_o
         parsed_output_file = tool_config_data.get('raw_results_dir').joinpath('pylint_compiler_raw.scrub')
 
     # Read in the input data
-    with open(raw_input_file, 'r') as input_fh:
-        input_data = json.loads(input_fh.read())
+    with open(raw_input_file, 'rb') as input_fh:
+        input_data = json_codec.load(input_fh)
 
     # Iterate through every finding in the input file
     raw_warnings = []
     for finding in input_data:
         # Parse the finding
-        warning_file = pathlib.Path(finding['path']).resolve()
+        warning_file = path_cache.resolve_path(finding['path'])
         warning_line = int(finding['line'])
         warning_description = finding['message'].splitlines()
         warning_message = ['[Type: ' + finding['message-id'] + ']' + ' [' + finding['type'] + ']'] + warning_description
@@ -1,6 +1,7 @@
-import json
 from scrub.tools.parsers import translate_results
 from scrub.tools.parsers import parse_metrics
+from scrub.utils import path_cache
+from scrub.utils import json_codec
 
 ID_PREFIX = 'sonarqube'
 
@@ -31,8 +32,8 @@ def parse_warnings(analysis_dir, tool_config_data, parsed_output_file=None):
     # Iterate through every issue results file
     for raw_findings_file in findings_results_files:
         # Read in the input data
-        with open(raw_findings_file, 'r') as input_fh:
-            input_data = json.loads(input_fh.read())
+        with open(raw_findings_file, 'rb') as input_fh:
+            input_data = json_codec.load(input_fh)
 
         # Iterate through every finding in the input file
         if 'issues' in input_data.keys():
@@ -50,7 +51,7 @@ def parse_warnings(analysis_dir, tool_config_data, parsed_output_file=None):
                 suppression = False
 
             # Parse the finding
-            warning_file = source_root.joinpath(finding['component'].split(':')[-1]).resolve()
+            warning_file = path_cache.resolve_path(finding['component'].split(':')[-1], source_root)
             warning_message = finding['message'].splitlines()
             warning_id = ID_PREFIX + str(warning_count).zfill(3)
 
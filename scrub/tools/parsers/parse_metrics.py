@@ -1,10 +1,10 @@
 import logging
 import sys
-import json
 import pathlib
 import traceback
 import csv
 import xml.etree.ElementTree
+from scrub.utils import json_codec
 
 
 def parse_csv(input_file, source_root):
@@ -119,12 +119,12 @@ def parse_codesonar_metrics(raw_analysis_metrics_file, raw_file_metrics_file, pa
     # Parse the metrics files if they exist
     if raw_analysis_metrics_file.exists() and raw_file_metrics_file.exists():
         # Read in the analysis-level metrics file
-        with open(raw_analysis_metrics_file, 'r') as input_fh:
-            analysis_metrics_data = json.load(input_fh)
+        with open(raw_analysis_metrics_file, 'rb') as input_fh:
+            analysis_metrics_data = json_codec.load(input_fh)
 
         # Read in the file-level metrics file
-        with open(raw_file_metrics_file, 'r') as input_fh:
-            file_metrics_data = json.load(input_fh)
+        with open(raw_file_metrics_file, 'rb') as input_fh:
+            file_metrics_data = json_codec.load(input_fh)
 
         # Update the data structure
         for metric in analysis_metrics_data.get('metrics'):
@@ -210,8 +210,8 @@ def parse_sonarqube_metrics(metrics_directory, parsed_output_file):
 
     # Read in the metrics data, if it exists
     if project_metrics_file.exists() and metrics_files:
-        with open(project_metrics_file, 'r') as input_fh:
-            project_metrics_data = json.load(input_fh)
+        with open(project_metrics_file, 'rb') as input_fh:
+            project_metrics_data = json_codec.load(input_fh)
 
         # Parse the project level metrics
         cleaned_metrics_data = {'project_metrics': {}}
@@ -228,8 +228,8 @@ def parse_sonarqube_metrics(metrics_directory, parsed_output_file):
         file_list = []
         if len(metrics_files) > 0:
             for metrics_file in metrics_files:
-                with open(metrics_file, 'r') as input_fh:
-                    file_metrics_data = json.load(input_fh)
+                with open(metrics_file, 'rb') as input_fh:
+                    file_metrics_data = json_codec.load(input_fh)
 
                 # Parse every component
                 for source_file in file_metrics_data.get('components'):
@@ -0,0 +1,283 @@
+import re
+import struct
+
+BINARY_SUFFIX = '.scrubbin'
+FILE_SIGNATURE = b'SCRUBBIN'
+FORMAT_VERSION = 3
+
+COUNT_STRUCT = struct.Struct('<I')
+HEADER_STRUCT = struct.Struct('<8sIqQ')
+WARNING_STRUCT = struct.Struct('<5IqI')
+CODE_FLOW_STRUCT = struct.Struct('<IqI')
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+def get_binary_file(scrub_file):
+    """This function gets the location of the binary intermediate file that accompanies a SCRUB output file.
+
+    Inputs:
+        - scrub_file: Absolute path to the SCRUB formatted file [Path object]
+
+    Outputs:
+        - binary_file: Absolute path to the binary intermediate file [Path object]
+    """
+
+    return scrub_file.with_suffix(BINARY_SUFFIX)
+
+
+def get_source_signature(scrub_file):
+    """This function gets the values used to determine if a SCRUB file has changed since a binary file was created.
+
+    Inputs:
+        - scrub_file: Absolute path to the SCRUB formatted file [Path object]
+
+    Outputs:
+        - source_signature: Modification time and size of the file, or None if it does not exist [tuple]
+    """
+
+    try:
+        file_stat = scrub_file.stat()
+    except OSError:
+        return None
+
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def read_source_signature(binary_file):
+    """This function reads the signature of the SCRUB file that a binary intermediate file was created from.
+
+    Inputs:
+        - binary_file: Absolute path to the binary intermediate file [Path object]
+
+    Outputs:
+        - source_signature: Modification time and size of the SCRUB file, or None if the binary file can not be
+                            read or has an unsupported format [tuple]
+    """
+
+    try:
+        with open(binary_file, 'rb') as input_fh:
+            signature, version, source_mtime, source_size = HEADER_STRUCT.unpack(input_fh.read(HEADER_STRUCT.size))
+    except (OSError, struct.error):
+        return None
+
+    if signature != FILE_SIGNATURE or version != FORMAT_VERSION:
+        return None
+    return source_mtime, source_size
+
+
+def is_current(scrub_file, binary_file):
+    """This function checks to see if a binary intermediate file reflects the current contents of a SCRUB file.
+
+    The modification time and size of the SCRUB file are stored in the header of the binary file, and must match
+    exactly. This detects edits that land within the timestamp resolution of the file system, as long as they change
+    the size of the file.
+
+    Inputs:
+        - scrub_file: Absolute path to the SCRUB formatted file [Path object]
+        - binary_file: Absolute path to the binary intermediate file [Path object]
+
+    Outputs:
+        - current: Was the binary file created from the current version of the SCRUB file? [bool]
+    """
+
+    source_signature = get_source_signature(scrub_file)
+
+    return source_signature is not None and read_source_signature(binary_file) == source_signature
+
+
+def normalize_line_number(line):
+    """This function converts a line number into an integer.
+
+    Inputs:
+        - line: Line number to be converted [int or string]
+
+    Outputs:
+        - line_number: Line number, or 0 if it could not be converted [int]
+    """
+
+    try:
+        return int(str(line).strip())
+    except ValueError:
+        return 0
+
+
+def normalize_text(text):
+    """This function normalizes a description value the same way a write and read of the SCRUB text format would.
+
+    Inputs:
+        - text: Description value to be normalized [string]
+
+    Outputs:
+        - text_lines: List of normalized description lines [list of strings]
+    """
+
+    return [line.rstrip().lstrip(' ') for line in str(text).split('\n')]
+
+
+def create_record(warning):
+    """This function converts a warning into the normalized record that is stored in the binary format.
+
+    Inputs:
+        - warning: Warning to be converted [dict]
+
+    Outputs:
+        - record: Normalized warning record [tuple]
+    """
+
+    # Normalize the description
+    description = []
+    for description_line in warning['description']:
+        description.extend(normalize_text(description_line))
+
+    # Normalize the code flow
+    code_flow = []
+    for flow_step in warning['code_flow']:
+        code_flow.append((str(flow_step.get('file')).strip(), normalize_line_number(flow_step.get('line')),
+                          ' '.join(normalize_text(flow_step.get('description')))))
+
+    return (warning['id'], str(warning['file']), normalize_line_number(warning['line']),
+            re.sub(r'[0-9]', '', warning['id']), warning['priority'], warning['query'].strip(),
+            tuple(description), tuple(code_flow), tuple(warning.get('also_reported_by') or ()))
+
+
+def create_records(warnings):
+    """This function converts warnings into the normalized records that are stored in the binary format.
+
+    Inputs:
+        - warnings: List of warnings to be converted [list of dicts]
+
+    Outputs:
+        - records: List of normalized warning records [list of tuples]
+    """
+
+    # Suppressed warnings are never written out
+    return [create_record(warning) for warning in warnings if not warning['suppress']]
+
+
+def write_binary_file(records, output_file, source_signature):
+    """This function writes normalized warning records to a binary intermediate file.
+
+    The file consists of a header, a table of every distinct string, and a list of length-prefixed records that
+    reference the string table by index. The header contains the signature of the SCRUB file the records came from.
+
+    Inputs:
+        - records: List of normalized warning records [list of tuples]
+        - output_file: Absolute path to the binary file to be created [Path object]
+        - source_signature: Modification time and size of the SCRUB file the records were read from [tuple]
+    """
+
+    # Initialize variables
+    string_lookup = {}
+    string_table = []
+    encoded_records = []
+
+    def get_string_id(value):
+        string_id = string_lookup.get(value)
+        if string_id is None:
+            string_id = len(string_table)
+            string_lookup[value] = string_id
+            string_table.append(value.encode('utf-8', errors='surrogateescape'))
+        return string_id
+
+    # Encode every record
+    for (warning_id, warning_file, warning_line, warning_tool, warning_priority, warning_query, description,
+         code_flow, also_reported_by) in records:
+        record = [WARNING_STRUCT.pack(get_string_id(warning_id), get_string_id(warning_file),
+                                      get_string_id(warning_tool), get_string_id(warning_priority),
+                                      get_string_id(warning_query), warning_line, len(description))]
+        record.extend(COUNT_STRUCT.pack(get_string_id(line)) for line in description)
+        record.append(COUNT_STRUCT.pack(len(code_flow)))
+        for flow_file, flow_line, flow_description in code_flow:
+            record.append(CODE_FLOW_STRUCT.pack(get_string_id(flow_file), flow_line,
+                                                get_string_id(flow_description)))
+        record.append(COUNT_STRUCT.pack(len(also_reported_by)))
+        record.extend(COUNT_STRUCT.pack(get_string_id(tool)) for tool in also_reported_by)
+        encoded_records.append(b''.join(record))
+
+    # Write out the file
+    with open(output_file, 'wb') as output_fh:
+        output_fh.write(HEADER_STRUCT.pack(FILE_SIGNATURE, FORMAT_VERSION, source_signature[0], source_signature[1]))
+        output_fh.write(COUNT_STRUCT.pack(len(string_table)))
+        for value in string_table:
+            output_fh.write(COUNT_STRUCT.pack(len(value)))
+            output_fh.write(value)
+        output_fh.write(COUNT_STRUCT.pack(len(encoded_records)))
+        for encoded_record in encoded_records:
+            output_fh.write(COUNT_STRUCT.pack(len(encoded_record)))
+            output_fh.write(encoded_record)
+
+
+def read_binary_file(input_file):
+    """This function reads the normalized warning records from a binary intermediate file.
+
+    Inputs:
+        - input_file: Absolute path to the binary file to be read [Path object]
+
+    Outputs:
+        - records: List of normalized warning records [list of tuples]
+    """
+
+    # Initialize variables
+    records = []
+    string_table = []
+
+    # Import the data
+    with open(input_file, 'rb') as input_fh:
+        data = input_fh.read()
+
+    # Check the header
+    signature, version, _, _ = HEADER_STRUCT.unpack_from(data, 0)
+    if signature != FILE_SIGNATURE or version != FORMAT_VERSION:
+        raise BinaryFormatError('{} is not a supported SCRUB binary file.'.format(input_file))
+    offset = HEADER_STRUCT.size
+
+    # Read the string table
+    (string_count,) = COUNT_STRUCT.unpack_from(data, offset)
+    offset = offset + COUNT_STRUCT.size
+    for _ in range(string_count):
+        (string_length,) = COUNT_STRUCT.unpack_from(data, offset)
+        offset = offset + COUNT_STRUCT.size
+        string_table.append(data[offset:offset + string_length].decode('utf-8', errors='surrogateescape'))
+        offset = offset + string_length
+
+    # Read every record
+    (record_count,) = COUNT_STRUCT.unpack_from(data, offset)
+    offset = offset + COUNT_STRUCT.size
+    for _ in range(record_count):
+        (record_length,) = COUNT_STRUCT.unpack_from(data, offset)
+        record_offset = offset + COUNT_STRUCT.size
+        offset = record_offset + record_length
+
+        # Read the warning data
+        (id_index, file_index, tool_index, priority_index, query_index, warning_line,
+         description_count) = WARNING_STRUCT.unpack_from(data, record_offset)
+        record_offset = record_offset + WARNING_STRUCT.size
+
+        # Read the description
+        description = tuple(string_table[index] for index in
+                            struct.unpack_from('<{}I'.format(description_count), data, record_offset))
+        record_offset = record_offset + COUNT_STRUCT.size * description_count
+
+        # Read the code flow
+        (code_flow_count,) = COUNT_STRUCT.unpack_from(data, record_offset)
+        record_offset = record_offset + COUNT_STRUCT.size
+        code_flow = []
+        for flow_file_index, flow_line, flow_description_index in CODE_FLOW_STRUCT.iter_unpack(
+                data[record_offset:record_offset + CODE_FLOW_STRUCT.size * code_flow_count]):
+            code_flow.append((string_table[flow_file_index], flow_line, string_table[flow_description_index]))
+        record_offset = record_offset + CODE_FLOW_STRUCT.size * code_flow_count
+
+        # Read the other tools that reported the finding
+        (tool_count,) = COUNT_STRUCT.unpack_from(data, record_offset)
+        record_offset = record_offset + COUNT_STRUCT.size
+        also_reported_by = tuple(string_table[index] for index in
+                                 struct.unpack_from('<{}I'.format(tool_count), data, record_offset))
+
+        records.append((string_table[id_index], string_table[file_index], warning_line, string_table[tool_index],
+                        string_table[priority_index], string_table[query_index], description, tuple(code_flow),
+                        also_reported_by))
+
+    return records
@@ -1,13 +1,36 @@
 import re
+import os
 import sys
-import json
+import gzip
+import shutil
+import hashlib
+import argparse
+import mmap
+import struct
 import pathlib
 import logging
 import traceback
-from sarif import loader
+import concurrent.futures
+import multiprocessing
+from sarif import sarif_file
+from scrub import __version__
+from scrub.tools.parsers import scrub_binary
+from scrub.tools.parsers import fingerprints
+from scrub.utils import path_cache
+from scrub.utils import line_cache
+from scrub.utils import json_codec
 
 WARNING_LINE_REGEX = r'^[a-z]+[0-9]+ <.*>.*:.*:.*:'
 CODE_FLOW_REGEX = r'    <.*>.*:.*:.*:'
+DIGITS_TABLE = str.maketrans('', '', '0123456789')
+PRIORITY_MARKER_TABLE = str.maketrans('', '', '<>')
+SARIF_SCHEMA = 'https://raw.githubusercontent.com/oasis-tcs/sarif-spec/master/Schemata/sarif-schema-2.1.0.json'
+SNIPPET_CONTEXT_LINES = 2
+SARIF_OUTPUT_FORMATS = ('pretty', 'compact', 'gzip')
+ALSO_REPORTED_PREFIX = 'Also reported by: '
+
+# Normalized records of every SCRUB file written by this process, keyed by absolute file path
+results_cache = {}
 
 
 def create_code_flow(file, line, description):
@@ -30,7 +53,8 @@ def create_code_flow(file, line, description):
     return code_flow
 
 
-def create_warning(scrub_id, file, line, description, tool, priority='Low', query='', suppress=False, code_flow=None):
+def create_warning(scrub_id, file, line, description, tool, priority='Low', query='', suppress=False, code_flow=None,
+                   also_reported_by=None):
     """This function creates an internal representation of a warning t be used for processing.
 
     Inputs:
@@ -43,6 +67,7 @@ def create_warning(scrub_id, file, line, description, tool, priority='Low', quer
         - query: Tool query name that generated the finding [string]
         - suppress: Has this finding been suppressed? [bool]
         - code_flows: List of code flows related to the finding [list of dict]
+        - also_reported_by: Other tools that reported the same finding [list of strings]
 
     Outputs:
         - scrub_warning: Dictionary of warning data [dict]
@@ -51,6 +76,8 @@ def create_warning(scrub_id, file, line, description, tool, priority='Low', quer
     # Do some type checking
     if code_flow is None:
         code_flow = []
+    if also_reported_by is None:
+        also_reported_by = []
     if type(description) is not list:
         description = [description]
 
@@ -63,7 +90,8 @@ def create_warning(scrub_id, file, line, description, tool, priority='Low', quer
                      'priority': priority,
                      'query': query,
                      'suppress': suppress,
-                     'code_flow': code_flow}
+                     'code_flow': code_flow,
+                     'also_reported_by': also_reported_by}
 
     return scrub_warning
 
@@ -87,6 +115,10 @@ def format_scrub_warning(warning):
     for line in warning.get('description'):
         description = description + '    ' + line + '\n'
 
+    # Add the other tools that reported the finding
+    if warning.get('also_reported_by'):
+        description = description + '    ' + ALSO_REPORTED_PREFIX + ', '.join(warning.get('also_reported_by')) + '\n'
+
     # Add the code flow
     if len(warning.get('code_flow')) > 0:
         code_flow_description = '    Code flow data:\n'
@@ -103,14 +135,69 @@ def format_scrub_warning(warning):
     return scrub_warning
 
 
+def get_file_signature(input_file):
+    """This function gets the values used to determine if a file has changed since it was last seen.
+
+    Inputs:
+        - input_file: Absolute path to the file of interest [Path object]
+
+    Outputs:
+        - file_signature: Modification time and size of the file, or None if it does not exist [tuple]
+    """
+
+    try:
+        file_stat = input_file.stat()
+    except OSError:
+        return None
+
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def clear_results_cache(keep_dir=None):
+    """This function removes the results that have been stored in memory by create_scrub_output_file.
+
+    Inputs:
+        - keep_dir: Absolute path to a directory whose results should be kept, or None to remove every result
+                    [Path object] [optional]
+    """
+
+    if keep_dir is None:
+        results_cache.clear()
+    else:
+        keep_dir = pathlib.Path(keep_dir).absolute()
+        for output_file in [output_file for output_file in results_cache if output_file.parent != keep_dir]:
+            del results_cache[output_file]
+
+
+def discard_results(scrub_files):
+    """This function removes the results of SCRUB output files that are no longer needed from memory.
+
+    Inputs:
+        - scrub_files: Absolute paths to the SCRUB output files [list of Path objects]
+    """
+
+    for scrub_file in scrub_files:
+        results_cache.pop(pathlib.Path(scrub_file).absolute(), None)
+
+
 def create_scrub_output_file(warnings, output_file):
     """This function writes out raw warnings to a SCRUB formatted output file.
 
+    A binary intermediate file is written next to the text file, so that other processes can read the results back
+    without parsing the text format. The results are also kept in memory, so that later stages running in the same
+    process can use them without reading either file. The warnings are visited only once, so they can be produced
+    lazily.
+
     Inputs:
-        - warnings: Dictionary of raw warnings [list of dict]
+        - warnings: Dictionary of raw warnings [list or generator of dict]
         - output_file: Absolute path to output file to be created [string]
     """
 
+    # Initialize variables
+    output_file = pathlib.Path(output_file).absolute()
+    binary_file = scrub_binary.get_binary_file(output_file)
+    records = []
+
     # Create the output file
     with open(output_file, 'w', encoding='utf-8') as output_fh:
         # Iterate through every raw warning
@@ -122,6 +209,19 @@ def create_scrub_output_file(warnings, output_file):
 
                 # Write the warning to the output file
                 output_fh.write(scrub_warning)
+                records.append(scrub_binary.create_record(warning))
+
+    # Create the binary intermediate file
+    source_signature = scrub_binary.get_source_signature(output_file)
+    try:
+        scrub_binary.write_binary_file(records, binary_file, source_signature)
+    except OSError:
+        logging.debug('\tCould not write binary results file %s', binary_file)
+        if binary_file.exists():
+            binary_file.unlink()
+
+    # Store the results for later stages
+    results_cache[output_file] = (source_signature, records)
 
 
 def get_rules_list(warnings):
@@ -134,92 +234,379 @@ def get_rules_list(warnings):
         - rules_list: List of queries contained in the list of warnings [list of strings]
     """
 
+    # Keep the first appearance of every query, using a dictionary for constant time membership checks
+    return list(dict.fromkeys(warning['query'] for warning in warnings if warning['query'] != ''))
+
+
+def create_rules_table(warnings):
+    """This function creates the SARIF rules table for a set of warnings.
+
+    Inputs:
+        - warnings: List of warnings to be examined [list of dicts]
+
+    Outputs:
+        - sarif_rules: List of SARIF reportingDescriptor objects [list of dicts]
+        - rule_indexes: Index of every rule in the rules table, keyed by query [dict]
+    """
+
     # Initialize variables
-    rules_list = []
+    sarif_rules = []
+    rule_indexes = {}
+
+    # Create a single entry for every rule
+    for rule in get_rules_list(warnings):
+        rule_indexes[rule] = len(sarif_rules)
+        sarif_rules.append({
+            'id': rule,
+            'shortDescription': {
+                'text': rule
+            }
+        })
+
+    return sarif_rules, rule_indexes
 
-    # Iterate through every warning
+
+def create_artifacts_table(warnings, source_root):
+    """This function creates the SARIF artifacts table for a set of warnings, including code flow locations.
+
+    Inputs:
+        - warnings: List of warnings to be examined [list of dicts]
+        - source_root: Absolute path of source root directory [Path object]
+
+    Outputs:
+        - sarif_artifacts: List of SARIF artifact objects [list of dicts]
+        - artifact_indexes: Index of every artifact in the artifacts table, keyed by URI [dict]
+    """
+
+    # Initialize variables
+    sarif_artifacts = []
+    artifact_indexes = {}
+
+    # Create a single entry for every file
     for warning in warnings:
-        if warning['query'] not in rules_list and (warning['query'] != ''):
-            rules_list.append(warning['query'])
+        artifact_uris = [str(warning['file'])]
+        for code_flow_item in warning.get('code_flow') or []:
+            artifact_uris.append(str(path_cache.get_relative_path(code_flow_item.get('file'), source_root)))
+        for artifact_uri in artifact_uris:
+            if artifact_uri not in artifact_indexes:
+                artifact_indexes[artifact_uri] = len(sarif_artifacts)
+                sarif_artifacts.append({
+                    'location': {
+                        'uri': artifact_uri,
+                        'uriBaseId': str(source_root)
+                    }
+                })
 
-    return rules_list
+    return sarif_artifacts, artifact_indexes
 
 
-def parse_scrub(scrub_file, source_root):
-    """This function parses a scrub input file and returns a dictionary of findings.
+def add_sarif_snippets(physical_location, source_file, line_number):
+    """This function adds the source line of a result, and the lines that surround it, to a SARIF physical location.
+
+    The lines are read from the shared source line cache, so each file is only read and indexed once, no matter how
+    many results reference it. Nothing is added if the line can not be read.
 
     Inputs:
-        - scrub_file: Absolute path to the SCRUB formatted file to bee parsed [string]
+        - physical_location: SARIF physicalLocation object to be updated [dict]
+        - source_file: Absolute path to the source file of interest [Path object]
+        - line_number: Line of interest, starting from 1 [int]
+    """
+
+    # Get the surrounding lines
+    if line_number < 1:
+        return
+    first_line = max(line_number - SNIPPET_CONTEXT_LINES, 1)
+    try:
+        lines = line_cache.source_line_cache.get_lines(source_file, first_line, line_number + SNIPPET_CONTEXT_LINES)
+    except OSError:
+        return
+    if line_number - first_line >= len(lines):
+        return
+
+    # Add the snippets
+    physical_location['region']['snippet'] = {'text': lines[line_number - first_line]}
+    physical_location['contextRegion'] = {
+        'startLine': first_line,
+        'endLine': first_line + len(lines) - 1,
+        'snippet': {
+            'text': ''.join(lines)
+        }
+    }
+
+
+def create_sarif_result(warning, rule_indexes, artifact_indexes, source_root, fingerprint_counts=None, snippets=False):
+    """This function creates a SARIF 2.1.0 result object that references the rules and artifacts tables.
+
+    Inputs:
+        - warning: Warning to be converted [dict]
+        - rule_indexes: Index of every rule in the rules table, keyed by query [dict]
+        - artifact_indexes: Index of every artifact in the artifacts table, keyed by URI [dict]
+        - source_root: Absolute path of source root directory [Path object]
+        - fingerprint_counts: Number of times each fingerprint has been seen in the current run [dict] [optional]
+        - snippets: Include the source code of the result and its surrounding lines? [bool] [optional]
+
+    Outputs:
+        - result_item: SARIF result object [dict]
+    """
+
+    # Set the priority level and rule
+    result_item = {'level': 'warning', 'ruleId': warning['query']}
+    if warning['query'] in rule_indexes:
+        result_item['ruleIndex'] = rule_indexes[warning['query']]
+
+    # Set the message
+    if warning.get('description') is not None:
+        result_item['message'] = {
+            'text': ' '.join(warning['description'])
+        }
+
+    # Set the location
+    warning_file = str(warning['file'])
+    result_item['locations'] = [{
+        'physicalLocation': {
+            'artifactLocation': {
+                'uri': warning_file,
+                'uriBaseId': str(source_root),
+                'index': artifact_indexes[warning_file]
+            },
+            'region': {
+                'startLine': warning['line']
+            }
+        }
+    }]
+
+    # Add the source code snippets
+    if snippets:
+        add_sarif_snippets(result_item['locations'][0]['physicalLocation'],
+                           path_cache.resolve_path(warning_file, source_root), int(warning['line']))
+
+    # Set the fingerprint
+    result_item['partialFingerprints'] = fingerprints.create_partial_fingerprints(warning, source_root,
+                                                                                  fingerprint_counts)
+
+    # Record the other tools that reported the finding
+    if warning.get('also_reported_by'):
+        result_item['properties'] = {'alsoReportedBy': list(warning['also_reported_by'])}
+
+    if len(warning.get('code_flow')) > 0:
+        # Add the codeFlows data to the result
+        result_item['codeFlows'] = [{
+                                        'message': {
+                                            'text': "Code flow information from {}".format(warning.get('tool'))
+                                        },
+                                        'threadFlows': [
+                                            {
+                                                'locations': []
+                                            }
+                                        ]
+                                    }]
+
+        # Get all the code flow data
+        for code_flow_item in warning.get('code_flow'):
+            artifact_location = str(path_cache.get_relative_path(code_flow_item.get('file'), source_root))
+
+            location_item = {
+                                'location': {
+                                    'message': {
+                                        'text': code_flow_item.get('description')
+                                    },
+                                    'physicalLocation': {
+                                        'artifactLocation': {
+                                            'uri': artifact_location,
+                                            'index': artifact_indexes[artifact_location]
+                                        },
+                                        'region': {
+                                            'startLine': code_flow_item['line']
+                                        }
+                                    }
+                                }
+                            }
+
+            result_item['codeFlows'][0]['threadFlows'][0]['locations'].append(location_item)
+
+    return result_item
+
+
+def iterate_records(records, source_root):
+    """This function lazily converts normalized warning records into the internal representation of warnings.
+
+    Inputs:
+        - records: List of normalized warning records [list of tuples]
         - source_root: Root directory of source code [string]
 
     Outputs:
-        - warning_dict: Dictionary of static analysis findings [dict]
-        - query_list: List of queries found in the SCRUB input file [list of strings]
+        - warning: Static analysis findings, yielded one at a time [generator of dicts]
     """
 
     # Initialize variables
-    warning_list = []
+    flow_paths = {}
 
-    # Import the data
-    with open(scrub_file, 'r', encoding='utf-8') as input_fh:
-        scrub_data = input_fh.read()
+    # Iterate through every record
+    for (warning_id, file_string, warning_line, warning_tool, warning_priority, warning_query, description,
+         code_flow, also_reported_by) in records:
+        # Resolve the file path once per distinct file
+        warning_file = path_cache.resolve_path(file_string, source_root)
 
-    # Split the warnings
-    raw_warnings = list(filter(None, re.split('\n\n', scrub_data)))
+        # Create the code flow objects, creating each distinct path once
+        code_flow_data = []
+        for flow_file, flow_line, flow_description in code_flow:
+            flow_path = flow_paths.get(flow_file)
+            if flow_path is None:
+                flow_path = flow_paths[flow_file] = pathlib.Path(flow_file)
+            code_flow_data.append(create_code_flow(flow_path, flow_line, flow_description))
 
-    # Find all the warnings in the file
-    for raw_warning in raw_warnings:
-        warning_lines = list(filter(None, re.split('\n', raw_warning.strip())))
+        yield create_warning(warning_id, warning_file, warning_line, list(description), warning_tool,
+                             warning_priority, warning_query, code_flow=code_flow_data,
+                             also_reported_by=list(also_reported_by))
 
-        # Get the location information
-        warning_info = list(filter(None, re.split(':', warning_lines[0].strip())))
 
-        # Get the query name if it exists
-        if len(warning_info) > 3:
-            warning_query = list(warning_lines[0].split(': '))[-1].strip()
-        else:
-            warning_query = ''
+def iterate_scrub(scrub_file, source_root):
+    """This function lazily parses a SCRUB formatted file, one warning at a time.
 
-        # Get the warning description
-        warning_description = []
-        code_flow_data = []
-        for i in range(1, len(warning_lines)):
-            description_line = warning_lines[i].rstrip().lstrip('    ')
+    The file is memory-mapped and walked record by record, so the memory required does not depend on the size of the
+    file.
 
-            # Parse code flow data if it exists
-            if description_line.lower() == 'code flow data:':
-                code_flow_line = i + 1
+    Inputs:
+        - scrub_file: Absolute path to the SCRUB formatted file to be parsed [string]
+        - source_root: Root directory of source code [string]
 
-                # Parse out the code flow if it exists
-                for j in range(code_flow_line, len(warning_lines), 2):
-                    code_flow_description = warning_lines[j].rstrip().lstrip('    ')
-                    code_flow_file = pathlib.Path(warning_lines[j + 1].strip().split(':')[0])
-                    code_flow_line = int(warning_lines[j + 1].strip().split(':')[-1])
+    Outputs:
+        - warning: Static analysis findings, yielded one at a time [generator of dicts]
+    """
 
-                    # Generate the code flow object
-                    code_flow_data.append(create_code_flow(code_flow_file, code_flow_line, code_flow_description))
+    with open(scrub_file, 'rb') as input_fh:
+        # Empty files can not be memory-mapped
+        if os.fstat(input_fh.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(input_fh.fileno(), 0, access=mmap.ACCESS_READ) as scrub_data:
+            record_start = 0
+            data_size = len(scrub_data)
+            flow_paths = {}
+
+            # Find all the warnings in the file
+            while record_start < data_size:
+                # Find the end of the current record
+                record_end = scrub_data.find(b'\n\n', record_start)
+                if record_end < 0:
+                    record_end = data_size
+                raw_warning = scrub_data[record_start:record_end].decode('utf-8').strip()
+                record_start = record_end + 2
+
+                # Skip empty records
+                if not raw_warning:
+                    continue
+
+                warning_lines = [line for line in raw_warning.split('\n') if line]
+
+                # Get the location information
+                warning_info = [value for value in warning_lines[0].strip().split(':') if value]
+
+                # Get the query name if it exists
+                if len(warning_info) > 3:
+                    warning_query = warning_lines[0].split(': ')[-1].strip()
+                else:
+                    warning_query = ''
+
+                # Get the warning description
+                warning_description = []
+                code_flow_data = []
+                also_reported_by = []
+                for i in range(1, len(warning_lines)):
+                    description_line = warning_lines[i].rstrip().lstrip(' ')
+
+                    # Get the other tools that reported the finding
+                    if description_line.startswith(ALSO_REPORTED_PREFIX):
+                        also_reported_by = description_line[len(ALSO_REPORTED_PREFIX):].split(', ')
+
+                    # Parse code flow data if it exists
+                    elif description_line.lower() == 'code flow data:':
+                        # Parse out the code flow if it exists
+                        for j in range(i + 1, len(warning_lines), 2):
+                            code_flow_description = warning_lines[j].rstrip().lstrip(' ')
+                            code_flow_location = warning_lines[j + 1].strip().split(':')
+
+                            # Create each distinct code flow path once
+                            flow_path = flow_paths.get(code_flow_location[0])
+                            if flow_path is None:
+                                flow_path = flow_paths[code_flow_location[0]] = pathlib.Path(code_flow_location[0])
+
+                            # Generate the code flow object
+                            code_flow_data.append(create_code_flow(flow_path, int(code_flow_location[-1]),
+                                                                   code_flow_description))
+
+                        break
+                    else:
+                        # Otherwise add the line to the description
+                        warning_description.append(description_line)
 
-                break
-            else:
-                # Otherwise add the line to the description
-                warning_description.append(description_line)
+                # Get the values of interest
+                warning_id = warning_info[0].split()[0]
+                warning_line = int(warning_info[2])
+                warning_tool = warning_id.translate(DIGITS_TABLE)
+                warning_priority = warning_info[0].split()[-1].translate(PRIORITY_MARKER_TABLE)
+
+                # Resolve the file path once per distinct file
+                warning_file = path_cache.resolve_path(warning_info[1], source_root)
+
+                yield create_warning(warning_id, warning_file, warning_line, warning_description, warning_tool,
+                                     warning_priority, warning_query, code_flow=code_flow_data,
+                                     also_reported_by=also_reported_by)
 
-        # Get the values of interest
-        warning_id = warning_info[0].split()[0]
-        warning_file = pathlib.Path(warning_info[1])
-        warning_line = int(warning_info[2])
-        warning_tool = re.sub(r'[0-9]', '', warning_id)
-        warning_priority = re.sub('[<>]', '', warning_info[0].split()[-1])
 
-        # Update the file path, if necessary
-        if warning_file.anchor != '/':
-            warning_file = source_root.joinpath(warning_file).resolve()
+def iterate_results(scrub_file, source_root):
+    """This function lazily reads the warnings of a SCRUB output file, one warning at a time.
 
-        # Add the warning to the dictionary
-        warning_list.append(create_warning(warning_id, warning_file.resolve(), warning_line, warning_description,
-                                           warning_tool, warning_priority, warning_query, code_flow=code_flow_data))
+    The results kept in memory by create_scrub_output_file are used if the file has not changed since it was written,
+    followed by the binary intermediate file if it is up to date. Otherwise the text file is parsed. Consumers that
+    only visit each warning once should use this function instead of parse_scrub.
 
-    return warning_list
+    Inputs:
+        - scrub_file: Absolute path to the SCRUB formatted file to be read [string]
+        - source_root: Root directory of source code [string]
+
+    Outputs:
+        - warning: Static analysis findings, yielded one at a time [generator of dicts]
+    """
+
+    # Initialize variables
+    scrub_file = pathlib.Path(scrub_file)
+    binary_file = scrub_binary.get_binary_file(scrub_file)
+
+    # Use the results from memory if the file has not changed since it was written
+    cached_results = results_cache.get(scrub_file.absolute())
+    if cached_results is not None:
+        if cached_results[0] == get_file_signature(scrub_file):
+            yield from iterate_records(cached_results[1], source_root)
+            return
+        del results_cache[scrub_file.absolute()]
+
+    # Use the binary intermediate file if it is up to date
+    if scrub_binary.is_current(scrub_file, binary_file):
+        try:
+            records = scrub_binary.read_binary_file(binary_file)
+        except (scrub_binary.BinaryFormatError, struct.error, IndexError):
+            logging.warning('\tCould not read binary results file %s. Parsing %s instead.', binary_file, scrub_file)
+        else:
+            yield from iterate_records(records, source_root)
+            return
+
+    # Parse the text file
+    yield from iterate_scrub(scrub_file, source_root)
+
+
+def parse_scrub(scrub_file, source_root):
+    """This function parses a scrub input file and returns a dictionary of findings.
+
+    Inputs:
+        - scrub_file: Absolute path to the SCRUB formatted file to bee parsed [string]
+        - source_root: Root directory of source code [string]
+
+    Outputs:
+        - warning_list: List of static analysis findings [list of dicts]
+    """
+
+    return list(iterate_results(scrub_file, source_root))
 
 
 def format_sarif_for_upload(input_file, output_file, source_root, upload_format):
@@ -233,19 +620,19 @@ def format_sarif_for_upload(input_file, output_file, source_root, upload_format)
 
     # Initialize variables
     formatted_results = []
-    tool_name = input_file.stem
+    tool_name = get_sarif_stem(input_file)
 
     # Import the SARIF results
     unformatted_results = parse_sarif(input_file, source_root)
 
     if upload_format == 'sonarqube':
         for warning in unformatted_results:
-            if input_file.stem == 'codesonar':
+            if tool_name == 'codesonar':
                 # warning['description'] = [warning['query'] + " - (" +
                 #                           warning['description'][0].split('Server Location: ')[-1] + ")"]
                 warning['description'] = [warning['query'] + " - (" + warning['description'][-1] + ")"]
                 formatted_results.append(warning)
-            elif input_file.stem == 'coverity':
+            elif tool_name == 'coverity':
                 warning['description'] = [warning['description'][0]]
                 formatted_results.append(warning)
 
@@ -260,15 +647,294 @@ def format_sarif_for_upload(input_file, output_file, source_root, upload_format)
         create_sarif_output_file(formatted_results, '2.1.0', output_file, source_root, tool_name)
 
 
-def parse_sarif(sarif_filename, source_root):
+def get_upload_cache_file(input_file, source_root, upload_format, cache_dir):
+    """This function gets the location of the cached, pre-processed copy of a SARIF file.
+
+    The cache key is a hash of the contents of the input file, the upload format, the name of the input file, the
+    source root, and the SCRUB version.
+
+    Inputs:
+        - input_file: Absolute path to the SARIF input file [Path object]
+        - source_root: Absolute path to the source root directory [Path object]
+        - upload_format: Format of the SARIF output file [string]
+        - cache_dir: Absolute path to the cache directory [Path object]
+
+    Outputs:
+        - cache_file: Absolute path to the cached output file [Path object]
+    """
+
+    # Hash the inputs
+    input_hash = hashlib.sha256('\0'.join([__version__, upload_format, get_sarif_stem(input_file),
+                                           str(source_root)]).encode())
+    with open(input_file, 'rb') as input_fh:
+        for data in iter(lambda: input_fh.read(1024 * 1024), b''):
+            input_hash.update(data)
+
+    return cache_dir.joinpath('{}.{}.{}.sarif'.format(upload_format, get_sarif_stem(input_file),
+                                                      input_hash.hexdigest()))
+
+
+def format_sarif_for_upload_cached(input_file, output_file, source_root, upload_format, cache_dir):
+    """This function pre-processes a SARIF file for import, reusing the previous output if the inputs are unchanged.
+
+    Inputs:
+        - input_file: Absolute path to the SARIF input file to be parsed [Path object]
+        - output_file: Absolute path to output file to be created [Path object]
+        - source_root: Absolute path to the source root directory [Path object]
+        - upload_format: Format of the SARIF output file [string]
+        - cache_dir: Absolute path to the cache directory [Path object]
+
+    Outputs:
+        - cache_hit: Was the output copied from the cache? [bool]
+        - output_file: Pre-processed SARIF file
+    """
+
+    # Find the cached output
+    cache_file = get_upload_cache_file(input_file, source_root, upload_format, cache_dir)
+    cache_hit = cache_file.is_file()
+
+    # Create the cached output if necessary
+    if not cache_hit:
+        temp_file = cache_file.with_name(cache_file.name + '.' + str(os.getpid()))
+        try:
+            format_sarif_for_upload(input_file, temp_file, source_root, upload_format)
+            if not temp_file.exists():
+                return False
+            os.replace(temp_file, cache_file)
+        finally:
+            # Never leave a partial file behind
+            if temp_file.exists():
+                temp_file.unlink()
+
+        # Remove the previous output for this file and format
+        for stale_file in cache_dir.glob('*.sarif'):
+            if stale_file != cache_file and stale_file.name.rsplit('.', 2)[0] == cache_file.name.rsplit('.', 2)[0]:
+                stale_file.unlink()
+
+    # Copy the output into place
+    shutil.copyfile(cache_file, output_file)
+
+    return cache_hit
+
+
+def prepare_sarif_imports(import_files, source_root, upload_format, cache_dir):
+    """This function pre-processes a set of SARIF files for import in parallel, using the cached output when possible.
+
+    Inputs:
+        - import_files: Absolute paths to each SARIF input file and the output file to be created [list of tuples]
+        - source_root: Absolute path to the source root directory [Path object]
+        - upload_format: Format of the SARIF output files [string]
+        - cache_dir: Absolute path to the cache directory [Path object]
+
+    Outputs:
+        - Every output file is created at the specified location
+    """
+
+    # Create the cache directory
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Pre-process the files
+    if len(import_files) > 1:
+        worker_count = min(len(import_files), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+            cache_hits = list(executor.map(format_sarif_for_upload_cached,
+                                           [input_file for input_file, _ in import_files],
+                                           [output_file for _, output_file in import_files],
+                                           [source_root] * len(import_files),
+                                           [upload_format] * len(import_files),
+                                           [cache_dir] * len(import_files)))
+    else:
+        cache_hits = [format_sarif_for_upload_cached(input_file, output_file, source_root, upload_format, cache_dir)
+                      for input_file, output_file in import_files]
+
+    # Print a status message
+    logging.info('\t>> Prepared %d SARIF files for %s import (%d from cache).', len(import_files), upload_format,
+                 sum(cache_hits))
+
+
+def get_run_base_uris(run_data, source_root):
+    """This function gets the absolute path of every base URI defined by a SARIF run.
+
+    Inputs:
+        - run_data: SARIF run object [dict]
+        - source_root: Absolute path to source root directory [Path object]
+
+    Outputs:
+        - base_uris: Absolute path of each base URI, keyed by base URI ID [dict]
+    """
+
+    # Initialize variables
+    base_uris = {}
+
+    # Resolve every base URI
+    for base_uri_id, base_uri in run_data.get('originalUriBaseIds', {}).items():
+        if base_uri.get('uri'):
+            base_uris[base_uri_id] = path_cache.resolve_path(re.sub(r'^file://', '', base_uri['uri']), source_root)
+
+    return base_uris
+
+
+def parse_sarif_run(run_data, source_root):
+    """This function parses the results of a single SARIF run.
+
+    The tool name and base URIs are read from the run itself, so files containing runs from several tools are parsed
+    correctly. The warnings are not given IDs, since they depend on the other runs in the file.
+
+    Inputs:
+        - run_data: SARIF run object [dict]
+        - source_root: Absolute path to source root directory [Path object]
+
+    Outputs:
+        - results: List of the dictionary items that represent each analysis result in the run [list of dict]
+    """
+
+    # Initialize variables
+    results = []
+
+    # Get the tool name
+    tool_name = run_data['tool']['driver']['name'].lower()
+
+    # Update the source root if it can be found in the SARIF data
+    base_uris = get_run_base_uris(run_data, source_root)
+    if 'SRCROOT0' in base_uris:
+        # Parse the CodeSonar format
+        source_root = base_uris['SRCROOT0']
+
+    # Iterate through every finding
+    for finding in run_data.get('results') or []:
+        # Get the rule ID
+        warning_query = finding.get('ruleId')
+
+        # Check if the warning should be suppressed
+        if 'suppressions' in finding.keys() and finding.get("suppressions") != []:
+            suppress_warning = True
+        else:
+            suppress_warning = False
+
+        # Get the warning file
+        if finding.get('locations'):
+            location_data = finding.get('locations')[0].get('physicalLocation')
+            artifact_location = location_data.get('artifactLocation')
+            warning_file = path_cache.resolve_path(artifact_location.get('uri'),
+                                                   base_uris.get(artifact_location.get('uriBaseId'), source_root))
+
+            # Get the line number
+            if location_data.get('region'):
+                warning_line = int(location_data.get('region').get('startLine', 0))
+            else:
+                warning_line = 0
+        else:
+            print('WARNING: Location data missing. Could not parse finding {}'.format(warning_query))
+            continue
+
+        # Get the warning description
+        if finding.get('message').get('text'):
+            warning_description = [(finding.get('message').get('text').replace('\n', ''))]
+            if finding.get('hostedViewerUri'):
+                # warning_description.append('Server Location: ' + finding.get('hostedViewerUri'))
+                warning_description.append(finding.get('hostedViewerUri'))
+        else:
+            print('WARNING: Description data missing. Could not parse finding {}'.format(warning_query))
+            continue
+
+        # Get any code flow information that exists
+        code_flow = []
+        if finding.get('codeFlows'):
+            for flow in finding.get('codeFlows'):
+                if flow.get('message'):
+                    warning_description.append(flow.get('message').get('text'))
+                for thread_location in flow.get('threadFlows')[0].get('locations'):
+                    if thread_location.get('location').get('message'):
+                        code_flow_file = pathlib.Path(thread_location.get('location')
+                                                      .get('physicalLocation').get('artifactLocation').get('uri'))
+                        code_flow_line = (thread_location.get('location').get('physicalLocation').get('region')
+                                          .get('startLine'))
+                        code_flow_description = thread_location.get('location').get('message').get('text')
+                        code_flow.append(create_code_flow(code_flow_file, code_flow_line, code_flow_description))
+
+        # Set the ranking
+        if 'rank' in finding.keys():
+            if int(finding['rank']) > 56:
+                ranking = 'High'
+            elif 21 < int(finding['rank']) <= 56:
+                ranking = 'Med'
+            else:
+                ranking = 'Low'
+        else:
+            ranking = 'Low'
+
+        # Get the other tools that reported the finding
+        also_reported_by = list((finding.get('properties') or {}).get('alsoReportedBy') or [])
+
+        # Add to the warning dictionary
+        results.append(create_warning(None, warning_file, warning_line, warning_description,
+                                      tool_name, ranking, warning_query, suppress_warning, code_flow,
+                                      also_reported_by))
+
+    return results
+
+
+def load_sarif_runs(sarif_filename):
+    """This function decodes a SARIF file and gets the data of every run.
+
+    Inputs:
+        - sarif_filename: Absolute path to the SARIF file to be decoded [string]
+
+    Outputs:
+        - runs_data: SARIF run object of every run in the file [list of dicts]
+    """
+
+    # Import the SARIF file data
+    if str(sarif_filename).endswith('.gz'):
+        input_fh = gzip.open(sarif_filename, 'rt', encoding='utf-8-sig')
+    else:
+        input_fh = open(sarif_filename, 'r', encoding='utf-8-sig')
+    with input_fh:
+        sarif_data = sarif_file.SarifFile(str(sarif_filename), json_codec.load(input_fh))
+
+    return [sarif_run.run_data for sarif_run in sarif_data.runs]
+
+
+def parse_sarif_runs(runs_data, source_root):
+    """This function parses a share of the runs of a SARIF file in a worker process.
+
+    Inputs:
+        - runs_data: SARIF run objects assigned to this worker [list of dicts]
+        - source_root: Absolute path to source root directory [Path object]
+
+    Outputs:
+        - run_results: List of the results of each run [list of lists of dicts]
+    """
+
+    return [parse_sarif_run(run_data, source_root) for run_data in runs_data]
+
+
+def is_worker_process():
+    """This function checks to see if the current process is a worker process, which should not start its own pool.
+
+    Outputs:
+        - worker_process: Is the current process a worker process? [bool]
+    """
+
+    return multiprocessing.current_process().name != 'MainProcess'
+
+
+def parse_sarif(sarif_filename, source_root, max_workers=1):
     """This function parses all the SARIF results into the dictionary list of results.
 
+    The file is decoded once. Its runs are parsed serially by default, since sending the parsed warnings back from
+    worker processes costs more than parsing them. If more than one worker is requested, each worker receives only its
+    own contiguous share of the runs. The number of workers is capped by the number of runs and processors, and no pool
+    is started inside another worker process. Warning IDs are numbered separately for each tool, in the order the runs
+    appear in the file.
+
     NOTE: This function depends on the open-source SARIF parsing library "sarif-tools"
           https://github.com/microsoft/sarif-tools/tree/main
 
     Inputs:
         - sarif_filename: Absolute path to the SARIF file to be parsed [string]
         - source_root: Absolute path to source root directory [string]
+        - max_workers: Maximum number of worker processes [int] [optional]
 
     Outputs:
         - results: List of the dictionary items that represent each filtered analysis result [list of dict]
@@ -276,263 +942,318 @@ def parse_sarif(sarif_filename, source_root):
 
     # Initialize variables
     results = []
-    warning_count = 1
+    warning_counts = {}
 
     try:
         # Import the SARIF file data
-        sarif_data = loader.load_sarif_file(sarif_filename)
+        runs_data = load_sarif_runs(sarif_filename)
 
-        # Get the tool name
-        if sarif_data.get_distinct_tool_names():
-            tool_name = sarif_data.get_distinct_tool_names()[0].lower()
-        else:
+        # Check the run data
+        if not runs_data:
             print("ERROR: No run data found for results file {}".format(sarif_filename))
             raise Exception
 
-        # Update the source root if it can be found in the SARIF data
-        if "originalUriBaseIds" in sarif_data.data['runs'][0]:
-            # Parse the CodeSonar format
-            if 'SRCROOT0' in sarif_data.data['runs'][0]['originalUriBaseIds']:
-                source_root = pathlib.Path(sarif_data.data['runs'][0]['originalUriBaseIds']['SRCROOT0']['uri']
-                                           .replace('file://', '')).resolve()
+        # Parse every run
+        worker_count = 1
+        if not is_worker_process():
+            worker_count = max(1, min(len(runs_data), max_workers or 1, os.cpu_count() or 1))
+        if worker_count > 1:
+            share_size = -(-len(runs_data) // worker_count)
+            run_shares = [runs_data[index:index + share_size] for index in range(0, len(runs_data), share_size)]
+            del runs_data
+            with concurrent.futures.ProcessPoolExecutor(max_workers=len(run_shares)) as executor:
+                run_results = [warnings for worker_result in executor.map(parse_sarif_runs, run_shares,
+                                                                          [source_root] * len(run_shares))
+                               for warnings in worker_result]
+        else:
+            run_results = parse_sarif_runs(runs_data, source_root)
 
-        # Iterate through every finding
-        for finding in sarif_data.get_results():
-            # Set the warning ID
-            warning_id = tool_name + str(warning_count).zfill(3)
+        # Merge the runs, numbering the warnings for each tool
+        for warnings in run_results:
+            for warning in warnings:
+                warning_count = warning_counts.get(warning['tool'], 0) + 1
+                warning_counts[warning['tool']] = warning_count
+                warning['id'] = warning['tool'] + str(warning_count).zfill(3)
+                results.append(warning)
 
-            # Get the rule ID
-            warning_query = finding.get('ruleId')
+    except:      # lgtm [py/catch-base-exception]
+        raise Exception
 
-            # Check if the warning should be suppressed
-            if 'suppressions' in finding.keys() and finding.get("suppressions") != []:
-                suppress_warning = True
-            else:
-                suppress_warning = False
-
-            # Get the warning file
-            if finding.get('locations'):
-                location_data = finding.get('locations')[0].get('physicalLocation')
-                warning_file = location_data.get('artifactLocation').get('uri')
-                if warning_file.startswith('/'):
-                    warning_file = pathlib.Path(warning_file)
-                else:
-                    warning_file = pathlib.Path(source_root).joinpath(warning_file)
+    return results
 
-                # Get the line number
-                if location_data.get('region'):
-                    warning_line = int(location_data.get('region').get('startLine', 0))
-                else:
-                    warning_line = 0
-            else:
-                print('WARNING: Location data missing. Could not parse finding {}'.format(warning_query))
-                continue
-
-            # Get the warning description
-            if finding.get('message').get('text'):
-                warning_description = [(finding.get('message').get('text').replace('\n', ''))]
-                if finding.get('hostedViewerUri'):
-                    # warning_description.append('Server Location: ' + finding.get('hostedViewerUri'))
-                    warning_description.append(finding.get('hostedViewerUri'))
-            else:
-                print('WARNING: Description data missing. Could not parse finding {}'.format(warning_query))
-                continue
-
-            # Get any code flow information that exists
-            code_flow = []
-            if finding.get('codeFlows'):
-                for flow in finding.get('codeFlows'):
-                    if flow.get('message'):
-                        warning_description.append(flow.get('message').get('text'))
-                    for thread_location in flow.get('threadFlows')[0].get('locations'):
-                        if thread_location.get('location').get('message'):
-                            code_flow_file = pathlib.Path(thread_location.get('location')
-                                                          .get('physicalLocation').get('artifactLocation').get('uri'))
-                            code_flow_line = (thread_location.get('location').get('physicalLocation').get('region')
-                                              .get('startLine'))
-                            code_flow_description = thread_location.get('location').get('message').get('text')
-                            code_flow.append(create_code_flow(code_flow_file, code_flow_line, code_flow_description))
-
-            # Set the ranking
-            if 'rank' in finding.keys():
-                if int(finding['rank']) > 56:
-                    ranking = 'High'
-                elif 21 < int(finding['rank']) <= 56:
-                    ranking = 'Med'
-                else:
-                    ranking = 'Low'
-            else:
-                ranking = 'Low'
 
-            # Add to the warning dictionary
-            results.append(create_warning(warning_id, warning_file.resolve(), warning_line, warning_description,
-                                          tool_name, ranking, warning_query, suppress_warning, code_flow))
+def get_sarif_stem(sarif_filename):
+    """This function gets the name of a SARIF file without its extensions.
 
-            # Update the warning count
-            warning_count = warning_count + 1
+    Inputs:
+        - sarif_filename: Path to a SARIF file, which may be compressed [Path object]
 
-    except:      # lgtm [py/catch-base-exception]
-        raise Exception
+    Outputs:
+        - stem: Name of the file without the .sarif or .sarif.gz extension [string]
+    """
 
-    return results
+    # Remove the extensions
+    stem = pathlib.Path(sarif_filename).name
+    for extension in ('.gz', '.sarif'):
+        if stem.endswith(extension):
+            stem = stem[:-len(extension)]
 
+    return stem
 
-def create_sarif_output_file(results_list, sarif_version, output_file, source_root, tool_name):
-    """This function creates a SARIF formatted output file.
+
+def get_sarif_output_path(output_file, output_format):
+    """This function gets the path of a SARIF output file, adding the compression extension if necessary.
+
+    Inputs:
+        - output_file: Path to the uncompressed SARIF output file [Path object]
+        - output_format: SARIF output format (pretty, compact, or gzip) [string]
+
+    Outputs:
+        - output_path: Path to the SARIF file that will be written [Path object]
+    """
+
+    output_file = pathlib.Path(output_file)
+    if output_format == 'gzip' and output_file.suffix != '.gz':
+        return output_file.with_name(output_file.name + '.gz')
+    return output_file
+
+
+def encode_sarif_value(value, output_format, level):
+    """This function encodes a value as JSON text at a given nesting level of a SARIF document.
+
+    Inputs:
+        - value: Value to be encoded [JSON serializable object]
+        - output_format: SARIF output format (pretty, compact, or gzip) [string]
+        - level: Nesting level of the value, used for indentation [int]
+
+    Outputs:
+        - encoded_value: JSON text of the value [string]
+    """
+
+    if output_format == 'pretty':
+        return json_codec.dumps(value, indent=4).replace('\n', '\n' + '    ' * level)
+    return json_codec.dumps(value)
+
+
+def write_sarif_file(output_file, sarif_version, sarif_runs, output_format='pretty'):
+    """This function writes a SARIF document incrementally, so the complete document is never held in memory.
+
+    Each run header is written first, followed by the results of the run, one at a time.
+
+    Inputs:
+        - output_file: Absolute path to the SARIF output file to be created [Path object]
+        - sarif_version: SARIF version of the output file [string]
+        - sarif_runs: Run headers and the results of each run, which are only requested as they are written
+                      [iterable of (dict, iterable of dicts) tuples]
+        - output_format: SARIF output format (pretty, compact, or gzip) [string] [optional]
+
+    Outputs:
+        - output_file: SARIF document, compressed with gzip if necessary
+    """
+
+    # Set the formatting tokens
+    if output_format == 'pretty':
+        newline, indent, separator = '\n', '    ', ': '
+    else:
+        newline, indent, separator = '', '', ':'
+
+    # Open the output file
+    if output_format == 'gzip':
+        output_fh = gzip.open(output_file, 'wt', encoding='utf-8')
+    else:
+        output_fh = open(output_file, 'w', encoding='utf-8')
+
+    with output_fh:
+        # Write the document header
+        output_fh.write('{' + newline +
+                        indent + '"version"' + separator + json_codec.dumps(sarif_version) + ',' + newline +
+                        indent + '"$schema"' + separator + json_codec.dumps(SARIF_SCHEMA) + ',' + newline +
+                        indent + '"runs"' + separator + '[')
+
+        # Write every run
+        for run_index, (run_header, run_results) in enumerate(sarif_runs):
+            output_fh.write((',' if run_index else '') + newline + indent * 2 + '{')
+            for key, value in run_header.items():
+                output_fh.write(newline + indent * 3 + json_codec.dumps(key) + separator +
+                                encode_sarif_value(value, output_format, 3) + ',')
+
+            # Write the results one at a time
+            output_fh.write(newline + indent * 3 + '"results"' + separator + '[')
+            result_count = 0
+            for result_item in run_results:
+                output_fh.write((',' if result_count else '') + newline + indent * 4 +
+                                encode_sarif_value(result_item, output_format, 4))
+                result_count = result_count + 1
+            output_fh.write((newline + indent * 3 if result_count else '') + ']' + newline + indent * 2 + '}')
+
+        # Close the document
+        output_fh.write(newline + indent + ']' + newline + '}' + newline)
+
+
+def iterate_sarif_results(results_list, rule_indexes, artifact_indexes, source_root, snippets=False):
+    """This function creates the SARIF 2.1.0 result objects of a run, one at a time.
 
     Inputs:
         - results_list: List of dictionaries representing each warning [list of dicts]
-        - sarif_version:
-        - output_file:
-        - source_root: Absolute path of source root directory [string]
-        - tool_name: Name of scanning tool [string]
+        - rule_indexes: Index of every rule in the rules table of the run, keyed by query [dict]
+        - artifact_indexes: Index of every artifact in the artifacts table of the run, keyed by URI [dict]
+        - source_root: Absolute path of source root directory [Path object]
+        - snippets: Include the source code of each result and its surrounding lines? [bool] [optional]
 
-    Returns:
-        - output_file is created at the specified location
+    Outputs:
+        - result_item: SARIF result object for each warning [generator of dicts]
     """
 
-    # Initialize variables
-    result_item = {}
-    rules_list = get_rules_list(results_list)
-    sarif_output = {
-        'version': sarif_version,
-        '$schema': 'https://raw.githubusercontent.com/oasis-tcs/sarif-spec/master/Schemata/sarif-schema-2.1.0.json',
-        'runs': [
-                   {
-                       'tool': {
-                           'driver': {
-                               'name': tool_name
-                           },
-                           'rules': []
-                       },
-                       'results': []
-                   }
-        ]
-    }
+    # Fingerprints are numbered within each run
+    fingerprint_counts = {}
 
-    # Iterate through every warning
     for warning in results_list:
-        file_index = 0
+        yield create_sarif_result(warning, rule_indexes, artifact_indexes, source_root, fingerprint_counts, snippets)
+
 
-        # Set the priority level
-        result_item['level'] = 'warning'
+def create_sarif_v200_result(warning):
+    """This function creates a SARIF 2.0.0 result object.
 
-        # Set the file path
-        warning_file = str(warning['file'])
+    Inputs:
+        - warning: Warning to be converted [dict]
 
-        # Set the rule ID
-        result_item['ruleId'] = warning['query']
+    Outputs:
+        - result_item: SARIF result object [dict]
+    """
 
-        if warning.get('description') is not None:
-            result_item['message'] = {
-                'text': ' '.join(warning['description'])
+    # TODO: CAREFUL USING 2.0.0, STRUCT IS NOT COMPLETELY DEPENDABLE, NEEDS WORK
+    result_item = {'level': 'warning', 'ruleId': warning['query']}
+
+    if warning.get('description') is not None:
+        result_item['message'] = {
+            'text': ' '.join(warning['description'])
+        }
+
+    result_item['locations'] = [
+        {
+            'physicalLocation': {
+                'fileLocation': {
+                    # TODO: get the logic right on properly indexing file paths (like with ruleIndex)
+                    'fileIndex': 0
+                },
+                'region': {
+                    'startLine': warning['line']
+                }
             }
-        if sarif_version == '2.0.0':
-            # TODO: CAREFUL USING 2.0.0, STRUCT IS NOT COMPLETELY DEPENDABLE, NEEDS WORK
-            sarif_output['runs'][0].update({'resources': rules_list})
+        }
+    ]
+
+    return result_item
+
+
+def create_sarif_output_file(results_list, sarif_version, output_file, source_root, tool_name, output_format='pretty',
+                             snippets=False):
+    """This function creates a SARIF formatted output file.
+
+    Inputs:
+        - results_list: List of dictionaries representing each warning [list of dicts]
+        - sarif_version: SARIF version of the output file [string]
+        - output_file: Absolute path to the SARIF output file to be created [Path object]
+        - source_root: Absolute path of source root directory [string]
+        - tool_name: Name of scanning tool [string]
+        - output_format: SARIF output format (pretty, compact, or gzip) [string] [optional]
+        - snippets: Include the source code of each result and its surrounding lines? [bool] [optional]
 
-            sarif_output['runs'][0].update({'tool': results_list[0]['tool']})
+    Returns:
+        - output_file is created at the specified location
+    """
+
+    if sarif_version == '2.0.0':
+        # Create the run header
+        run_header = {'tool': results_list[0]['tool'] if results_list else tool_name}
+        if results_list:
+            run_header['resources'] = get_rules_list(results_list)
             # TODO: get the logic right for deciding mime type... pass file_list like rules_list
-            sarif_output['runs'][0]['files'] = [{
+            run_header['files'] = [{
                 "mimeType": "text/c",
                 "fileLocation": {
-                    "uri": results_list[0]['file']
+                    "uri": str(results_list[0]['file'])
                 }
             }]
-            result_item['locations'] = [
-                {
-                    'physicalLocation': {
-                        'fileLocation': {
-                            # TODO: get the logic right on properly indexing file paths (like with ruleIndex)
-                            'fileIndex': file_index
-                        },
-                        'region': {
-                            'startLine': warning['line']
-                        }
-                    }
+        run_results = (create_sarif_v200_result(warning) for warning in results_list)
+
+    else:
+        # Create the rules and artifacts tables once, so that every result can reference them by index
+        sarif_rules, rule_indexes = create_rules_table(results_list)
+        sarif_artifacts, artifact_indexes = create_artifacts_table(results_list, source_root)
+        run_header = {
+            'tool': {
+                'driver': {
+                    'name': tool_name,
+                    'rules': sarif_rules
                 }
-            ]
-            file_index += 1
-        elif sarif_version == '2.1.0':
-            # Create the list of sarif rules
-            sarif_rules = []
-            for rule in rules_list:
-                sarif_rules.append({
-                    'id': rule,
-                    'shortDescription': {
-                        'text': rule
-                    }
-                })
-            sarif_output['runs'][0]['tool']['rules'] = sarif_rules
-            result_item['locations'] = [{
-                'physicalLocation': {
-                    'artifactLocation': {
-                        'uri': warning_file,
-                        'uriBaseId': str(source_root)
-                    },
-                    'region': {
-                        'startLine': warning['line']
-                    }
+            },
+            'artifacts': sarif_artifacts
+        }
+        run_results = iterate_sarif_results(results_list, rule_indexes, artifact_indexes, source_root, snippets)
+
+    # Create the output file
+    write_sarif_file(output_file, sarif_version, [(run_header, run_results)], output_format)
+
+
+def iterate_sarif_runs(results_sets, source_root, snippets=False):
+    """This function creates the SARIF 2.1.0 runs for a set of tools, one at a time.
+
+    Inputs:
+        - results_sets: Name of each tool and its list of warnings [iterable of (string, list of dicts) tuples]
+        - source_root: Absolute path of source root directory [Path object]
+        - snippets: Include the source code of each result and its surrounding lines? [bool] [optional]
+
+    Outputs:
+        - sarif_run: Run header and results of each tool, yielded one at a time [generator of (dict, generator) tuples]
+    """
+
+    for tool_name, results_list in results_sets:
+        sarif_rules, rule_indexes = create_rules_table(results_list)
+        sarif_artifacts, artifact_indexes = create_artifacts_table(results_list, source_root)
+        run_header = {
+            'tool': {
+                'driver': {
+                    'name': tool_name,
+                    'rules': sarif_rules
                 }
-            }]
+            },
+            'artifacts': sarif_artifacts
+        }
+        yield run_header, iterate_sarif_results(results_list, rule_indexes, artifact_indexes, source_root, snippets)
 
-            if len(warning.get('code_flow')) > 0:
-                # Add the codeFlows data to the result
-                result_item['codeFlows'] = [{
-                                                'message': {
-                                                    'text': "Code flow information from {}".format(warning.get('tool'))
-                                                },
-                                                'threadFlows': [
-                                                    {
-                                                        'locations': []
-                                                    }
-                                                ]
-                                            }]
-
-                # Get all the code flow data
-                for code_flow_item in warning.get('code_flow'):
-                    # if str(code_flow_item.get('file')).startswith('/'):
-                    if source_root in code_flow_item.get('file').parents:
-                        artifact_location = str(code_flow_item.get('file').relative_to(source_root))
-                    else:
-                        artifact_location = str(code_flow_item.get('file'))
-
-                    location_item = {
-                                        'location': {
-                                            'message': {
-                                                'text': code_flow_item.get('description')
-                                            },
-                                            'physicalLocation': {
-                                                'artifactLocation': {
-                                                    'uri': artifact_location
-                                                },
-                                                'region': {
-                                                    'startLine': code_flow_item['line']
-                                                }
-                                            }
-                                        }
-                                    }
 
-                    # locations_list.append(location_item)
-                    result_item['codeFlows'][0]['threadFlows'][0]['locations'].append(location_item)
+def create_merged_sarif_output_file(results_sets, output_file, source_root, output_format='pretty', snippets=False):
+    """This function creates a single SARIF 2.1.0 file that contains one run for each tool.
 
-        # append fixed warnings to results list and clean dict object
-        sarif_output['runs'][0]['results'].append(result_item)
-        result_item = {}
+    SARIF scopes artifacts to a run, so each run contains a table of only the artifacts it references. The file is
+    written in a single streaming pass, and the warnings of each tool are only requested from results_sets once the
+    previous run has been written, so passing a generator keeps only one tool's warnings in memory.
 
-    # Create the output file
-    with open(output_file, 'w') as output_fh:
-        # output_fh.write('{}'.format(json.dumps(sarif_output, indent=4)))
-        json.dump(sarif_output, output_fh, indent=4)
+    Inputs:
+        - results_sets: Name of each tool and its list of warnings [iterable of (string, list of dicts) tuples]
+        - output_file: Absolute path to the SARIF output file to be created [Path object]
+        - source_root: Absolute path of source root directory [Path object]
+        - output_format: SARIF output format (pretty, compact, or gzip) [string] [optional]
+        - snippets: Include the source code of each result and its surrounding lines? [bool] [optional]
+
+    Returns:
+        - output_file is created at the specified location
+    """
+
+    write_sarif_file(output_file, '2.1.0', iterate_sarif_runs(results_sets, source_root, snippets), output_format)
 
 
-def perform_translation(input_file, output_file, source_root, output_format):
+def perform_translation(input_file, output_file, source_root, output_format, sarif_format='pretty',
+                        sarif_snippets=False):
     """This function takes in an analysis results file in legacy format (.scrub), then parses and converts the contents
        of each analysis result into the SARIF format.
 
     Inputs:
         - scrub_filename: The name of the .sarif file to parse and convert. [string]
         - output_filename: The filename to output parsed results to. [string]
+        - sarif_format: Format of SARIF output files (pretty, compact, or gzip) [string] [optional]
+        - sarif_snippets: Include source code snippets in SARIF output files? [bool] [optional]
 
     Outputs:
         - custom_exit_code: Exit code that represents whether the module completed with errors.
@@ -542,14 +1263,14 @@ def perform_translation(input_file, output_file, source_root, output_format):
     # Initialize the variables
     exit_code = 1
     parsed_results = []
-    tool_name = input_file.stem
+    tool_name = get_sarif_stem(input_file) if input_file.suffix == '.gz' else input_file.stem
 
     try:
         # Parse the input file
         if input_file.suffix == '.scrub':
             parsed_results = parse_scrub(input_file, source_root)
 
-        elif input_file.suffix == '.sarif':
+        elif input_file.suffix == '.sarif' or input_file.name.endswith('.sarif.gz'):
             parsed_results = parse_sarif(input_file, source_root)
 
         else:
@@ -565,7 +1286,8 @@ def perform_translation(input_file, output_file, source_root, output_format):
             sarif_version = output_format.strip('sarifv')
 
             # Generate the output file
-            create_sarif_output_file(parsed_results, sarif_version, output_file, source_root, tool_name)
+            create_sarif_output_file(parsed_results, sarif_version, get_sarif_output_path(output_file, sarif_format),
+                                     source_root, tool_name, sarif_format, sarif_snippets)
 
         else:
             # TODO: This should generate an exception
@@ -585,5 +1307,73 @@ def perform_translation(input_file, output_file, source_root, output_format):
         return exit_code
 
 
+def translate_batch(translations, source_root, output_format, sarif_format='pretty', max_workers=None,
+                    sarif_snippets=False):
+    """This function translates many analysis results files in a single process, using a pool of workers.
+
+    Inputs:
+        - translations: Absolute paths to each input file and the output file to be created [list of tuples]
+        - source_root: Absolute path to the source root directory [Path object]
+        - output_format: Format of the output files (scrub, sarifv2.1.0) [string]
+        - sarif_format: Format of SARIF output files (pretty, compact, or gzip) [string] [optional]
+        - max_workers: Maximum number of worker processes, or the number of processors if not set [int] [optional]
+        - sarif_snippets: Include source code snippets in SARIF output files? [bool] [optional]
+
+    Outputs:
+        - exit_codes: Exit code of each translation, in the order of the inputs [list of int]
+        - Every output file is created at the specified location
+    """
+
+    # Perform a single translation in this process
+    if len(translations) <= 1 or max_workers == 1:
+        return [perform_translation(input_file, output_file, source_root, output_format, sarif_format, sarif_snippets)
+                for input_file, output_file in translations]
+
+    # Perform the translations in parallel
+    worker_count = min(len(translations), max_workers or os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+        return list(executor.map(perform_translation,
+                                 [input_file for input_file, _ in translations],
+                                 [output_file for _, output_file in translations],
+                                 [source_root] * len(translations),
+                                 [output_format] * len(translations),
+                                 [sarif_format] * len(translations),
+                                 [sarif_snippets] * len(translations)))
+
+
+def parse_batch_arguments():
+    """This function handles argument parsing in preparation for batch translation."""
+
+    # Create the parser
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=translate_batch.__doc__)
+
+    # Add parser arguments
+    parser.add_argument('--source-root', required=True)
+    parser.add_argument('--output-format', default='scrub')
+    parser.add_argument('--sarif-format', default='pretty', choices=SARIF_OUTPUT_FORMATS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sarif-snippets', action='store_true')
+    parser.add_argument('files', nargs='+', metavar='<input file> <output file>')
+
+    # Parse the arguments
+    args = vars(parser.parse_args(sys.argv[2:]))
+    if len(args['files']) % 2 != 0:
+        parser.error('Every input file must be followed by an output file.')
+
+    # Run the translations
+    translations = [(pathlib.Path(args['files'][i]).resolve(), pathlib.Path(args['files'][i + 1]).resolve())
+                    for i in range(0, len(args['files']), 2)]
+    exit_codes = translate_batch(translations, pathlib.Path(args['source_root']).resolve(), args['output_format'],
+                                 args['sarif_format'], args['workers'], args['sarif_snippets'])
+
+    # Print a status message for every failed translation
+    for (input_file, _), exit_code in zip(translations, exit_codes):
+        if exit_code != 0:
+            print('ERROR: Could not translate {}'.format(input_file))
+
+    return max(exit_codes)
+
+
 if __name__ == '__main__':
     perform_translation(pathlib.Path(sys.argv[1]), pathlib.Path(sys.argv[2]), pathlib.Path(sys.argv[3]), sys.argv[4])
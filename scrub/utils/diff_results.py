@@ -2,7 +2,12 @@ import os
 import sys
 import argparse
 import pathlib
+import datetime
+from sarif import sarif_file
+from sarif.operations import diff_op
 from scrub.utils import scrub_utilities
+from scrub.utils import results_database
+from scrub.tools.parsers import translate_results
 
 
 def parse_arguments():
@@ -22,9 +27,38 @@ def parse_arguments():
     diff(pathlib.Path(args['baseline_scrub']).resolve(), pathlib.Path(args['comparison_scrub']).resolve())
 
 
+def create_sarif_file_set(scrub_root, source):
+    """This function creates a SARIF file set in memory from the findings of one results file in the results database.
+
+    Inputs:
+        - scrub_root: Absolute path to the SCRUB results directory [Path object]
+        - source: Name of the results file (e.g. codeql, compiler) [string]
+
+    Outputs:
+        - file_set: SARIF file set containing the findings [SarifFileSet]
+    """
+
+    # Get the findings from the results database
+    source_root = scrub_root.parent
+    findings = results_database.query_findings(scrub_root.joinpath('results.db'), source_root, sources=[source])
+
+    # Create the SARIF data
+    sarif_runs = [dict(run_header, results=list(run_results)) for run_header, run_results in
+                  translate_results.iterate_sarif_runs([(source, findings)], source_root)]
+    file_set = sarif_file.SarifFileSet()
+    file_set.files.append(sarif_file.SarifFile(str(scrub_root.joinpath('sarif_results', source + '.sarif')),
+                                               {'version': '2.1.0', 'runs': sarif_runs},
+                                               mtime=datetime.datetime.now()))
+
+    return file_set
+
+
 def diff(baseline_scrub_root, comparison_scrub_root):
     """This function diffs two sets of SARIF results directories.
 
+    If the results database of both directories is up to date, the findings of each tool are read from the databases
+    and diffed in this process. Otherwise, the SARIF files of each tool are diffed by the sarif command.
+
     NOTE: This function depends on the open-source SARIF parsing library "sarif-tools"
           https://github.com/microsoft/sarif-tools/tree/main
 
@@ -36,6 +70,17 @@ def diff(baseline_scrub_root, comparison_scrub_root):
         - None
     """
 
+    # Diff the results databases, if they are up to date
+    if (results_database.is_current(baseline_scrub_root.joinpath('results.db'), baseline_scrub_root) and
+            results_database.is_current(comparison_scrub_root.joinpath('results.db'), comparison_scrub_root)):
+        baseline_sources = set(results_file.stem for results_file in baseline_scrub_root.glob('*.scrub'))
+        for comparison_file in sorted(comparison_scrub_root.glob('*.scrub')):
+            if comparison_file.stem in baseline_sources:
+                diff_op.print_diff(create_sarif_file_set(baseline_scrub_root, comparison_file.stem),
+                                   create_sarif_file_set(comparison_scrub_root, comparison_file.stem),
+                                   'diff_' + comparison_file.stem + '.sarif.json')
+        return
+
     # Find all the SARIF files in each directory
     baseline_sarif_files = baseline_scrub_root.joinpath('sarif_results').glob('*.sarif')
     comparison_sarif_files = comparison_scrub_root.joinpath('sarif_results').glob('*.sarif')
@@ -1,7 +1,9 @@
 import re
 import os
+import time
 import pathlib
 import logging
+from scrub.utils.filtering import filter_profile
 
 
 def parse_filtering_file(file_path):
@@ -32,7 +34,121 @@ def parse_filtering_file(file_path):
     return filtering_options
 
 
-def create_file_list(source_root_dir, filtering_output_file, filtering_options_file, initial_filtering_list=''):
+def simplify_pattern(pattern):
+    """This function removes leading and trailing wildcards that do not change the result of a regex search.
+
+    Inputs:
+        - pattern: Regex pattern to be simplified [string]
+
+    Outputs:
+        - pattern: Simplified regex pattern [string]
+    """
+
+    # Remove leading wildcards, unless they are modified by another quantifier
+    while pattern.startswith('.*') and pattern[2:3] not in ('?', '*', '+', '{'):
+        pattern = pattern[2:]
+
+    # Remove trailing wildcards, unless the dot is escaped
+    while pattern.endswith('.*') and (len(pattern[:-2]) - len(pattern[:-2].rstrip('\\'))) % 2 == 0:
+        pattern = pattern[:-2]
+
+    return pattern
+
+
+def compile_filtering_options(filtering_options):
+    """This function compiles the regex filtering options so that every path can be checked in a single pass.
+
+    Inputs:
+        - filtering_options: List of filtering options to be used [list of tuples]
+
+    Outputs:
+        - ordered_options: List of valid filtering options, in order, with compiled patterns [list of tuples]
+        - exclude_regex: Combined pattern of every exclude option, or None if they can't be combined [regex]
+        - include_regex: Combined pattern of every include option, or None if they can't be combined [regex]
+    """
+
+    # Initialize variables
+    ordered_options = []
+    patterns = {'-': [], '+': []}
+
+    # Compile every option
+    for filtering_option in filtering_options:
+        try:
+            ordered_options.append((filtering_option[0], re.compile(filtering_option[1]).search))
+            patterns[filtering_option[0]].append(filtering_option[1])
+        except re.error:
+            logging.warning("\tUnable to process regex filter: {} {}".format(filtering_option[0], filtering_option[1]))
+            logging.warning("\t\tPlease ensure this is a valid regex format.")
+
+    # Combine the patterns of each type, unless they rely on group references
+    combined_regexes = []
+    for option_type in ('-', '+'):
+        try:
+            if any(re.search(r'\\[1-9]|\(\?P=', pattern) for pattern in patterns[option_type]):
+                raise re.error('Group references can not be combined')
+            combined_regexes.append(re.compile('|'.join('(?:{})'.format(simplify_pattern(pattern))
+                                                        for pattern in patterns[option_type])).search
+                                    if patterns[option_type] else None)
+        except re.error:
+            return ordered_options, None, None
+
+    return ordered_options, combined_regexes[0], combined_regexes[1]
+
+
+def check_file(file_path, ordered_options, exclude_regex, include_regex):
+    """This function determines if a file should be included, based on the ordered include and exclude options.
+
+    Every file starts out included. Options are applied in order: an include option adds another reference to the
+    file and an exclude option removes one, if there are any left. The file is included if any references remain.
+
+    Inputs:
+        - file_path: Path of the file of interest [string]
+        - ordered_options: List of valid filtering options, in order, with compiled patterns [list of tuples]
+        - exclude_regex: Combined pattern of every exclude option, or None if they can't be combined [regex]
+        - include_regex: Combined pattern of every include option, or None if they can't be combined [regex]
+
+    Outputs:
+        - include: Should the file be included? [bool]
+    """
+
+    # Use the combined patterns when only one type of option applies
+    if exclude_regex is not None or include_regex is not None or not ordered_options:
+        excluded = exclude_regex is not None and exclude_regex(file_path) is not None
+        included = include_regex is not None and include_regex(file_path) is not None
+        if not (excluded and included):
+            return not excluded
+
+    # Otherwise, apply every option in order
+    reference_count = 1
+    for option_type, option_regex in ordered_options:
+        if option_regex(file_path):
+            if option_type == '+':
+                reference_count = reference_count + 1
+            elif reference_count > 0:
+                reference_count = reference_count - 1
+
+    return reference_count > 0
+
+
+def profile_filtering_options(file_list, ordered_options, profile):
+    """This function records the number of files matched and the time spent for every regex filtering option.
+
+    Inputs:
+        - file_list: Paths of every file that was checked [list of strings]
+        - ordered_options: List of valid filtering options, in order, with compiled patterns [list of tuples]
+        - profile: Filtering profile to be updated [dict]
+    """
+
+    # Evaluate every option against every file
+    for option_type, option_regex in ordered_options:
+        start_time = time.perf_counter()
+        hits = sum(1 for file_path in file_list if option_regex(file_path))
+        filter_profile.record_rule(profile, 'SCRUBFilters', '{} {}'.format(option_type, option_regex.__self__.pattern),
+                                   hits, time.perf_counter() - start_time)
+
+
+def create_file_list(source_root_dir, filtering_output_file, filtering_options_file, initial_filtering_list='',
+                     profile=None):
     """This function creates a list of the files that will be included in SCRUB analysis.
 
     Inputs:
@@ -42,6 +158,7 @@ def create_file_list(source_root_dir, filtering_output_file, filtering_options_f
         - filtering_options_file: Absolute path to the filtering file to be used to create list of analysis files
                                   [string]
         - initial_filtering_list: Absolute path to the file containing an initial set of files [string]
+        - profile: Filtering profile to be updated with the cost and effect of every option [dict] [optional]
     """
 
     # Make sure the inputs are pathlib objects
@@ -97,24 +214,24 @@ def create_file_list(source_root_dir, filtering_output_file, filtering_options_f
         # Parse the filtering file
         filtering_options = parse_filtering_file(default_filtering_options_file)
 
-    # Modify the list based on the include and exclude options
-    filtered_file_list = raw_file_list.copy()
-    for filtering_option in filtering_options:
-        try:
-            regex_option = re.compile(filtering_option[1]).search
-            for file_path in list(filter(regex_option, raw_file_list)):
-                # if filtering_option[0] == '-' and os.path.exists(file_path):
-                if filtering_option[0] == '-' and file_path in filtered_file_list:
-                    logging.debug('\tRemoving file from filtering list: %s', file_path)
-                    filtered_file_list.remove(file_path)
-
-                # elif filtering_option[0] == '+' and os.path.exists(file_path):
-                elif filtering_option[0] == '+':
-                    logging.debug('\tAdding file to filtering list: %s', file_path)
-                    filtered_file_list.append(file_path)
-        except:
-            logging.warning("\tUnable to process regex filter: {} {}".format(filtering_option[0], filtering_option[1]))
-            logging.warning("\t\tPlease ensure this is a valid regex format.")
+    # Compile the filtering patterns
+    compiled_options = compile_filtering_options(filtering_options)
+
+    # Evaluate every pattern against each file once
+    start_time = time.perf_counter()
+    unique_file_list = list(dict.fromkeys(raw_file_list))
+    filtered_file_list = []
+    for file_path in unique_file_list:
+        if check_file(file_path, *compiled_options):
+            filtered_file_list.append(file_path)
+        else:
+            logging.debug('\tRemoving file from filtering list: %s', file_path)
+    filter_profile.record_stage(profile, 'analysis_files', time.perf_counter() - start_time, len(unique_file_list),
+                                len(unique_file_list) - len(filtered_file_list))
+
+    # Record the effect of every option
+    if profile is not None:
+        profile_filtering_options(unique_file_list, compiled_options[0], profile)
 
     # Print the results to the output file
     filtered_file_list.sort()
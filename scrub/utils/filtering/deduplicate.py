@@ -0,0 +1,205 @@
+import re
+import time
+import logging
+from scrub.tools.parsers import translate_results
+from scrub.utils import path_cache
+from scrub.utils.filtering import filter_profile
+
+# Rules of different tools that report the same kind of defect, keyed by rule category. Rule names are lower case and
+# include any language prefix used by the tool (e.g. cpp:s1481 for SonarQube).
+RULE_CATEGORIES = {
+    'unused variable': ['-wunused-variable', '-wunused-but-set-variable', 'cpp/unused-local-variable',
+                        'py/unused-local-variable', 'unused-variable', 'c:s1481', 'cpp:s1481', 'java:s1481',
+                        'python:s1481', 'pw.set_but_not_used'],
+    'unused parameter': ['-wunused-parameter', 'unused-argument', 'c:s1172', 'cpp:s1172', 'java:s1172',
+                         'python:s1172'],
+    'unused function': ['-wunused-function', 'cpp/unused-static-function', 'c:s1144', 'cpp:s1144', 'java:s1144'],
+    'unused import': ['py/unused-import', 'unused-import', 'java:s1128'],
+    'unused value': ['-wunused-value', 'unused_value', 'lang.struct.uuval'],
+    'uninitialized variable': ['-wuninitialized', '-wmaybe-uninitialized', 'cpp/uninitialized-local', 'uninit',
+                               'lang.mem.uvar', 'c:s836', 'cpp:s836'],
+    'null dereference': ['-wnull-dereference', 'forward_null', 'null_returns', 'reverse_inull', 'lang.mem.npd',
+                         'c:s2259', 'cpp:s2259', 'java:s2259'],
+    'use after free': ['-wuse-after-free', 'cpp/use-after-free', 'use_after_free', 'lang.mem.uaf'],
+    'memory leak': ['cpp/memory-never-freed', 'cpp/memory-may-not-be-freed', 'resource_leak', 'alloc.leak',
+                    'c:s3584', 'cpp:s3584'],
+    'buffer overrun': ['-warray-bounds', '-wstringop-overflow', 'cpp/static-buffer-overflow', 'overrun',
+                       'lang.mem.bo', 'c:s3519', 'cpp:s3519'],
+    'division by zero': ['-wdiv-by-zero', 'divide_by_zero', 'lang.arith.divzero', 'c:s3518', 'cpp:s3518'],
+    'missing return': ['-wreturn-type', 'cpp/missing-return', 'missing_return', 'lang.struct.mrs', 'c:s935',
+                       'cpp:s935'],
+    'implicit fallthrough': ['-wimplicit-fallthrough', 'missing_break', 'c:s128', 'cpp:s128', 'java:s128'],
+    'unreachable code': ['-wunreachable-code', 'deadcode', 'lang.struct.uc', 'c:s1763', 'cpp:s1763', 'java:s1763'],
+    'non constant format string': ['-wformat-security', '-wformat-nonliteral', 'cpp/non-constant-format'],
+    'shadowed declaration': ['-wshadow', 'cpp/local-variable-hides-global-variable', 'cpp/declaration-hides-variable',
+                             'cpp/declaration-hides-parameter', 'redefined-outer-name', 'c:s1117', 'cpp:s1117',
+                             'java:s1117'],
+}
+
+# Rule category of every rule in the table, keyed by rule name
+RULE_CATEGORY_INDEX = {rule_name: rule_category for rule_category, rule_names in RULE_CATEGORIES.items()
+                       for rule_name in rule_names}
+
+# Compiler flag that generated a warning, found at the end of a compiler warning description
+COMPILER_FLAG_REGEX = re.compile(r'\[(-W[\w+=-]+)\]')
+
+
+def normalize_rule(query):
+    """This function reduces a query name to a category that can be compared across tools.
+
+    Query names that are listed in RULE_CATEGORIES are mapped to their category, which links rules that have unrelated
+    names in different tools (e.g. `-Wunused-variable`, `cpp/unused-local-variable`, and `cpp:S1481`). For any other
+    query name, only the last component is kept, compiler flag prefixes are removed, and the remaining words are lower
+    cased and sorted. For example, `-Wfloat-equal` and `float_equal` both become `equal float`.
+
+    Inputs:
+        - query: Name of the query that generated the warning [string]
+
+    Outputs:
+        - rule_category: Normalized rule category [string]
+    """
+
+    # Use the mapping table if the rule is listed
+    rule_category = RULE_CATEGORY_INDEX.get(query.strip().lower())
+    if rule_category is not None:
+        return rule_category
+
+    # Keep the last component of the query name
+    rule_name = re.split(r'[/\\.:]', query.strip())[-1].lower()
+
+    # Remove compiler flag prefixes
+    rule_name = re.sub(r'^-w(no-)?', '', rule_name)
+
+    return ' '.join(sorted(re.findall(r'[a-z0-9]+', rule_name)))
+
+
+def get_rule_name(warning):
+    """This function gets the name of the rule that generated a warning.
+
+    Compiler warnings do not have a query name, so the compiler flag that is listed in the description is used instead.
+
+    Inputs:
+        - warning: Warning of interest [dict]
+
+    Outputs:
+        - rule_name: Name of the rule, or an empty string if it is not known [string]
+    """
+
+    # Use the query name if it exists
+    if warning['query'].strip():
+        return warning['query']
+
+    # Find the compiler flag
+    for description_line in reversed(warning['description']):
+        flag_match = COMPILER_FLAG_REGEX.search(description_line)
+        if flag_match:
+            return flag_match.group(1)
+
+    return ''
+
+
+def get_duplicate_key(warning):
+    """This function gets the value used to identify duplicate warnings.
+
+    Inputs:
+        - warning: Warning of interest [dict]
+
+    Outputs:
+        - duplicate_key: File, line, and normalized rule category of the warning, or None if the rule is not known and
+                         the warning can not be matched [tuple]
+    """
+
+    rule_category = normalize_rule(get_rule_name(warning))
+    if not rule_category:
+        return None
+
+    return str(warning['file']), int(warning['line']), rule_category
+
+
+def add_contributing_tool(warning, tool):
+    """This function records that another tool reported the same finding.
+
+    Inputs:
+        - warning: Canonical warning to be updated [dict]
+        - tool: Name of the tool that also reported the finding [string]
+
+    Outputs:
+        - added: Was the tool added to the list of contributing tools? [bool]
+    """
+
+    # Add the tool to the list
+    added = tool != warning['tool'] and tool not in warning['also_reported_by']
+    if added:
+        warning['also_reported_by'].append(tool)
+
+    return added
+
+
+def deduplicate_results(results_files, source_root, profile=None):
+    """This function collapses findings that are reported by more than one tool into a single canonical finding.
+
+    Findings are considered duplicates if they share a file, line, and normalized rule category. The first finding is
+    kept, in the order of the results files, and every other tool that reported it is added to its also_reported_by
+    list.
+
+    Inputs:
+        - results_files: Absolute paths to the filtered SCRUB output files [list of Path objects]
+        - source_root: Absolute path to the top level directory of the source code [Path object]
+        - profile: Filtering profile to be updated with the cost and effect of the stage [dict] [optional]
+
+    Outputs:
+        - duplicate_count: Number of findings that were removed [int]
+        - <tool>.scrub: Every results file is updated in place
+    """
+
+    # Print a status message
+    logging.info('')
+    logging.info('\tRemoving duplicate findings...')
+    logging.info('\t>> Executing command: deduplicate.deduplicate_results(<results_files>, %s)', source_root)
+
+    # Initialize variables
+    start_time = time.perf_counter()
+    canonical_warnings = {}
+    results_data = {}
+    duplicate_count = 0
+
+    # Find the duplicates in every results file
+    for results_file in results_files:
+        kept_warnings = []
+        for warning in translate_results.iterate_results(results_file, source_root):
+            duplicate_key = get_duplicate_key(warning)
+            canonical_warning = canonical_warnings.get(duplicate_key) if duplicate_key is not None else None
+
+            # Keep the first finding, findings that can not be matched, and findings that come from the same tool
+            if canonical_warning is None:
+                if duplicate_key is not None:
+                    canonical_warnings[duplicate_key] = warning
+                kept_warnings.append(warning)
+            elif canonical_warning['tool'] == warning['tool']:
+                kept_warnings.append(warning)
+
+            # Collapse findings from other tools into the canonical finding
+            else:
+                add_contributing_tool(canonical_warning, warning['tool'])
+                duplicate_count = duplicate_count + 1
+
+                # Print a status message
+                logging.debug('\tWarning removed - Duplicate of %s', canonical_warning['id'])
+                logging.debug('\t\t%s', warning['id'])
+
+        results_data[results_file] = kept_warnings
+
+    # Write out the updated results files
+    if duplicate_count:
+        for results_file, kept_warnings in results_data.items():
+            for warning in kept_warnings:
+                warning['file'] = path_cache.get_relative_path(warning['file'], source_root)
+            translate_results.create_scrub_output_file(kept_warnings, results_file)
+
+    # Print a status message
+    logging.info('\t>> Removed %d duplicate findings.', duplicate_count)
+    filter_profile.record_stage(profile, 'deduplication', time.perf_counter() - start_time,
+                                sum(len(kept_warnings) for kept_warnings in results_data.values()) + duplicate_count,
+                                duplicate_count)
+
+    return duplicate_count
@@ -1,10 +1,19 @@
 import os
+import time
 import logging
+import concurrent.futures
+import multiprocessing
 import traceback
 from scrub.utils.filtering import create_file_list
 from scrub.utils.filtering import filter_results
+from scrub.utils.filtering import deduplicate
+from scrub.utils.filtering import filter_profile
+from scrub.utils.filtering import suppression_index as suppression_index_module
 from scrub.utils import scrub_utilities
+from scrub.utils import results_database
+from scrub.utils import path_cache
 from scrub.tools.parsers import translate_results
+from scrub.tools.parsers import fingerprints
 
 
 def initialize_analysis(scrub_conf_data):
@@ -20,131 +29,164 @@ def initialize_analysis(scrub_conf_data):
     return scrub_conf_data
 
 
-def filter_scrub_results(scrub_conf_data):
-    """This function filters the raw SCRUB output files.
+def filter_results_group(input_files, output_file, scrub_conf_data, suppression_index=None, profile=None,
+                         log_queue=None):
+    """This function filters a group of raw SCRUB output files into a single filtered output file.
 
     Inputs:
+        - input_files: List of absolute paths to the raw SCRUB output files [list of Path objects]
+        - output_file: Absolute path to the filtered output file to be created [Path object]
         - scrub_conf_data: Dictionary of SCRUB configuration variables [dict]
+        - suppression_index: Dictionary of suppressed lines and regions, keyed by file path [dict] [optional]
+        - profile: Filtering profile to be updated with the cost and effect of every stage [dict] [optional]
+        - log_queue: Queue that log records are sent to when running in a worker process [Queue] [optional]
+
+    Outputs:
+        - cache_entry: Path, file signature, and normalized records of the filtered output file, or None if the file
+                       could not be generated [tuple]
+        - profile: Updated filtering profile, so it can be used by the parent process [dict]
     """
 
-    # Create a filtering list
-    create_file_list.create_file_list(scrub_conf_data.get('source_dir'),
+    # Send log records to the parent process, if necessary
+    if log_queue is not None:
+        scrub_utilities.initialize_worker_logger(log_queue)
+
+    try:
+        # Parse all the input files
+        start_time = time.perf_counter()
+        results = []
+        for results_file in input_files:
+            results.extend(translate_results.iterate_results(results_file, scrub_conf_data.get('source_dir')))
+        translate_results.discard_results(input_files)
+        filter_profile.record_stage(profile, 'parse', time.perf_counter() - start_time, len(results), 0)
+
+        # Filter the results
+        filter_results.filter_results(results, output_file,
                                       scrub_conf_data.get('filtering_output_file'),
-                                      scrub_conf_data.get('analysis_filters'))
+                                      scrub_conf_data.get('query_filters'),
+                                      scrub_conf_data.get('source_dir'),
+                                      scrub_conf_data.get('enable_micro_filter'),
+                                      scrub_conf_data.get('enable_ext_warnings'),
+                                      suppression_index,
+                                      scrub_conf_data.get('filter_rules'),
+                                      profile)
 
-    # Get the list of SCRUB files
-    results_files = list(scrub_conf_data.get('raw_results_dir').glob('*.scrub'))
+        # Return the filtered results so they can be used by the parent process
+        return (output_file.absolute(),) + translate_results.results_cache.get(output_file.absolute()), profile
 
-    # Remove files that have already been analyzed
-    for results_file in results_files:
-        tool_name = results_file.stem.split('_')[0]
-        if scrub_conf_data.get('scrub_working_dir').joinpath(tool_name + '.scrub').exists():
-            results_files.remove(results_file)
+    except:     # lgtm [py/catch-base-exception]
+        # Print a status message
+        logging.warning("Could not generate output file %s", output_file)
 
-    # Sort the files into groups
-    raw_compiler_files = []
-    raw_p10_files = []
-    raw_generic_files = []
-    for results_file in results_files:
-        if 'compiler_raw' in results_file.stem:
-            raw_compiler_files.append(results_file)
-        elif 'p10_raw' in results_file.stem:
-            raw_p10_files.append(results_file)
-        else:
-            raw_generic_files.append(results_file)
-
-    # Filter compiler results
-    if raw_compiler_files:
-        try:
-            # Set the compiler output file path
-            filtered_compiler_results_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('compiler.scrub')
-
-            # Parse all the input files
-            compiler_results = []
-            for results_file in raw_compiler_files:
-                # Append the results file
-                compiler_results = (compiler_results + translate_results.parse_scrub(results_file,
-                                                                                     scrub_conf_data.get('source_dir')))
-
-                # # # Append to the valid warning types
-                # valid_warning_types.append(results_file.stem.split('_')[0])
-
-            # Filter the results file
-            filter_results.filter_results(compiler_results, filtered_compiler_results_file,
-                                          scrub_conf_data.get('filtering_output_file'),
-                                          scrub_conf_data.get('query_filters'),
-                                          scrub_conf_data.get('source_dir'),
-                                          scrub_conf_data.get('enable_micro_filter'),
-                                          scrub_conf_data.get('enable_ext_warnings'))
-
-        except:      # lgtm [py/catch-base-exception]
-            # Print a status message
-            logging.warning("Could not generate output file %s", filtered_compiler_results_file)
+        # Print the exception traceback
+        logging.debug(traceback.format_exc())
 
-            # Print the exception traceback
-            logging.debug(traceback.format_exc())
+        return None, profile
 
-    # Filter P10 results
-    if raw_p10_files:
-        # Set the output file path
-        filtered_p10_results = scrub_conf_data.get('scrub_analysis_dir').joinpath('p10.scrub')
 
-        try:
-            # Parse all the input files
-            p10_results = []
-            for results_file in raw_p10_files:
-                # Append the results file
-                p10_results = (p10_results + translate_results.parse_scrub(results_file,
-                                                                           scrub_conf_data.get('source_dir')))
-
-                # # # Append to the valid warning types
-                # valid_warning_types.append(results_file.stem.split('_')[0])
-
-            filter_results.filter_results(p10_results, filtered_p10_results,
-                                          scrub_conf_data.get('filtering_output_file'),
-                                          scrub_conf_data.get('query_filters'),
-                                          scrub_conf_data.get('source_dir'),
-                                          scrub_conf_data.get('enable_micro_filter'),
-                                          scrub_conf_data.get('enable_ext_warnings'))
+def filter_scrub_results(scrub_conf_data, profile=None):
+    """This function filters the raw SCRUB output files.
 
-        except:     # lgtm [py/catch-base-exception]
-            # Print a status message
-            logging.warning("Could not generate output file %s", filtered_p10_results)
+    Each group of results (all compilers, all P10 engines, and each remaining tool) is independent, so the groups are
+    filtered in parallel, with each worker writing its own output file. Workers send their log records back to the
+    parent process, which writes them to the filtering log.
 
-            # Print the exception traceback
-            logging.debug(traceback.format_exc())
+    Inputs:
+        - scrub_conf_data: Dictionary of SCRUB configuration variables [dict]
+        - profile: Filtering profile to be updated with the cost and effect of every stage [dict] [optional]
+    """
 
-    # Filter everything else
-    if raw_generic_files:
-        for raw_generic_file in raw_generic_files:
-            # Get the output file name
-            tool_name = raw_generic_file.stem.split('_')[0]
-            filtered_generic_results = scrub_conf_data.get('scrub_analysis_dir').joinpath(tool_name + '.scrub')
+    # Create a filtering list
+    create_file_list.create_file_list(scrub_conf_data.get('source_dir'),
+                                      scrub_conf_data.get('filtering_output_file'),
+                                      scrub_conf_data.get('analysis_filters'),
+                                      profile=profile)
+
+    # Find every suppression in the files that will be analyzed
+    suppression_index = None
+    if scrub_conf_data.get('enable_micro_filter'):
+        start_time = time.perf_counter()
+        with open(scrub_conf_data.get('filtering_output_file'), 'r') as input_fh:
+            analysis_files = [scrub_conf_data.get('source_dir').joinpath(line.strip()) for line in input_fh
+                              if line.strip()]
+        suppression_index = suppression_index_module.create_suppression_index(
+            analysis_files, scrub_conf_data.get('suppression_index_file'))
+        filter_profile.record_stage(profile, 'suppression_index', time.perf_counter() - start_time,
+                                    len(analysis_files), 0)
+
+    # Get the list of SCRUB files, removing files that have already been analyzed
+    results_files = [results_file for results_file in scrub_conf_data.get('raw_results_dir').glob('*.scrub')
+                     if not scrub_conf_data.get('scrub_working_dir')
+                     .joinpath(results_file.stem.split('_')[0] + '.scrub').exists()]
 
+    # Sort the files into groups
+    filtering_groups = {}
+    for results_file in sorted(results_files):
+        if 'compiler_raw' in results_file.stem:
+            output_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('compiler.scrub')
+        elif 'p10_raw' in results_file.stem:
+            output_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('p10.scrub')
+        else:
+            output_file = scrub_conf_data.get('scrub_analysis_dir').joinpath(results_file.stem.split('_')[0] +
+                                                                            '.scrub')
+        filtering_groups.setdefault(output_file, []).append(results_file)
+
+    # Filter the groups
+    worker_count = min(len(filtering_groups), os.cpu_count() or 1)
+    if worker_count > 1:
+        with multiprocessing.Manager() as log_manager:
+            log_queue = log_manager.Queue()
+            log_listener = scrub_utilities.start_log_listener(log_queue)
             try:
-                # Import the warning data
-                raw_generic_warnings = translate_results.parse_scrub(raw_generic_file,
-                                                                     scrub_conf_data.get('source_dir'))
-
-                filter_results.filter_results(raw_generic_warnings, filtered_generic_results,
-                                              scrub_conf_data.get('filtering_output_file'),
-                                              scrub_conf_data.get('query_filters'),
-                                              scrub_conf_data.get('source_dir'),
-                                              scrub_conf_data.get('enable_micro_filter'),
-                                              scrub_conf_data.get('enable_ext_warnings'))
-
-            except:     # lgtm [py/catch-base-exception]
-                # Print a status message
-                logging.warning("Could not generate output file %s", filtered_generic_results)
-
-                # Print the exception traceback
-                logging.debug(traceback.format_exc())
+                with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+                    group_results = list(executor.map(filter_results_group, filtering_groups.values(),
+                                                      filtering_groups.keys(),
+                                                      [scrub_conf_data] * len(filtering_groups),
+                                                      [suppression_index] * len(filtering_groups),
+                                                      [filter_profile.create_profile() if profile is not None
+                                                       else None] * len(filtering_groups),
+                                                      [log_queue] * len(filtering_groups)))
+            finally:
+                log_listener.stop()
+
+        # Keep the filtered results in memory for the later stages, and combine the profiles of every group
+        for cache_entry, group_profile in group_results:
+            if cache_entry is not None:
+                translate_results.results_cache[cache_entry[0]] = cache_entry[1:]
+            if group_profile is not None:
+                filter_profile.merge_profiles(profile, group_profile)
+
+    else:
+        for output_file, input_files in filtering_groups.items():
+            filter_results_group(input_files, output_file, scrub_conf_data, suppression_index, profile)
+
+    # The raw results are no longer needed once every group has been filtered
+    translate_results.clear_results_cache(scrub_conf_data.get('scrub_analysis_dir'))
+
+    # Collapse findings that are reported by more than one tool
+    if scrub_conf_data.get('enable_deduplication'):
+        deduplicate.deduplicate_results(sorted(scrub_conf_data.get('scrub_analysis_dir').glob('*.scrub')),
+                                        scrub_conf_data.get('source_dir'), profile)
 
     # Execute the custom filtering command if it exists
     if scrub_conf_data.get('custom_filter_cmd'):
         scrub_utilities.execute_command(str(scrub_conf_data.get('custom_filter_cmd')), os.environ.copy())
 
 
+def remove_stale_sarif(sarif_output_file, sarif_format):
+    """This function removes a SARIF output file that was written in a different SARIF output format.
+
+    Inputs:
+        - sarif_output_file: Absolute path to the uncompressed SARIF output file [Path object]
+        - sarif_format: SARIF output format that will be used (pretty, compact, or gzip) [string]
+    """
+
+    for stale_file in (sarif_output_file, translate_results.get_sarif_output_path(sarif_output_file, 'gzip')):
+        if stale_file.exists() and stale_file != translate_results.get_sarif_output_path(sarif_output_file,
+                                                                                          sarif_format):
+            stale_file.unlink()
+
+
 def generate_sarif(scrub_conf_data):
     """This function converts SCRUB formatted output files into SARIF.
 
@@ -153,32 +195,55 @@ def generate_sarif(scrub_conf_data):
     """
 
     # Find all the SCRUB output files
-    scrub_files = scrub_conf_data.get('scrub_analysis_dir').glob('*.scrub')
+    scrub_files = sorted(scrub_conf_data.get('scrub_analysis_dir').glob('*.scrub'))
 
     for scrub_file in scrub_files:
         # Create the SARIF output file path
         sarif_output_file = scrub_conf_data.get('sarif_results_dir').joinpath(scrub_file.stem + '.sarif')
 
+        # Remove any output from a different SARIF output format
+        remove_stale_sarif(sarif_output_file, scrub_conf_data.get('sarif_output_format'))
+
         # Create a SARIF output file
         translate_results.perform_translation(scrub_file, sarif_output_file, scrub_conf_data.get('source_dir'),
-                                              'sarifv2.1.0')
-
-
-def run_analysis(scrub_conf_data, console_logging=logging.INFO, override=False):
+                                              'sarifv2.1.0', scrub_conf_data.get('sarif_output_format'),
+                                              scrub_conf_data.get('sarif_snippets'))
+
+    # Create a single SARIF output file that contains every tool, if necessary
+    if scrub_conf_data.get('sarif_merged_output'):
+        merged_sarif_file = scrub_conf_data.get('merged_sarif_file')
+        remove_stale_sarif(merged_sarif_file, scrub_conf_data.get('sarif_output_format'))
+        translate_results.create_merged_sarif_output_file(
+            ((scrub_file.stem, translate_results.parse_scrub(scrub_file, scrub_conf_data.get('source_dir')))
+             for scrub_file in scrub_files),
+            translate_results.get_sarif_output_path(merged_sarif_file, scrub_conf_data.get('sarif_output_format')),
+            scrub_conf_data.get('source_dir'), scrub_conf_data.get('sarif_output_format'),
+            scrub_conf_data.get('sarif_snippets'))
+
+
+def run_analysis(scrub_conf_data, console_logging=logging.INFO, override=False, filter_profile_enabled=False):
     """This function performs results filtering of raw analysis results.
 
     Inputs:
         - baseline_conf_data: Dictionary of raw scrub.cfg configuration parameters [dict]
         - console_logging: Level of console logging information to print to console [optional] [enum]
         - override: Force tool execution? [optional] [bool]
+        - filter_profile_enabled: Record the cost and effect of every filtering stage and rule? [optional] [bool]
 
     Outputs:
         - log_file/filtering.log: SCRUB log file for the filtering analysis
         - <tool>.scrub: SCRUB-formatted results file after filtering
+        - results.db: SQLite database of all filtered results and metrics
+        - filter_profile.json: Filtering profile, if profiling is enabled
     """
 
     # Initialize the analysis
     filtering_conf_data = initialize_analysis(scrub_conf_data)
+    path_cache.clear()
+    fingerprints.clear()
+
+    # Keep only the raw results of this run in memory
+    translate_results.clear_results_cache(scrub_conf_data.get('raw_results_dir'))
 
     # Initialize variables
     filtering_exit_code = 2
@@ -199,7 +264,12 @@ def run_analysis(scrub_conf_data, console_logging=logging.INFO, override=False):
             # do_clean.clean_subdirs(scrub_conf_data.get('source_dir'))
 
             # Filter the results
-            filter_scrub_results(scrub_conf_data)
+            profile = filter_profile.create_profile() if filter_profile_enabled else None
+            filter_scrub_results(scrub_conf_data, profile)
+
+            # Write out the filtering profile
+            if profile is not None:
+                filter_profile.write_profile(profile, scrub_conf_data.get('filter_profile_file'))
 
             # Check the status of all the filtered SCRUB output files
             for output_file in scrub_conf_data.get('scrub_analysis_dir').glob('*.scrub'):
@@ -208,8 +278,15 @@ def run_analysis(scrub_conf_data, console_logging=logging.INFO, override=False):
             # Convert the results into SARIF format
             generate_sarif(scrub_conf_data)
 
+            # Update the results database
+            results_database.update_results_database(scrub_conf_data.get('results_database_file'),
+                                                     scrub_conf_data.get('scrub_analysis_dir'),
+                                                     scrub_conf_data.get('source_dir'))
+
             # Check the status of all the filtered SARIF output files
-            for output_file in scrub_conf_data.get('scrub_analysis_dir').glob('sarif_results/*.sarif'):
+            for output_file in scrub_conf_data.get('scrub_analysis_dir').glob('sarif_results/*.sarif*'):
+                scrub_utilities.check_artifact(output_file, False)
+            for output_file in scrub_conf_data.get('scrub_analysis_dir').glob('scrub_all.sarif*'):
                 scrub_utilities.check_artifact(output_file, False)
 
             # Set the exit code
@@ -0,0 +1,98 @@
+import json
+import logging
+
+
+def create_profile():
+    """This function creates an empty filtering profile.
+
+    Outputs:
+        - profile: Time spent and warnings removed by every filtering stage, and hits and time for every rule [dict]
+    """
+
+    return {'stages': {}, 'rules': {}}
+
+
+def record_stage(profile, stage, elapsed_time, checked, removed):
+    """This function adds the cost and effect of a filtering stage to a profile.
+
+    Inputs:
+        - profile: Filtering profile to be updated, or None if profiling is disabled [dict]
+        - stage: Name of the filtering stage [string]
+        - elapsed_time: Time spent in the stage, in seconds [float]
+        - checked: Number of items that were checked by the stage [int]
+        - removed: Number of items that were removed by the stage [int]
+    """
+
+    if profile is not None:
+        stage_data = profile['stages'].setdefault(stage, {'time': 0.0, 'checked': 0, 'removed': 0})
+        stage_data['time'] = stage_data['time'] + elapsed_time
+        stage_data['checked'] = stage_data['checked'] + checked
+        stage_data['removed'] = stage_data['removed'] + removed
+
+
+def record_rule(profile, rules_source, rule, hits, elapsed_time=0.0):
+    """This function adds the cost and effect of a single filtering rule to a profile.
+
+    Rules should be recorded even if they have no hits, so that unused rules can be identified.
+
+    Inputs:
+        - profile: Filtering profile to be updated, or None if profiling is disabled [dict]
+        - rules_source: Name of the file that defines the rule (e.g. SCRUBFilters) [string]
+        - rule: Text or name of the rule [string]
+        - hits: Number of items matched by the rule [int]
+        - elapsed_time: Time spent evaluating the rule, in seconds [float] [optional]
+    """
+
+    if profile is not None:
+        rule_data = profile['rules'].setdefault(rules_source, {}).setdefault(rule, {'hits': 0, 'time': 0.0})
+        rule_data['hits'] = rule_data['hits'] + hits
+        rule_data['time'] = rule_data['time'] + elapsed_time
+
+
+def merge_profiles(profile, other_profile):
+    """This function adds the contents of one filtering profile to another.
+
+    Inputs:
+        - profile: Filtering profile to be updated [dict]
+        - other_profile: Filtering profile to be added [dict]
+    """
+
+    for stage, stage_data in other_profile.get('stages', {}).items():
+        record_stage(profile, stage, stage_data['time'], stage_data['checked'], stage_data['removed'])
+    for rules_source, rules in other_profile.get('rules', {}).items():
+        for rule, rule_data in rules.items():
+            record_rule(profile, rules_source, rule, rule_data['hits'], rule_data['time'])
+
+
+def write_profile(profile, profile_file):
+    """This function adds a filtering profile to the profile file, sorting the rules from most to least expensive.
+
+    Inputs:
+        - profile: Filtering profile to be written [dict]
+        - profile_file: Absolute path to the filtering profile file [Path object]
+
+    Outputs:
+        - filter_profile.json: Profile file, including the contents of any previous profile in the file
+    """
+
+    # Include the previous profile, since filtering is performed after each tool
+    combined_profile = create_profile()
+    if profile_file.is_file():
+        try:
+            with open(profile_file, 'r') as input_fh:
+                merge_profiles(combined_profile, json.load(input_fh))
+        except (ValueError, KeyError):
+            logging.warning('\tFiltering profile %s could not be read and will be replaced.', profile_file)
+    merge_profiles(combined_profile, profile)
+
+    # Sort the rules so the most expensive appear first
+    for rules_source, rules in combined_profile['rules'].items():
+        combined_profile['rules'][rules_source] = dict(sorted(rules.items(),
+                                                              key=lambda rule: (-rule[1]['time'], rule[1]['hits'])))
+
+    # Write out the profile
+    with open(profile_file, 'w') as output_fh:
+        json.dump(combined_profile, output_fh, indent=4)
+
+    # Print a status message
+    logging.info('\t>> Filtering profile written to %s', profile_file)
@@ -1,60 +1,137 @@
 import re
+import time
+import fnmatch
+import collections
 import pathlib
 import logging
 from scrub.tools.parsers import translate_results
+from scrub.utils import line_cache
+from scrub.utils import path_cache
+from scrub.utils.filtering import warning_store as warning_store_module
+from scrub.utils.filtering import suppression_index as suppression_index_module
+from scrub.utils.filtering import filter_rules
+from scrub.utils.filtering import filter_profile
 
 
 # Initialize variables
 suppression_lines = []
+query_filter_cache = {}
 filtering_aliases = {'gcc': ['cmp', 'compiler', 'gcc'],
                      'gbuild': ['cmp', 'compiler', 'gbuild', 'dblchck', 'doublecheck'],
                      'javac': ['cmp', 'compiler', 'javac'],
                      'pylint': ['cmp', 'compiler', 'pylint'],
                      'coverity': ['coverity', 'cov'],
-                     'codesonar': ['codesonar', 'cdsnr']
+                     'codesonar': ['codesonar', 'cdsnr'],
+                     'codeql': ['codeql'],
+                     'sonarqube': ['sonarqube']
                      }
 
 
-def micro_filter_check(source_file, warning_line, valid_warning_types):
+def suppression_check(line, valid_warning_types):
+    """This function checks to see if a line of source code suppresses warnings of the given types.
+
+    Inputs:
+        - line: Lower case, stripped line of source code [string]
+        - valid_warning_types: List of strings containing valid types for each tool [list of strings]
+
+    Outputs:
+        - ignore_line: Indicator if warning should be ignored [bool]
+    """
+
+    # Check for suppression syntax
+    if 'scrub_ignore_warning' in line or '@suppress' in line:
+        for check_type in valid_warning_types:
+            if check_type in line:
+                return True
+
+    return False
+
+
+def region_check(regions, valid_warning_types):
+    """This function checks to see if any suppressed region suppresses warnings of the given types.
+
+    Inputs:
+        - regions: Lower case, stripped scrub_ignore_begin lines of the regions containing the warning [list of strings]
+        - valid_warning_types: List of strings containing valid types for each tool [list of strings]
+
+    Outputs:
+        - ignore_line: Indicator if warning should be ignored [bool]
+    """
+
+    for region in regions:
+        for check_type in valid_warning_types:
+            if check_type in region:
+                return True
+
+    return False
+
+
+def get_file_suppressions(source_file, suppression_index=None):
+    """This function gets the suppressed lines and regions of a source file.
+
+    Files that are not part of the suppression index are scanned through the shared line cache and added to it.
+
+    Inputs:
+        - source_file: Absolute path to the source code file of interest [string]
+        - suppression_index: Dictionary of suppressed lines and regions, keyed by canonical file path [dict]
+          [optional]
+
+    Outputs:
+        - file_suppressions: Suppressed lines and region index for the file [dict]
+    """
+
+    # Check the index
+    index_key = str(path_cache.resolve_path(source_file))
+    if suppression_index is not None and index_key in suppression_index:
+        return suppression_index[index_key]
+
+    # Scan the file
+    file_suppressions = suppression_index_module.create_file_entry(
+        *suppression_index_module.scan_data(line_cache.source_line_cache.get_file(source_file)[0]))
+
+    # Add the file to the index
+    if suppression_index is not None:
+        suppression_index[index_key] = file_suppressions
+
+    return file_suppressions
+
+
+def micro_filter_check(source_file, warning_line, valid_warning_types, suppression_index=None):
     """This function checks to see if a warning has been marked as a false positive by the user.
 
     Inputs:
         - source_file: Absolute path to the source code file of interest [string]
         - warning_line: Line of interest of source code file [int]
         - valid_warning_types: List of strings containing valid types for each tool [list of strings]
+        - suppression_index: Dictionary of suppressed lines and regions, keyed by file path [dict] [optional]
 
     Outputs:
         - ignore_line: Indicator if warning should be ignored [bool]
     """
-    # Set the base string
-    ignore_base = "scrub_ignore_warning"
 
     # Initialize the return value
     ignore_line = False
 
-    try:
-        # Get the line of interest
-        with open(source_file, 'r', errors='ignore') as input_fh:
-            # Read the lines
-            if warning_line == 0:
-                line = input_fh.readlines()[0]
-            else:
-                line = input_fh.readlines()[warning_line - 1]
-
-        # Check for suppression syntax
-        l_line = line.lower().strip()
-        if ignore_base in l_line or '@suppress' in l_line:
-            for check_type in valid_warning_types:
-                if check_type in l_line:
-                    # Print a status message
-                    logging.debug('\tWarning removed - Warning has been marked as a false positive')
-                    logging.debug('\t\t{}: {}'.format(str(source_file), str(warning_line)))
-                    logging.debug('\t\t%s', line)
-
-                    # Update the output
-                    ignore_line = True
+    # Warnings on line 0 are checked against the first line
+    if warning_line == 0:
+        warning_line = 1
 
-                    break
+    try:
+        # Get the suppressions for the file
+        file_suppressions = get_file_suppressions(source_file, suppression_index)
+        l_line = file_suppressions['lines'].get(warning_line, '')
+
+        # Check for suppression syntax on the line, or a suppressed region containing the line
+        if (suppression_check(l_line, valid_warning_types) or
+                region_check(suppression_index_module.find_regions(file_suppressions['regions'], warning_line),
+                             valid_warning_types)):
+            # Print a status message
+            logging.debug('\tWarning removed - Warning has been marked as a false positive')
+            logging.debug('\t\t{}: {}'.format(str(source_file), str(warning_line)))
+            logging.debug('\t\t%s', l_line)
+
+            # Update the output
+            ignore_line = True
 
     except IOError:
         logging.warning('\t\tMicro-filter warning')
@@ -64,19 +141,26 @@ def micro_filter_check(source_file, warning_line, valid_warning_types):
     return ignore_line
 
 
-def ignore_query_check(warning_tool, warning_query, ignore_queries_file):
-    """This function checks if a result should be skipped based on the type of query.
+def compile_query_filters(ignore_queries_file):
+    """This function compiles the SCRUBExcludeQueries file into structures that can be checked in constant time.
+
+    Each line of the file has the form <tool>:<query>. Queries are compared exactly, unless they contain glob
+    characters (*, ?, [) or start with "re:", in which case they are treated as a glob or regular expression that must
+    match the entire query name. All patterns for a tool are combined into a single regular expression.
 
     Inputs:
-        - line: Line of interest from SCRUB results [string]
-        - ignore_queries_file: Full path to the SCRUBExcludeQueries file [string]
+        - ignore_queries_file: Full path to the SCRUBExcludeQueries file [Path object]
 
     Outputs:
-        - skip: Indicator if result should be filtered out [bool]
+        - query_filters: Set of exact (tool, query) pairs, a dictionary of compiled patterns per tool, and a list of
+                         every individual (line, tool, query, pattern) rule [tuple]
     """
 
-    # Initialize the variables
-    skip = False
+    # Initialize variables
+    exact_queries = set()
+    tool_patterns = {}
+    compiled_patterns = {}
+    query_rules = []
 
     # Import the ignore data
     if ignore_queries_file.is_file():
@@ -85,22 +169,122 @@ def ignore_query_check(warning_tool, warning_query, ignore_queries_file):
 
         # Iterate through every line of the ignore data
         for ignore_line in ignore_queries:
-            # Split the line and store the values
-            ignore_line_split = list(filter(None, re.split(':', ignore_line.strip())))
-            ignore_tool = ignore_line_split[0].strip().lower()
-            ignore_query = ignore_line_split[1].strip()
+            # Skip blank lines and lines without a query
+            ignore_line = ignore_line.strip()
+            if ':' not in ignore_line:
+                continue
+
+            # Split the line at the first separator and store the values
+            ignore_tool, ignore_query = ignore_line.split(':', 1)
+            ignore_tool = ignore_tool.strip().lower()
+            ignore_query = ignore_query.strip()
+
+            # Sort the query into the correct group
+            if ignore_query.startswith('re:'):
+                exact_query = None
+                pattern = ignore_query[3:]
+            elif any(character in ignore_query for character in '*?['):
+                # Query names may contain glob characters themselves, so keep the exact match as well
+                exact_query = ignore_query
+                exact_queries.add((ignore_tool, ignore_query))
+                pattern = fnmatch.translate(ignore_query)
+            else:
+                exact_queries.add((ignore_tool, ignore_query))
+                query_rules.append((ignore_line, ignore_tool, ignore_query, None))
+                continue
+
+            # Make sure the pattern is valid
+            try:
+                query_rules.append((ignore_line, ignore_tool, exact_query, re.compile(pattern).fullmatch))
+            except re.error:
+                logging.warning('\tQuery filter %s is not a valid pattern and will be ignored.', ignore_line)
+                continue
+
+            tool_patterns.setdefault(ignore_tool, []).append('(?:{})'.format(pattern))
+
+    # Combine the patterns for each tool
+    for ignore_tool, patterns in tool_patterns.items():
+        compiled_patterns[ignore_tool] = re.compile('|'.join(patterns))
 
-            # Determine if the ine should be skipped
-            if (ignore_tool == warning_tool) and (ignore_query == warning_query):
-                skip = True
+    return exact_queries, compiled_patterns, query_rules
 
-                # Print a status message
-                logging.debug('\tWarning removed - Warning generated by a filtered query')
-                logging.debug('\t\t%s: %s', warning_tool, warning_query)
+
+def get_query_filters(ignore_queries_file):
+    """This function gets the compiled query filters, only compiling the SCRUBExcludeQueries file when it changes.
+
+    Inputs:
+        - ignore_queries_file: Full path to the SCRUBExcludeQueries file [Path object]
+
+    Outputs:
+        - query_filters: Set of exact (tool, query) pairs, a dictionary of compiled patterns per tool, and a list of
+                         every individual (line, tool, query, pattern) rule [tuple]
+    """
+
+    # Get the file signature
+    try:
+        file_stat = ignore_queries_file.stat()
+        file_signature = (file_stat.st_mtime_ns, file_stat.st_size)
+    except OSError:
+        file_signature = None
+
+    # Compile the file if necessary
+    cached_filters = query_filter_cache.get(str(ignore_queries_file))
+    if cached_filters is None or cached_filters[0] != file_signature:
+        cached_filters = (file_signature, compile_query_filters(ignore_queries_file))
+        query_filter_cache[str(ignore_queries_file)] = cached_filters
+
+    return cached_filters[1]
+
+
+def ignore_query_check(warning_tool, warning_query, ignore_queries_file):
+    """This function checks if a result should be skipped based on the type of query.
+
+    Inputs:
+        - warning_tool: Name of the tool that generated the warning [string]
+        - warning_query: Name of the query that generated the warning [string]
+        - ignore_queries_file: Full path to the SCRUBExcludeQueries file [Path object]
+
+    Outputs:
+        - skip: Indicator if result should be filtered out [bool]
+    """
+
+    # Get the compiled filters
+    exact_queries, compiled_patterns, _ = get_query_filters(ignore_queries_file)
+
+    # Determine if the warning should be skipped
+    skip = (warning_tool, warning_query) in exact_queries
+    if not skip and warning_tool in compiled_patterns:
+        skip = compiled_patterns[warning_tool].fullmatch(warning_query) is not None
+
+    if skip:
+        # Print a status message
+        logging.debug('\tWarning removed - Warning generated by a filtered query')
+        logging.debug('\t\t%s: %s', warning_tool, warning_query)
 
     return skip
 
 
+def profile_query_filters(query_counts, ignore_queries_file, profile):
+    """This function records the hits and time spent for every individual rule in the SCRUBExcludeQueries file.
+
+    Inputs:
+        - query_counts: Number of warnings for every distinct (tool, query) pair [Counter]
+        - ignore_queries_file: Full path to the SCRUBExcludeQueries file [Path object]
+        - profile: Filtering profile to be updated [dict]
+    """
+
+    # Evaluate every rule against every distinct query
+    for ignore_line, ignore_tool, exact_query, pattern in get_query_filters(ignore_queries_file)[2]:
+        start_time = time.perf_counter()
+        hits = 0
+        for (warning_tool, warning_query), count in query_counts.items():
+            if warning_tool == ignore_tool and (warning_query == exact_query or
+                                                (pattern is not None and pattern(warning_query) is not None)):
+                hits = hits + count
+        filter_profile.record_rule(profile, 'SCRUBExcludeQueries', ignore_line, hits,
+                                   time.perf_counter() - start_time)
+
+
 def external_warning_check(warning_file, source_root):
     """This function checks to see if a warning originates outside the source code directory.
 
@@ -113,7 +297,7 @@ def external_warning_check(warning_file, source_root):
     """
 
     # Check to see if the file exists outside the source root
-    if source_root not in warning_file.parents:
+    if not path_cache.is_in_root(warning_file, source_root):
         skip = True
 
         # Print a status message
@@ -162,29 +346,8 @@ def check_filtering_file(filtering_file, create):
             open(filtering_file, 'w+').close()
 
 
-def duplicate_check(warning, warning_log):
-    """This function checks to make sure that the warning has not been reported before.
-
-    Inputs:
-        - warning: current warning to be checked [string]
-        - warning_log: log containing all warnings written previously [list of strings]
-
-    Outputs:
-        - skip: Indicator if result should be filtered out [bool]
-    """
-
-    # Initialize the variables
-    skip = False
-
-    # Check if the waring has been written out before
-    if warning in warning_log:
-        skip = True
-
-    return skip
-
-
 def filter_results(warning_list, output_file, filtering_file, ignore_query_file, source_root, enable_micro_filtering,
-                   enable_external_warnings):
+                   enable_external_warnings, suppression_index=None, filter_rules_file=None, profile=None):
     """This function performs the filtering, including all other filtering functions.
 
     Inputs:
@@ -195,8 +358,12 @@ def filter_results(warning_list, output_file, filtering_file, ignore_query_file,
         - source_root: Absolute path to the top level directory of the source code [string]
         - enable_micro_filtering: Flag to enable/disable micro filtering [logical]
         - enable_external_warnings: Flag to enable/disable external warnings [logical]
+        - suppression_index: Dictionary of suppressed lines and regions, keyed by file path [dict] [optional]
+        - filter_rules_file: Absolute path to the declarative filter rules file [string] [optional]
+        - profile: Filtering profile to be updated with the cost and effect of every stage [dict] [optional]
 
     Outputs:
+        - filtered_warnings: List of the warnings that remain after filtering [list of dicts]
         - output_file: All filtered results are written to the output_file
     """
 
@@ -226,34 +393,102 @@ def filter_results(warning_list, output_file, filtering_file, ignore_query_file,
         if warning_list[0]['tool'] in filtering_aliases.keys():
             valid_warning_types.extend(filtering_aliases[warning_list[0]['tool']])
 
-    # Iterate through every warning in the list
-    for warning in warning_list:
-
-        # Check to see if it should be ignored
-        if baseline_filtering_check(warning['file'], excluded_files):
-            continue
+    # Create the columnar representation of the warnings
+    warning_store = warning_store_module.create_warning_store(warning_list)
+    keep_mask = warning_store_module.create_mask(warning_store['size'])
+
+    # Check to see if the file should be ignored, once per distinct file
+    start_time, checked = time.perf_counter(), warning_store_module.count_mask(keep_mask)
+    keep_mask = warning_store_module.combine_masks(keep_mask, warning_store_module.evaluate_table(
+        warning_store['file_table'], warning_store['file_ids'],
+        lambda warning_file: not baseline_filtering_check(warning_file, excluded_files)))
+    filter_profile.record_stage(profile, 'baseline', time.perf_counter() - start_time, checked,
+                                checked - warning_store_module.count_mask(keep_mask))
+
+    # Check to see if the file is external to the source directory, once per distinct file
+    if not enable_external_warnings:
+        start_time, checked = time.perf_counter(), warning_store_module.count_mask(keep_mask)
+        keep_mask = warning_store_module.combine_masks(keep_mask, warning_store_module.evaluate_table(
+            warning_store['file_table'], warning_store['file_ids'],
+            lambda warning_file: not external_warning_check(warning_file, source_root)))
+        filter_profile.record_stage(profile, 'external', time.perf_counter() - start_time, checked,
+                                    checked - warning_store_module.count_mask(keep_mask))
+
+    # Record the effect of every query filter on the remaining warnings
+    if profile is not None:
+        profile_query_filters(collections.Counter(warning_store['query_table'][query_id] for query_id in
+                                                  warning_store_module.select_rows(warning_store['query_ids'],
+                                                                                   keep_mask)),
+                              ignore_query_file, profile)
+
+    # Check to see if the query should be ignored, once per distinct tool and query pair
+    start_time, checked = time.perf_counter(), warning_store_module.count_mask(keep_mask)
+    keep_mask = warning_store_module.combine_masks(keep_mask, warning_store_module.evaluate_table(
+        warning_store['query_table'], warning_store['query_ids'],
+        lambda tool_query: not ignore_query_check(tool_query[0], tool_query[1], ignore_query_file)))
+    filter_profile.record_stage(profile, 'query', time.perf_counter() - start_time, checked,
+                                checked - warning_store_module.count_mask(keep_mask))
+
+    # Make the warning file paths relative, once per distinct file
+    relative_files = [path_cache.get_relative_path(warning_file, source_root)
+                      for warning_file in warning_store['file_table']]
+
+    # Apply the declarative filter rules to the remaining warnings in a single pass
+    if filter_rules_file:
+        filter_predicate = filter_rules.get_filter_predicate(pathlib.Path(filter_rules_file))
+        if filter_predicate is not None:
+            start_time, checked = time.perf_counter(), warning_store_module.count_mask(keep_mask)
+            rule_hits = collections.Counter()
+            keep_mask = bytearray(keep_mask)
+            relative_strings = [str(relative_file) for relative_file in relative_files]
+            for index in warning_store_module.select_rows(range(warning_store['size']), keep_mask):
+                rule_name = filter_predicate(warning_list[index], relative_strings[warning_store['file_ids'][index]])
+                if rule_name is not None:
+                    keep_mask[index] = 0
+                    rule_hits[rule_name] = rule_hits[rule_name] + 1
 
-        # Check to see if the warning is external to the source directory
-        if not enable_external_warnings and external_warning_check(warning['file'], source_root):
-            continue
-
-        # Perform micro filtering checking
-        if enable_micro_filtering and micro_filter_check(warning['file'], warning['line'], valid_warning_types):
-            continue
-
-        # Check to see if the query should be ignored
-        if ignore_query_check(warning['tool'], warning['query'], ignore_query_file):
-            continue
-
-        # If we made it here we want the warning.
-        # Make the warning file path relative, make any description references relative, and append to filtered list
-        if source_root in warning['file'].parents:
-            warning['file'] = warning['file'].relative_to(source_root)
+                    # Print a status message
+                    logging.debug('\tWarning removed - Warning matches filter rule %s', rule_name)
+                    logging.debug('\t\t%s', warning_list[index]['id'])
+
+            # Record the effect of every rule, including the rules that were never matched
+            filter_profile.record_stage(profile, 'rules', time.perf_counter() - start_time, checked,
+                                        sum(rule_hits.values()))
+            if profile is not None:
+                for rule in filter_rules.parse_filter_rules(pathlib.Path(filter_rules_file)):
+                    filter_profile.record_rule(profile, 'SCRUBFilterRules', rule['name'], rule_hits[rule['name']])
+
+    # Perform micro filtering on the remaining warnings, grouped by file so each file is read once
+    if enable_micro_filtering:
+        start_time, checked = time.perf_counter(), warning_store_module.count_mask(keep_mask)
+        if suppression_index is None:
+            suppression_index = {}
+        keep_mask = bytearray(keep_mask)
+        file_rows = {}
+        for index in warning_store_module.select_rows(range(warning_store['size']), keep_mask):
+            file_rows.setdefault(warning_store['file_ids'][index], []).append(index)
+        for file_id, rows in file_rows.items():
+            for index in rows:
+                if micro_filter_check(warning_store['file_table'][file_id], warning_store['lines'][index],
+                                      valid_warning_types, suppression_index):
+                    keep_mask[index] = 0
+        filter_profile.record_stage(profile, 'micro', time.perf_counter() - start_time, checked,
+                                    checked - warning_store_module.count_mask(keep_mask))
+
+    # Update every warning that we want to keep
+    for index in warning_store_module.select_rows(range(warning_store['size']), keep_mask):
+        warning = warning_list[index]
+        warning['file'] = relative_files[warning_store['file_ids'][index]]
         for i, line in enumerate(warning['description']):
             warning['description'][i] = line.replace(str(source_root) + '/', '')
         filtered_warnings.append(warning)
 
+    # Print a status message
+    logging.info('\t>> %d of %d warnings remain after filtering.', len(filtered_warnings), warning_store['size'])
+
     # Write out the results
     logging.info('\t>> Results filtered. Writing {}.'.format(output_file))
 
     translate_results.create_scrub_output_file(filtered_warnings, output_file)
+
+    return filtered_warnings
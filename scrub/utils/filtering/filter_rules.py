@@ -0,0 +1,218 @@
+import re
+import fnmatch
+import logging
+import configparser
+
+PRIORITY_VALUES = ('low', 'med', 'high')
+
+# Section name that configparser treats as defaults for every section; it cannot appear in a rules file, since section
+# names must not be empty, so a [DEFAULT] section is parsed like any other section and can be rejected
+UNUSED_DEFAULT_SECTION = ''
+
+# Number of warnings each rule is fully evaluated against before its tests are reordered by selectivity
+SELECTIVITY_SAMPLE_SIZE = 256
+
+# Compiled predicates, keyed by rules file path
+compiled_rules_cache = {}
+
+
+def split_values(value):
+    """This function splits a comma separated rule value into a list of values.
+
+    Inputs:
+        - value: Comma separated list of values [string]
+
+    Outputs:
+        - values: List of non-empty, stripped values [list of strings]
+    """
+
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_line_range(value):
+    """This function parses a line range of the form <first>-<last>, where either bound may be omitted.
+
+    Inputs:
+        - value: Line range to be parsed [string]
+
+    Outputs:
+        - first_line: First line of the range [int]
+        - last_line: Last line of the range, or None if it is unbounded [int]
+    """
+
+    # Split the range
+    if '-' in value:
+        first_line, last_line = value.split('-', 1)
+    else:
+        first_line, last_line = value, value
+
+    # Convert the bounds
+    first_line = int(first_line) if first_line.strip() else 0
+    last_line = int(last_line) if last_line.strip() else None
+
+    return first_line, last_line
+
+
+def parse_filter_rules(rules_file):
+    """This function parses a declarative filter rules file.
+
+    Each section of the file is a rule, and a warning that matches every field of a rule is removed. Valid fields are
+    tool, priority, lines, rule, path, and description. A [DEFAULT] section is not valid, since its fields would
+    otherwise be silently added to every rule.
+
+    Inputs:
+        - rules_file: Absolute path to the filter rules file [Path object]
+
+    Outputs:
+        - filter_rules: List of valid rules, in the order they appear in the file [list of dicts]
+    """
+
+    # Initialize variables
+    filter_rules = []
+
+    # Read the rules file
+    rules_data = configparser.ConfigParser(interpolation=None, default_section=UNUSED_DEFAULT_SECTION)
+    try:
+        rules_data.read(str(rules_file))
+    except configparser.Error as rules_error:
+        logging.warning('\tFilter rules file %s could not be read and will be ignored: %s', rules_file, rules_error)
+        return filter_rules
+
+    # Parse every rule
+    for rule_name in rules_data.sections():
+        try:
+            if rule_name.upper() == 'DEFAULT':
+                raise ValueError('Default sections are not supported, each field must be set in the rules that use it')
+            rule = {'name': rule_name}
+            for field, value in rules_data.items(rule_name):
+                if field == 'tool':
+                    rule['tool'] = set(item.lower() for item in split_values(value))
+                elif field == 'priority':
+                    rule['priority'] = set(item.lower() for item in split_values(value))
+                    if not rule['priority'].issubset(PRIORITY_VALUES):
+                        raise ValueError('Priority must be one of {}'.format(', '.join(PRIORITY_VALUES)))
+                elif field == 'lines':
+                    rule['lines'] = parse_line_range(value)
+                elif field in ('rule', 'path'):
+                    rule[field] = re.compile('|'.join(fnmatch.translate(item) for item in split_values(value)))
+                elif field == 'description':
+                    rule['description'] = re.compile(value)
+                else:
+                    raise ValueError('Unknown field {}'.format(field))
+
+            filter_rules.append(rule)
+
+        except (ValueError, re.error) as rule_error:
+            logging.warning('\tFilter rule [%s] in %s is not valid and will be ignored: %s', rule_name, rules_file,
+                            rule_error)
+
+    return filter_rules
+
+
+def compile_filter_rules(filter_rules):
+    """This function compiles a list of filter rules into a single predicate function.
+
+    The tests of each rule start out ordered from cheapest to most expensive. Every test of a rule is evaluated for the
+    first SELECTIVITY_SAMPLE_SIZE warnings that reach the rule, after which the tests are reordered so the tests that
+    rejected the most warnings are performed first, keeping the cost order for ties. Rules that name specific tools are
+    only evaluated for warnings from those tools.
+
+    Inputs:
+        - filter_rules: List of parsed filter rules [list of dicts]
+
+    Outputs:
+        - predicate: Function that takes a warning and its relative path and returns the name of the first matching
+                     rule, or None if no rule matches [function]
+    """
+
+    # Initialize variables
+    tool_rules = {}
+    general_rules = []
+
+    # Create the ordered list of tests for every rule
+    for rule_index, rule in enumerate(filter_rules):
+        tests = []
+        if 'priority' in rule:
+            tests.append(lambda warning, relative_path, values=rule['priority']:
+                         str(warning['priority']).lower() in values)
+        if 'lines' in rule:
+            tests.append(lambda warning, relative_path, first_line=rule['lines'][0], last_line=rule['lines'][1]:
+                         first_line <= int(warning['line']) and
+                         (last_line is None or int(warning['line']) <= last_line))
+        if 'rule' in rule:
+            tests.append(lambda warning, relative_path, pattern=rule['rule'].fullmatch:
+                         pattern(warning['query']) is not None)
+        if 'path' in rule:
+            tests.append(lambda warning, relative_path, pattern=rule['path'].fullmatch:
+                         pattern(relative_path) is not None)
+        if 'description' in rule:
+            tests.append(lambda warning, relative_path, pattern=rule['description'].search:
+                         pattern('\n'.join(warning['description'])) is not None)
+        compiled_rule = {'index': rule_index, 'name': rule['name'], 'tests': tests, 'samples': 0,
+                         'rejections': [0] * len(tests)}
+
+        # Index the rule by tool
+        if 'tool' in rule:
+            for tool in rule['tool']:
+                tool_rules.setdefault(tool, []).append(compiled_rule)
+        else:
+            general_rules.append(compiled_rule)
+
+    # Merge the general rules into each tool's list, preserving the file order
+    for tool in tool_rules:
+        tool_rules[tool] = sorted(tool_rules[tool] + general_rules, key=lambda compiled_rule: compiled_rule['index'])
+
+    def predicate(warning, relative_path):
+        for compiled_rule in tool_rules.get(warning['tool'], general_rules):
+            # Sample the selectivity of every test
+            if compiled_rule['samples'] < SELECTIVITY_SAMPLE_SIZE:
+                test_results = [test(warning, relative_path) for test in compiled_rule['tests']]
+                for test_index, test_result in enumerate(test_results):
+                    if not test_result:
+                        compiled_rule['rejections'][test_index] = compiled_rule['rejections'][test_index] + 1
+                compiled_rule['samples'] = compiled_rule['samples'] + 1
+
+                # Perform the most selective tests first from now on
+                if compiled_rule['samples'] == SELECTIVITY_SAMPLE_SIZE:
+                    test_order = sorted(range(len(test_results)),
+                                        key=lambda test_index: -compiled_rule['rejections'][test_index])
+                    compiled_rule['tests'] = [compiled_rule['tests'][test_index] for test_index in test_order]
+                    compiled_rule['rejections'] = [compiled_rule['rejections'][test_index]
+                                                   for test_index in test_order]
+
+                if all(test_results):
+                    return compiled_rule['name']
+
+            elif all(test(warning, relative_path) for test in compiled_rule['tests']):
+                return compiled_rule['name']
+
+        return None
+
+    return predicate
+
+
+def get_filter_predicate(rules_file):
+    """This function gets the compiled predicate for a filter rules file, only compiling the file when it changes.
+
+    Inputs:
+        - rules_file: Absolute path to the filter rules file [Path object]
+
+    Outputs:
+        - predicate: Compiled filter predicate, or None if the file does not exist or contains no rules [function]
+    """
+
+    # Get the file signature
+    try:
+        file_stat = rules_file.stat()
+        file_signature = (file_stat.st_mtime_ns, file_stat.st_size)
+    except OSError:
+        return None
+
+    # Compile the file if necessary
+    cached_predicate = compiled_rules_cache.get(str(rules_file))
+    if cached_predicate is None or cached_predicate[0] != file_signature:
+        filter_rules = parse_filter_rules(rules_file)
+        cached_predicate = (file_signature, compile_filter_rules(filter_rules) if filter_rules else None)
+        compiled_rules_cache[str(rules_file)] = cached_predicate
+
+    return cached_predicate[1]
@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import bisect
+import itertools
+import logging
+import concurrent.futures
+from scrub.utils import path_cache
+
+SUPPRESSION_REGEX = re.compile(rb'scrub_ignore_warning|@suppress|scrub_ignore_begin|scrub_ignore_end', re.IGNORECASE)
+
+
+def scan_data(data):
+    """This function finds every suppression marker and suppressed region in the contents of a source file.
+
+    Inputs:
+        - data: Contents of the source file [bytes]
+
+    Outputs:
+        - suppressed_lines: Dictionary of lower case, stripped line contents, keyed by line number [dict]
+        - suppressed_regions: List of (first line, last line, lower case begin line contents) regions [list of lists]
+    """
+
+    # Initialize variables
+    suppressed_lines = {}
+    suppressed_regions = []
+    open_regions = []
+    line_number = 1
+    line_start = 0
+
+    # Find every marker
+    for match in SUPPRESSION_REGEX.finditer(data):
+        # Skip markers on lines that have already been recorded
+        if match.start() < line_start:
+            continue
+
+        # Find the line that contains the marker
+        line_number = line_number + data.count(b'\n', line_start, match.start())
+        line_start = data.rfind(b'\n', 0, match.start()) + 1
+        line_end = data.find(b'\n', match.start())
+        if line_end < 0:
+            line_end = len(data)
+        line = data[line_start:line_end].decode('utf-8', errors='ignore').lower().strip()
+
+        # Store the line contents, or open or close a region
+        if 'scrub_ignore_begin' in line:
+            open_regions.append((line_number, line))
+        elif 'scrub_ignore_end' in line:
+            if open_regions:
+                region_start, region_line = open_regions.pop()
+                suppressed_regions.append([region_start, line_number, region_line])
+        else:
+            suppressed_lines[line_number] = line
+
+        # Move on to the next line
+        line_number = line_number + 1
+        line_start = line_end + 1
+
+    # Regions that are never closed continue to the end of the file
+    last_line = data.count(b'\n') + 1
+    for region_start, region_line in open_regions:
+        suppressed_regions.append([region_start, last_line, region_line])
+
+    return suppressed_lines, suppressed_regions
+
+
+def scan_file(source_file):
+    """This function finds every suppression marker and suppressed region in a source file.
+
+    Inputs:
+        - source_file: Absolute path to the source file to be scanned [string]
+
+    Outputs:
+        - suppressed_lines: Dictionary of lower case, stripped line contents, keyed by line number [dict]
+        - suppressed_regions: List of (first line, last line, lower case begin line contents) regions [list of lists]
+    """
+
+    # Read the file
+    try:
+        with open(source_file, 'rb') as input_fh:
+            data = input_fh.read()
+    except OSError:
+        logging.warning('\tFile %s could not be scanned for suppressions.', source_file)
+        return {}, []
+
+    return scan_data(data)
+
+
+def create_region_index(suppressed_regions):
+    """This function converts a list of possibly overlapping regions into sorted, disjoint segments.
+
+    Inputs:
+        - suppressed_regions: List of (first line, last line, begin line contents) regions [list of lists]
+
+    Outputs:
+        - region_index: Sorted first line of every segment and the region contents active in each segment [tuple]
+    """
+
+    # Initialize variables
+    segment_starts = []
+    segment_regions = []
+    active_regions = {}
+
+    # Create the start and end events for every region
+    events = sorted([(region[0], index) for index, region in enumerate(suppressed_regions)] +
+                    [(region[1] + 1, index) for index, region in enumerate(suppressed_regions)])
+
+    # Sweep through the events, starting a new segment at each boundary
+    for segment_start, segment_events in itertools.groupby(events, key=lambda event: event[0]):
+        for _, index in segment_events:
+            if index in active_regions:
+                del active_regions[index]
+            else:
+                active_regions[index] = suppressed_regions[index][2]
+        segment_starts.append(segment_start)
+        segment_regions.append(tuple(active_regions.values()))
+
+    return segment_starts, segment_regions
+
+
+def find_regions(region_index, line_number):
+    """This function finds every suppressed region that contains a line.
+
+    Inputs:
+        - region_index: Sorted first line of every segment and the region contents active in each segment [tuple]
+        - line_number: Line of interest [int]
+
+    Outputs:
+        - regions: Begin line contents of every region that contains the line [tuple of strings]
+    """
+
+    # Find the segment that contains the line
+    segment = bisect.bisect_right(region_index[0], line_number) - 1
+    if segment < 0:
+        return ()
+
+    return region_index[1][segment]
+
+
+def create_file_entry(suppressed_lines, suppressed_regions):
+    """This function creates the lookup structure for the suppressions in a single file.
+
+    Inputs:
+        - suppressed_lines: Dictionary of lower case, stripped line contents, keyed by line number [dict]
+        - suppressed_regions: List of (first line, last line, begin line contents) regions [list of lists]
+
+    Outputs:
+        - file_entry: Suppressed lines and region index for the file [dict]
+    """
+
+    return {'lines': suppressed_lines, 'regions': create_region_index(suppressed_regions)}
+
+
+def get_file_signature(source_file):
+    """This function gets the values used to determine if a source file has changed since it was last scanned.
+
+    Inputs:
+        - source_file: Absolute path to the source file of interest [string]
+
+    Outputs:
+        - file_signature: Modification time and size of the file, or None if it does not exist [list]
+    """
+
+    try:
+        file_stat = os.stat(source_file)
+    except OSError:
+        return None
+
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+
+def create_suppression_index(file_list, index_file):
+    """This function creates an index of every suppression marker and suppressed region in a set of source files.
+
+    Files that have not changed since the index was last written are not scanned again. The index is keyed by the
+    canonical path of each file, so it matches the warning file paths even if the source root is reached through a
+    symbolic link.
+
+    Inputs:
+        - file_list: Absolute paths to the source files to be scanned [list of strings]
+        - index_file: Absolute path to the persistent suppression index file [Path object]
+
+    Outputs:
+        - suppression_index: Dictionary of suppressed lines and regions, keyed by canonical file path [dict]
+        - suppression_index.json: Persistent copy of the index, including file signatures
+    """
+
+    # Print a status message
+    logging.info('')
+    logging.info('\tCreating suppression index...')
+    logging.info('\t>> Executing command: suppression_index.create_suppression_index(<file_list>, %s)', index_file)
+
+    # Import the previous index, if it exists
+    previous_index = {}
+    if index_file.is_file():
+        try:
+            with open(index_file, 'r') as input_fh:
+                previous_index = json.load(input_fh)
+        except ValueError:
+            logging.warning('\tSuppression index %s could not be read. All files will be scanned.', index_file)
+
+    # Reuse the entries for files that have not changed
+    updated_index = {}
+    changed_files = []
+    for source_file in dict.fromkeys(str(path_cache.resolve_path(source_file)) for source_file in file_list):
+        file_signature = get_file_signature(source_file)
+        if file_signature is None:
+            continue
+        previous_entry = previous_index.get(source_file)
+        if (previous_entry is not None and previous_entry['signature'] == file_signature and
+                'regions' in previous_entry):
+            updated_index[source_file] = previous_entry
+        else:
+            changed_files.append((source_file, file_signature))
+
+    # Scan the changed files
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        scanned_files = executor.map(lambda changed_file: scan_file(changed_file[0]), changed_files)
+        for (source_file, file_signature), (suppressed_lines, suppressed_regions) in zip(changed_files,
+                                                                                         scanned_files):
+            updated_index[source_file] = {'signature': file_signature,
+                                          'lines': {str(line): text for line, text in suppressed_lines.items()},
+                                          'regions': suppressed_regions}
+
+    # Write out the index
+    try:
+        with open(index_file, 'w') as output_fh:
+            json.dump(updated_index, output_fh)
+    except PermissionError:
+        logging.warning('\tCould not write suppression index %s', index_file)
+
+    # Print a status message
+    logging.info('\t>> Scanned %d of %d files.', len(changed_files), len(updated_index))
+
+    # Create the lookup structure
+    suppression_index = {}
+    for source_file, entry in updated_index.items():
+        suppression_index[source_file] = create_file_entry({int(line): text for line, text in entry['lines'].items()},
+                                                           entry['regions'])
+
+    return suppression_index
@@ -0,0 +1,134 @@
+import array
+import itertools
+
+
+def intern_column(values):
+    """This function converts a column of values into a table of distinct values and a list of value identifiers.
+
+    Inputs:
+        - values: Iterable of hashable values to be interned [iterable]
+
+    Outputs:
+        - value_table: List of the distinct values, in order of first appearance [list]
+        - value_ids: Identifier of the distinct value for every input value [array of int]
+    """
+
+    # Initialize variables
+    value_lookup = {}
+    value_table = []
+    value_ids = array.array('L')
+
+    # Assign an identifier to every distinct value
+    for value in values:
+        value_id = value_lookup.get(value)
+        if value_id is None:
+            value_id = len(value_table)
+            value_lookup[value] = value_id
+            value_table.append(value)
+        value_ids.append(value_id)
+
+    return value_table, value_ids
+
+
+def create_warning_store(warning_list):
+    """This function creates a columnar representation of a list of warnings.
+
+    Inputs:
+        - warning_list: List of warnings to be stored [list of dicts]
+
+    Outputs:
+        - warning_store: Dictionary of parallel columns and the tables of distinct values they reference [dict]
+    """
+
+    # Intern the columns that are shared between many warnings
+    file_table, file_ids = intern_column(warning['file'] for warning in warning_list)
+    query_table, query_ids = intern_column((warning['tool'], warning['query']) for warning in warning_list)
+
+    # Store the numeric columns
+    lines = array.array('q', (int(warning['line']) for warning in warning_list))
+
+    warning_store = {'size': len(warning_list),
+                     'file_table': file_table,
+                     'file_ids': file_ids,
+                     'query_table': query_table,
+                     'query_ids': query_ids,
+                     'lines': lines}
+
+    return warning_store
+
+
+def create_mask(size, value=True):
+    """This function creates a mask where every row has the same value.
+
+    Inputs:
+        - size: Number of rows in the mask [int]
+        - value: Value of every row [bool]
+
+    Outputs:
+        - mask: Mask with one byte per row [bytes]
+    """
+
+    return (b'\x01' if value else b'\x00') * size
+
+
+def evaluate_table(value_table, value_ids, predicate):
+    """This function evaluates a predicate once per distinct value and broadcasts the result to every row.
+
+    Inputs:
+        - value_table: List of distinct values [list]
+        - value_ids: Identifier of the distinct value for every row [array of int]
+        - predicate: Function that returns True if a row with the given value should be kept [function]
+
+    Outputs:
+        - mask: Mask with one byte per row [bytes]
+    """
+
+    # Evaluate the predicate once for every distinct value
+    table_mask = bytes(1 if predicate(value) else 0 for value in value_table)
+
+    # Broadcast the distinct results to every row
+    return bytes(map(table_mask.__getitem__, value_ids))
+
+
+def combine_masks(first_mask, second_mask):
+    """This function performs a logical AND of two masks.
+
+    Inputs:
+        - first_mask: Mask with one byte per row [bytes]
+        - second_mask: Mask with one byte per row [bytes]
+
+    Outputs:
+        - mask: Combined mask with one byte per row [bytes]
+    """
+
+    # Perform the operation on the whole mask at once
+    combined_value = int.from_bytes(first_mask, 'big') & int.from_bytes(second_mask, 'big')
+
+    return combined_value.to_bytes(len(first_mask), 'big')
+
+
+def count_mask(mask):
+    """This function counts the number of rows that are kept by a mask.
+
+    Inputs:
+        - mask: Mask with one byte per row [bytes]
+
+    Outputs:
+        - count: Number of kept rows [int]
+    """
+
+    return mask.count(1)
+
+
+def select_rows(rows, mask):
+    """This function selects the rows that are kept by a mask.
+
+    Inputs:
+        - rows: List of row values [list]
+        - mask: Mask with one byte per row [bytes]
+
+    Outputs:
+        - selected_rows: List of the kept row values [list]
+    """
+
+    return list(itertools.compress(rows, mask))
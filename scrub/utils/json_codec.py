@@ -0,0 +1,320 @@
+import re
+import sys
+import json
+import time
+import importlib
+
+# Order of preference for the JSON backends
+BACKEND_NAMES = ('orjson', 'ujson', 'json')
+WHITESPACE_REGEX = re.compile(r'[ \t\n\r]*')
+NUMBER_REGEX = re.compile(r'-?[0-9.eE+-]*')
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def create_backend(backend_name):
+    """This function creates the decode and encode functions for a JSON backend.
+
+    Inputs:
+        - backend_name: Name of the JSON backend module (orjson, ujson, or json) [string]
+
+    Outputs:
+        - backend: Functions to decode JSON text and encode compact JSON text, or None if the module is not
+                   installed [tuple]
+    """
+
+    # Import the backend
+    try:
+        module = importlib.import_module(backend_name)
+    except ImportError:
+        return None
+
+    # Create the functions
+    if backend_name == 'orjson':
+        return module.loads, lambda value: module.dumps(value).decode('utf-8')
+    elif backend_name == 'ujson':
+        return module.loads, lambda value: module.dumps(value, ensure_ascii=False, escape_forward_slashes=False)
+    else:
+        return module.loads, lambda value: module.dumps(value, separators=(',', ':'))
+
+
+def find_backend():
+    """This function finds the fastest JSON backend that is installed.
+
+    Outputs:
+        - backend_name: Name of the selected backend [string]
+        - backend: Functions to decode JSON text and encode compact JSON text [tuple]
+    """
+
+    for backend_name in BACKEND_NAMES:
+        backend = create_backend(backend_name)
+        if backend is not None:
+            return backend_name, backend
+
+
+BACKEND_NAME, (backend_loads, backend_dumps) = find_backend()
+
+
+def loads(data):
+    """This function decodes JSON text.
+
+    Inputs:
+        - data: JSON text [string or bytes]
+
+    Outputs:
+        - value: Decoded value [object]
+    """
+
+    return backend_loads(data)
+
+
+def load(input_fh):
+    """This function decodes the contents of a JSON file. Files should be opened in binary mode when possible, since
+    the faster backends decode bytes directly.
+
+    Inputs:
+        - input_fh: Open JSON file [file object]
+
+    Outputs:
+        - value: Decoded value [object]
+    """
+
+    return backend_loads(input_fh.read())
+
+
+def iterate_array(input_fh, key, chunk_size=STREAM_CHUNK_SIZE):
+    """This function decodes the items of an array in the top level object of a JSON file, one item at a time.
+
+    The file is read in chunks, so the memory required depends on the size of the largest item rather than the size of
+    the file. Every other value in the top level object is decoded and discarded. The standard library decoder is
+    always used, since the other backends can not decode part of a document.
+
+    Inputs:
+        - input_fh: JSON file opened for reading text [file object]
+        - key: Key of the array in the top level object [string]
+        - chunk_size: Number of characters to read at a time [int] [optional]
+
+    Outputs:
+        - item: Decoded items of the array, or nothing if the key does not exist [generator of objects]
+    """
+
+    # Initialize variables
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+
+    def read_chunk(size):
+        nonlocal buffer, position
+        data = input_fh.read(size)
+        buffer = buffer[position:] + data
+        position = 0
+        return bool(data)
+
+    def next_character():
+        nonlocal position
+        position = WHITESPACE_REGEX.match(buffer, position).end()
+        while position >= len(buffer):
+            if not read_chunk(chunk_size):
+                raise ValueError('Unexpected end of JSON data')
+            position = WHITESPACE_REGEX.match(buffer, position).end()
+        position = position + 1
+        return buffer[position - 1]
+
+    def decode_value():
+        nonlocal position
+        next_character()
+        position = position - 1
+        read_size = chunk_size
+        while True:
+            # Values that reach the end of the buffer may continue in the next chunk
+            if NUMBER_REGEX.match(buffer, position).end() < len(buffer):
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    if end < len(buffer):
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    pass
+            if not read_chunk(read_size):
+                value, position = decoder.raw_decode(buffer, position)
+                return value
+            read_size = read_size * 2
+
+    # Find the array in the top level object
+    if next_character() != '{':
+        raise ValueError('JSON data is not an object')
+    if next_character() == '}':
+        return
+    position = position - 1
+    while True:
+        value_key = decode_value()
+        if next_character() != ':':
+            raise ValueError('Expected a colon after key {}'.format(value_key))
+
+        # Decode the items of the array one at a time
+        if value_key == key:
+            if next_character() != '[':
+                raise ValueError('{} is not an array'.format(key))
+            if next_character() != ']':
+                position = position - 1
+                while True:
+                    yield decode_value()
+                    separator = next_character()
+                    if separator == ']':
+                        break
+                    elif separator != ',':
+                        raise ValueError('Expected a comma or the end of {}'.format(key))
+        else:
+            decode_value()
+
+        # Move on to the next key
+        separator = next_character()
+        if separator == '}':
+            return
+        elif separator != ',':
+            raise ValueError('Expected a comma or the end of the object')
+
+
+def load_array(input_file, key):
+    """This function decodes the items of an array in the top level object of a JSON file, one item at a time.
+
+    Inputs:
+        - input_file: Absolute path to the JSON file [string]
+        - key: Key of the array in the top level object [string]
+
+    Outputs:
+        - item: Decoded items of the array, or nothing if the key does not exist [generator of objects]
+    """
+
+    with open(input_file, 'r', encoding='utf-8') as input_fh:
+        yield from iterate_array(input_fh, key)
+
+
+def dumps(value, indent=None):
+    """This function encodes a value as JSON text.
+
+    Indented output is always created by the standard library, so its formatting does not depend on the backend.
+    Compact output is created by the selected backend, falling back to the standard library for values the backend
+    does not support (e.g. integers larger than 64 bits).
+
+    Inputs:
+        - value: Value to be encoded [JSON serializable object]
+        - indent: Number of spaces to indent each level, or None for compact output [int] [optional]
+
+    Outputs:
+        - encoded_value: JSON text of the value [string]
+    """
+
+    if indent is None:
+        try:
+            return backend_dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            return json.dumps(value, separators=(',', ':'))
+    return json.dumps(value, indent=indent)
+
+
+def dump(value, output_fh, indent=None):
+    """This function encodes a value as JSON text and writes it to a file.
+
+    Inputs:
+        - value: Value to be encoded [JSON serializable object]
+        - output_fh: File opened for writing text [file object]
+        - indent: Number of spaces to indent each level, or None for compact output [int] [optional]
+    """
+
+    output_fh.write(dumps(value, indent))
+
+
+def create_benchmark_payloads(finding_count):
+    """This function creates JSON payloads with the same shape as the data SCRUB reads and writes.
+
+    Inputs:
+        - finding_count: Number of findings in each payload [int]
+
+    Outputs:
+        - payloads: JSON text of each payload, keyed by payload name [dict]
+    """
+
+    # Create the Coverity results
+    coverity_data = {'issues': [{'mainEventFilePathname': '/src/module_{}/file_{}.c'.format(i % 50, i),
+                                 'mainEventLineNumber': i % 900 + 1,
+                                 'checkerName': 'CHECKED_RETURN',
+                                 'checkerProperties': {'subcategoryLongDescription': 'Unchecked return value',
+                                                       'impact': 'Medium'},
+                                 'events': [{'eventTag': 'check_return', 'eventDescription': 'Calling "read" without '
+                                             'checking the return value.', 'strippedFilePathname': 'file.c',
+                                             'lineNumber': i % 900 + 1 + j} for j in range(4)]}
+                                for i in range(finding_count)]}
+
+    # Create the SonarQube results
+    sonarqube_data = {'total': finding_count, 'issues': [{'key': 'AY{:08d}'.format(i), 'rule': 'python:S1481',
+                                                          'severity': 'MINOR', 'component': 'project:src/file_{}.py'
+                                                          .format(i), 'line': i % 900 + 1,
+                                                          'message': 'Remove the unused local variable "x".',
+                                                          'type': 'CODE_SMELL', 'tags': ['unused']}
+                                                         for i in range(finding_count)]}
+
+    # Create the Pylint results
+    pylint_data = [{'type': 'warning', 'module': 'module_{}'.format(i), 'obj': 'function', 'line': i % 900 + 1,
+                    'column': 4, 'path': 'src/module_{}.py'.format(i), 'symbol': 'unused-variable',
+                    'message': "Unused variable 'x'", 'message-id': 'W0612'} for i in range(finding_count)]
+
+    # Create the SARIF results
+    sarif_data = [{'ruleId': 'cpp/unused-local-variable', 'ruleIndex': i % 40, 'level': 'warning',
+                   'message': {'text': 'Variable x is not used.'},
+                   'locations': [{'physicalLocation': {'artifactLocation': {'uri': 'src/file_{}.c'.format(i),
+                                                                            'uriBaseId': '/src', 'index': i},
+                                                       'region': {'startLine': i % 900 + 1}}}],
+                   'partialFingerprints': {'scrubContextHash/v1': '{:064x}:1'.format(i)}}
+                  for i in range(finding_count)]
+
+    return {'coverity': json.dumps(coverity_data), 'sonarqube': json.dumps(sonarqube_data),
+            'pylint': json.dumps(pylint_data), 'sarif': json.dumps(sarif_data)}
+
+
+def benchmark(finding_count=10000, iterations=5):
+    """This function compares the decoding and encoding time of every installed JSON backend.
+
+    Inputs:
+        - finding_count: Number of findings in each payload [int] [optional]
+        - iterations: Number of times each operation is timed, the fastest time is reported [int] [optional]
+
+    Outputs:
+        - timings: Decode and encode time of each payload, in seconds, keyed by backend and payload name [dict]
+    """
+
+    # Initialize variables
+    payloads = create_benchmark_payloads(finding_count)
+    timings = {}
+
+    # Print a status message
+    print('Selected backend: {}'.format(BACKEND_NAME))
+    print('{:<8} {:<10} {:>12} {:>12}'.format('Backend', 'Payload', 'Decode (ms)', 'Encode (ms)'))
+
+    # Time every backend
+    for backend_name in BACKEND_NAMES:
+        backend = create_backend(backend_name)
+        if backend is None:
+            print('{:<8} not installed'.format(backend_name))
+            continue
+
+        for payload_name, payload in payloads.items():
+            decode_times, encode_times = [], []
+            for _ in range(iterations):
+                start_time = time.perf_counter()
+                value = backend[0](payload)
+                decode_times.append(time.perf_counter() - start_time)
+                start_time = time.perf_counter()
+                backend[1](value)
+                encode_times.append(time.perf_counter() - start_time)
+            timings[(backend_name, payload_name)] = (min(decode_times), min(encode_times))
+            print('{:<8} {:<10} {:>12.2f} {:>12.2f}'.format(backend_name, payload_name, min(decode_times) * 1000,
+                                                            min(encode_times) * 1000))
+
+    return timings
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        benchmark(int(sys.argv[1]))
+    else:
+        benchmark()
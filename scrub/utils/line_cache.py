@@ -0,0 +1,132 @@
+import array
+import collections
+
+DEFAULT_BYTE_BUDGET = 64 * 1024 * 1024
+
+
+class LineCache:
+    """This class provides random access to the lines of source files, reading each file only once.
+
+    The contents of every file are stored together with an index of line offsets. Files are evicted in least recently
+    used order once the total size of the cached data exceeds the byte budget. Source files are assumed not to change
+    while they are cached.
+    """
+
+    def __init__(self, byte_budget=DEFAULT_BYTE_BUDGET):
+        self.byte_budget = byte_budget
+        self.cached_bytes = 0
+        self.entries = collections.OrderedDict()
+
+    @staticmethod
+    def index_lines(data):
+        """This function finds the starting offset of every line in a file.
+
+        Inputs:
+            - data: Contents of the file [bytes]
+
+        Outputs:
+            - line_offsets: Offset of the first byte of every line, followed by the length of the data [array of int]
+        """
+
+        # Initialize variables
+        line_offsets = array.array('Q', [0])
+
+        # Find every line ending
+        offset = data.find(b'\n')
+        while offset != -1:
+            line_offsets.append(offset + 1)
+            offset = data.find(b'\n', offset + 1)
+
+        # Add the end of the data, unless the file ends with a newline
+        if line_offsets[-1] != len(data):
+            line_offsets.append(len(data))
+
+        return line_offsets
+
+    def get_file(self, source_file):
+        """This function gets the contents and line index of a file, reading it if it has not been cached.
+
+        Inputs:
+            - source_file: Absolute path to the source file of interest [Path object]
+
+        Outputs:
+            - entry: Contents of the file and its line offsets [tuple]
+        """
+
+        # Check the cache
+        cache_key = str(source_file)
+        entry = self.entries.get(cache_key)
+        if entry is not None:
+            self.entries.move_to_end(cache_key)
+            return entry
+
+        # Read the file
+        with open(source_file, 'rb') as input_fh:
+            data = input_fh.read()
+        entry = (data, self.index_lines(data))
+        entry_size = len(data) + entry[1].itemsize * len(entry[1])
+
+        # Files that are larger than the budget are never cached
+        if entry_size > self.byte_budget:
+            return entry
+
+        # Evict the least recently used files until there is room
+        while self.entries and self.cached_bytes + entry_size > self.byte_budget:
+            evicted_data, evicted_offsets = self.entries.popitem(last=False)[1]
+            self.cached_bytes = self.cached_bytes - len(evicted_data) - evicted_offsets.itemsize * len(evicted_offsets)
+
+        # Add the file to the cache
+        self.entries[cache_key] = entry
+        self.cached_bytes = self.cached_bytes + entry_size
+
+        return entry
+
+    def get_lines(self, source_file, first_line, last_line):
+        """This function gets a range of lines from a file.
+
+        Inputs:
+            - source_file: Absolute path to the source file of interest [Path object]
+            - first_line: First line of interest, starting from 1 [int]
+            - last_line: Last line of interest, inclusive [int]
+
+        Outputs:
+            - lines: Lines of interest that exist in the file, including line endings [list of strings]
+        """
+
+        # Get the file data
+        data, line_offsets = self.get_file(source_file)
+
+        # Clamp the range to the lines that exist
+        first_line = max(first_line, 1)
+        last_line = min(last_line, len(line_offsets) - 1)
+
+        return [data[line_offsets[i - 1]:line_offsets[i]].decode('utf-8', errors='ignore')
+                for i in range(first_line, last_line + 1)]
+
+    def get_line(self, source_file, line_number):
+        """This function gets a single line from a file.
+
+        Inputs:
+            - source_file: Absolute path to the source file of interest [Path object]
+            - line_number: Line of interest, starting from 1 [int]
+
+        Outputs:
+            - line: Line of interest, including the line ending, or None if it does not exist [string]
+        """
+
+        # Get the line
+        lines = self.get_lines(source_file, line_number, line_number)
+
+        if lines and line_number >= 1:
+            return lines[0]
+        return None
+
+    def clear(self):
+        """This function removes every file from the cache."""
+
+        self.entries.clear()
+        self.cached_bytes = 0
+
+
+# Cache that is shared by every stage of a SCRUB run
+source_line_cache = LineCache()
@@ -0,0 +1,124 @@
+import os
+import pathlib
+
+# Canonical paths, keyed by base directory and path string
+canonical_paths = {}
+
+# Source root information, keyed by source root and canonical path
+root_paths = {}
+
+# Working directory that relative paths without a base directory are relative to, captured when it is first needed
+working_dir = None
+
+
+def get_working_dir():
+    """This function gets the working directory used by the cache, reading it only once until the cache is cleared.
+
+    Outputs:
+        - working_dir: Absolute path of the working directory [string]
+    """
+
+    global working_dir
+    if working_dir is None:
+        working_dir = os.getcwd()
+
+    return working_dir
+
+
+def resolve_path(path_string, base_dir=None):
+    """This function gets the canonical absolute path for a path string, resolving each distinct path only once.
+
+    Inputs:
+        - path_string: Path of interest, absolute or relative to base_dir [string or Path object]
+        - base_dir: Directory that relative paths are relative to, or the working directory at the time the cache was
+                    last cleared if not set [Path object] [optional]
+
+    Outputs:
+        - canonical_path: Canonical absolute path [Path object]
+    """
+
+    # Relative paths depend on the directory they are relative to
+    path_string = str(path_string)
+    if path_string.startswith('/'):
+        cache_key = (None, path_string)
+    elif base_dir is None:
+        cache_key = (get_working_dir(), path_string)
+    else:
+        cache_key = (str(base_dir), path_string)
+
+    # Resolve the path if it hasn't been seen before
+    canonical_path = canonical_paths.get(cache_key)
+    if canonical_path is None:
+        if cache_key[0] is None:
+            canonical_path = pathlib.Path(path_string).resolve()
+        else:
+            canonical_path = pathlib.Path(cache_key[0]).joinpath(path_string).resolve()
+        canonical_paths[cache_key] = canonical_path
+
+    return canonical_path
+
+
+def get_root_info(file_path, source_root):
+    """This function determines where a path is located relative to the source root.
+
+    Inputs:
+        - file_path: Canonical absolute path of interest [Path object]
+        - source_root: Canonical absolute path to the source root directory [Path object]
+
+    Outputs:
+        - in_root: Is the path located inside the source root? [bool]
+        - relative_path: Path relative to the source root, or the original path if it is outside [Path object]
+    """
+
+    # Check the cache
+    cache_key = (source_root, file_path)
+    root_info = root_paths.get(cache_key)
+
+    # Examine the path if it hasn't been seen before
+    if root_info is None:
+        if source_root in file_path.parents:
+            root_info = (True, file_path.relative_to(source_root))
+        else:
+            root_info = (False, file_path)
+        root_paths[cache_key] = root_info
+
+    return root_info
+
+
+def is_in_root(file_path, source_root):
+    """This function checks to see if a path is located inside the source root.
+
+    Inputs:
+        - file_path: Canonical absolute path of interest [Path object]
+        - source_root: Canonical absolute path to the source root directory [Path object]
+
+    Outputs:
+        - in_root: Is the path located inside the source root? [bool]
+    """
+
+    return get_root_info(file_path, source_root)[0]
+
+
+def get_relative_path(file_path, source_root):
+    """This function gets a path relative to the source root, if it is located inside the source root.
+
+    Inputs:
+        - file_path: Canonical absolute path of interest [Path object]
+        - source_root: Canonical absolute path to the source root directory [Path object]
+
+    Outputs:
+        - relative_path: Path relative to the source root, or the original path if it is outside [Path object]
+    """
+
+    return get_root_info(file_path, source_root)[1]
+
+
+def clear():
+    """This function removes every path from the cache, so that changes to the file system or working directory made
+    since the paths were resolved are respected. It should be called at the start of every run.
+    """
+
+    global working_dir
+    canonical_paths.clear()
+    root_paths.clear()
+    working_dir = None
@@ -0,0 +1,375 @@
+import pathlib
+import logging
+import sqlite3
+from scrub.tools.parsers import translate_results
+from scrub.tools.parsers import parse_metrics
+from scrub.utils import path_cache
+
+DATABASE_SCHEMA = '''
+    CREATE TABLE findings (
+        finding_id INTEGER PRIMARY KEY,
+        source TEXT NOT NULL,
+        scrub_id TEXT NOT NULL,
+        tool TEXT NOT NULL,
+        file TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        priority TEXT NOT NULL,
+        rule TEXT NOT NULL,
+        description TEXT NOT NULL,
+        also_reported_by TEXT NOT NULL
+    );
+    CREATE TABLE code_flows (
+        finding_id INTEGER NOT NULL REFERENCES findings(finding_id),
+        step INTEGER NOT NULL,
+        file TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        description TEXT NOT NULL
+    );
+    CREATE TABLE metrics (
+        source TEXT NOT NULL,
+        scope TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL
+    );
+    CREATE TABLE sources (
+        source TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (source, kind)
+    );
+    CREATE INDEX findings_source_index ON findings(source);
+    CREATE INDEX findings_file_index ON findings(file);
+    CREATE INDEX findings_tool_index ON findings(tool);
+    CREATE INDEX findings_rule_index ON findings(rule);
+    CREATE INDEX findings_priority_index ON findings(priority);
+    CREATE INDEX code_flows_finding_index ON code_flows(finding_id);
+    CREATE INDEX metrics_source_index ON metrics(source, scope);
+'''
+
+
+def get_stored_path(file_path, source_root):
+    """This function converts a file path into the form that is stored in the results database.
+
+    Inputs:
+        - file_path: Absolute path to the file of interest [Path object]
+        - source_root: Absolute path to the source root directory [Path object]
+
+    Outputs:
+        - stored_path: Path relative to the source root, or the absolute path for external files [string]
+    """
+
+    return str(path_cache.get_relative_path(file_path, source_root))
+
+
+def get_source_files(scrub_analysis_dir):
+    """This function finds every file in the SCRUB output directory that is stored in the results database.
+
+    Inputs:
+        - scrub_analysis_dir: Absolute path to the directory containing the SCRUB output files [Path object]
+
+    Outputs:
+        - source_files: Absolute path and signature of every file, keyed by source name and kind (findings or
+                        metrics) [dict]
+    """
+
+    # Initialize variables
+    source_files = {}
+
+    # Get the signature of every file
+    for results_file in scrub_analysis_dir.glob('*.scrub'):
+        source_files[(results_file.stem, 'findings')] = (results_file,
+                                                         translate_results.get_file_signature(results_file))
+    for metrics_file in scrub_analysis_dir.glob('*_metrics.csv'):
+        source_files[(metrics_file.stem[:-len('_metrics')], 'metrics')] = (
+            metrics_file, translate_results.get_file_signature(metrics_file))
+
+    return source_files
+
+
+def get_stored_signatures(connection):
+    """This function gets the signature of every file that has been added to the results database.
+
+    Inputs:
+        - connection: Open connection to the results database [sqlite3.Connection]
+
+    Outputs:
+        - stored_signatures: Modification time and size of every file, keyed by source name and kind [dict]
+    """
+
+    return {(source, kind): (mtime_ns, size) for source, kind, mtime_ns, size in
+            connection.execute('SELECT source, kind, mtime_ns, size FROM sources')}
+
+
+def is_current(database_file, scrub_analysis_dir):
+    """This function checks to see if the results database reflects every SCRUB output file.
+
+    Inputs:
+        - database_file: Absolute path to the results database [Path object]
+        - scrub_analysis_dir: Absolute path to the directory containing the SCRUB output files [Path object]
+
+    Outputs:
+        - current: Does the results database reflect the current SCRUB output files? [bool]
+    """
+
+    # Make sure the database exists
+    if not database_file.is_file():
+        return False
+
+    # Compare the signature of every file
+    try:
+        connection = sqlite3.connect(str(database_file))
+        try:
+            stored_signatures = get_stored_signatures(connection)
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError:
+        return False
+
+    return stored_signatures == {source_key: source_file[1] for source_key, source_file in
+                                 get_source_files(scrub_analysis_dir).items()}
+
+
+def open_results_database(database_file):
+    """This function opens the results database, creating a new database if it is missing or can not be used.
+
+    Inputs:
+        - database_file: Absolute path to the results database [Path object]
+
+    Outputs:
+        - connection: Open connection to the results database [sqlite3.Connection]
+    """
+
+    # Open the existing database
+    if database_file.is_file():
+        connection = sqlite3.connect(str(database_file))
+        try:
+            connection.execute('SELECT source, kind, mtime_ns, size FROM sources LIMIT 1')
+            connection.execute('SELECT also_reported_by FROM findings LIMIT 1')
+            return connection
+        except sqlite3.DatabaseError:
+            connection.close()
+            logging.info('\t>> Results database %s is out of date and will be replaced.', database_file)
+            database_file.unlink()
+
+    # Create a new database
+    connection = sqlite3.connect(str(database_file))
+    connection.executescript(DATABASE_SCHEMA)
+
+    return connection
+
+
+def remove_source(connection, source, kind):
+    """This function removes all the data that came from a single file from the results database.
+
+    Inputs:
+        - connection: Open connection to the results database [sqlite3.Connection]
+        - source: Name of the tool the file belongs to [string]
+        - kind: Kind of data in the file (findings or metrics) [string]
+    """
+
+    if kind == 'findings':
+        connection.execute('DELETE FROM code_flows WHERE finding_id IN '
+                           '(SELECT finding_id FROM findings WHERE source = ?)', (source,))
+        connection.execute('DELETE FROM findings WHERE source = ?', (source,))
+    else:
+        connection.execute('DELETE FROM metrics WHERE source = ?', (source,))
+    connection.execute('DELETE FROM sources WHERE source = ? AND kind = ?', (source, kind))
+
+
+def add_findings(connection, results_file, source, source_root):
+    """This function adds the findings and code flows of a SCRUB output file to the results database.
+
+    Inputs:
+        - connection: Open connection to the results database [sqlite3.Connection]
+        - results_file: Absolute path to the SCRUB output file [Path object]
+        - source: Name of the results file (e.g. codeql, compiler) [string]
+        - source_root: Absolute path to the source root directory [Path object]
+    """
+
+    for warning in translate_results.iterate_results(results_file, source_root):
+        cursor = connection.execute('INSERT INTO findings (source, scrub_id, tool, file, line, priority, rule, '
+                                    'description, also_reported_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                    (source, warning['id'], warning['tool'],
+                                     get_stored_path(warning['file'], source_root), warning['line'],
+                                     warning['priority'], warning['query'], '\n'.join(warning['description']),
+                                     ','.join(warning['also_reported_by'])))
+        connection.executemany('INSERT INTO code_flows (finding_id, step, file, line, description) '
+                               'VALUES (?, ?, ?, ?, ?)',
+                               [(cursor.lastrowid, step, str(flow_step['file']), flow_step['line'],
+                                 flow_step['description'])
+                                for step, flow_step in enumerate(warning['code_flow'])])
+
+
+def add_metrics(connection, metrics_file, source, source_root):
+    """This function adds the metrics of a SCRUB metrics file to the results database.
+
+    Inputs:
+        - connection: Open connection to the results database [sqlite3.Connection]
+        - metrics_file: Absolute path to the metrics file [Path object]
+        - source: Name of the tool that produced the metrics [string]
+        - source_root: Absolute path to the source root directory [Path object]
+    """
+
+    for scope, scope_metrics in parse_metrics.parse_csv(metrics_file, source_root).items():
+        if scope != 'project':
+            scope = get_stored_path(pathlib.Path(scope), source_root)
+        connection.executemany('INSERT INTO metrics (source, scope, metric, value) VALUES (?, ?, ?, ?)',
+                               [(source, scope, metric, value) for metric, value in scope_metrics.items()])
+
+
+def update_results_database(database_file, scrub_analysis_dir, source_root):
+    """This function updates the SQLite database containing all filtered findings, code flows, and metrics.
+
+    The modification time and size of every file are stored in the database, and only the files that have been added,
+    changed, or removed since the last update are processed. All the changes are made in a single transaction.
+
+    Inputs:
+        - database_file: Absolute path to the results database [Path object]
+        - scrub_analysis_dir: Absolute path to the directory containing the SCRUB output files [Path object]
+        - source_root: Absolute path to the source root directory [Path object]
+
+    Outputs:
+        - results.db: SQLite database of all results
+    """
+
+    # Print a status message
+    logging.info('')
+    logging.info('\tUpdating results database...')
+    logging.info('\t>> Executing command: results_database.update_results_database(%s, %s, %s)', database_file,
+                 scrub_analysis_dir, source_root)
+
+    # Initialize variables
+    source_files = get_source_files(scrub_analysis_dir)
+    update_count = 0
+
+    connection = open_results_database(database_file)
+    try:
+        with connection:
+            stored_signatures = get_stored_signatures(connection)
+
+            # Remove the data from files that have been removed or changed
+            for source, kind in sorted(stored_signatures):
+                if source_files.get((source, kind), (None, None))[1] != stored_signatures[(source, kind)]:
+                    remove_source(connection, source, kind)
+
+            # Add the data from files that have been added or changed
+            for (source, kind), (source_file, file_signature) in sorted(source_files.items()):
+                if file_signature is None or stored_signatures.get((source, kind)) == file_signature:
+                    continue
+                if kind == 'findings':
+                    add_findings(connection, source_file, source, source_root)
+                else:
+                    add_metrics(connection, source_file, source, source_root)
+                connection.execute('INSERT INTO sources (source, kind, mtime_ns, size) VALUES (?, ?, ?, ?)',
+                                   (source, kind) + file_signature)
+                update_count = update_count + 1
+    finally:
+        connection.close()
+
+    # Print a status message
+    logging.info('\t>> Updated %d of %d results files.', update_count, len(source_files))
+
+
+def query_findings(database_file, source_root, sources=None, files=None, tools=None, rules=None, priorities=None):
+    """This function retrieves findings from the results database.
+
+    Inputs:
+        - database_file: Absolute path to the results database [Path object]
+        - source_root: Absolute path to the source root directory [Path object]
+        - sources: Names of the results files (e.g. codeql, compiler) of interest [list of strings] [optional]
+        - files: Absolute paths to the source files of interest [list of Path objects] [optional]
+        - tools: Names of the tools of interest [list of strings] [optional]
+        - rules: Names of the rules of interest [list of strings] [optional]
+        - priorities: Priorities of interest [list of strings] [optional]
+
+    Outputs:
+        - warning_list: List of the findings that match all the provided criteria [list of dicts]
+    """
+
+    # Initialize variables
+    warning_list = []
+    conditions = []
+    parameters = []
+
+    connection = sqlite3.connect(str(database_file))
+    try:
+        # Add the simple conditions
+        for column, values in (('source', sources), ('tool', tools), ('rule', rules), ('priority', priorities)):
+            if values is not None:
+                values = list(values)
+                conditions.append('{} IN ({})'.format(column, ','.join('?' * len(values))))
+                parameters.extend(values)
+
+        # Store the file list in a temporary table so it can be joined against
+        if files is not None:
+            connection.execute('CREATE TEMP TABLE selected_files (file TEXT PRIMARY KEY)')
+            connection.executemany('INSERT OR IGNORE INTO selected_files (file) VALUES (?)',
+                                   [(get_stored_path(pathlib.Path(file), source_root),) for file in files])
+            conditions.append('file IN (SELECT file FROM selected_files)')
+
+        # Get the findings
+        query = ('SELECT finding_id, scrub_id, tool, file, line, priority, rule, description, also_reported_by '
+                 'FROM findings')
+        if conditions:
+            query = query + ' WHERE ' + ' AND '.join(conditions)
+        query = query + ' ORDER BY finding_id'
+        findings = connection.execute(query, parameters).fetchall()
+
+        # Store the selected findings in a temporary table, so only their code flows are retrieved
+        code_flows = {}
+        if findings:
+            code_flow_query = 'SELECT finding_id, file, line, description FROM code_flows'
+            if conditions:
+                connection.execute('CREATE TEMP TABLE selected_findings (finding_id INTEGER PRIMARY KEY)')
+                connection.executemany('INSERT INTO selected_findings (finding_id) VALUES (?)',
+                                       [(finding[0],) for finding in findings])
+                code_flow_query = code_flow_query + ' WHERE finding_id IN (SELECT finding_id FROM selected_findings)'
+
+            # Get the code flows for the selected findings
+            for finding_id, flow_file, flow_line, flow_description in connection.execute(
+                    code_flow_query + ' ORDER BY finding_id, step'):
+                code_flows.setdefault(finding_id, []).append(
+                    translate_results.create_code_flow(pathlib.Path(flow_file), flow_line, flow_description))
+    finally:
+        connection.close()
+
+    # Create the warnings
+    for finding_id, scrub_id, tool, stored_path, line, priority, rule, description, also_reported_by in findings:
+        warning_file = path_cache.resolve_path(stored_path, source_root)
+        warning_list.append(translate_results.create_warning(scrub_id, warning_file, line, description.split('\n'),
+                                                             tool, priority, rule,
+                                                             code_flow=code_flows.get(finding_id, []),
+                                                             also_reported_by=[contributing_tool for contributing_tool
+                                                                               in also_reported_by.split(',')
+                                                                               if contributing_tool]))
+
+    return warning_list
+
+
+def query_metrics(database_file, source_root, source):
+    """This function retrieves the metrics for a single tool from the results database.
+
+    Inputs:
+        - database_file: Absolute path to the results database [Path object]
+        - source_root: Absolute path to the source root directory [Path object]
+        - source: Name of the tool of interest [string]
+
+    Outputs:
+        - metrics_data: Dictionary of metrics values, in the same format as parse_metrics.parse_csv [dict]
+    """
+
+    # Initialize variables
+    metrics_data = {}
+
+    connection = sqlite3.connect(str(database_file))
+    try:
+        for scope, metric, value in connection.execute('SELECT scope, metric, value FROM metrics WHERE source = ?',
+                                                       (source,)):
+            if scope != 'project':
+                scope = str(source_root.joinpath(scope))
+            metrics_data.setdefault(scope, {})[metric] = value
+    finally:
+        connection.close()
+
+    return metrics_data
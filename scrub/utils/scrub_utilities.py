@@ -6,6 +6,7 @@ import json
 import shutil
 import pathlib
 import logging
+import logging.handlers
 import threading
 import subprocess
 import configparser
@@ -276,6 +277,39 @@ def create_logger(log_file, console_logging=logging.INFO):
     # console.setLevel(console_logging)
 
 
+def start_log_listener(log_queue):
+    """This function writes log records sent by worker processes using the handlers of the current logger, so that
+    worker output reaches the log file regardless of how the worker processes are started.
+
+    Inputs:
+        - log_queue: Queue that worker processes send their log records to, such as a multiprocessing.Manager queue
+                     that can be passed to pool tasks [Queue]
+
+    Outputs:
+        - log_listener: Running listener, which must be stopped once the workers are finished [QueueListener]
+    """
+
+    # Create the listener
+    log_listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers,
+                                                  respect_handler_level=True)
+    log_listener.start()
+
+    return log_listener
+
+
+def initialize_worker_logger(log_queue):
+    """This function configures the logger of a worker process to send every record to the parent process.
+
+    Inputs:
+        - log_queue: Queue that is read by the listener from start_log_listener [Queue]
+    """
+
+    # Replace any handlers inherited from the parent process
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root_logger.setLevel(logging.DEBUG)
+
+
 def create_conf_file(output_path=None):
     """
     This function generates a blank configuration file at the desired output location.
@@ -395,10 +429,20 @@ def parse_common_configs(user_conf_file, raw_override_values):
     if scrub_conf_data.get('query_filters') == '':
         analysis_filters_file = user_conf_file.parent.joinpath('SCRUBExcludeQueries')
         scrub_conf_data.update({'query_filters': analysis_filters_file})
+    if scrub_conf_data.get('filter_rules') == '':
+        filter_rules_file = user_conf_file.parent.joinpath('SCRUBFilterRules')
+        scrub_conf_data.update({'filter_rules': filter_rules_file})
     if scrub_conf_data.get('collaborator_filters') == '':
         collaborator_filters = user_conf_file.parent.joinpath('SCRUBCollaboratorFilters')
         scrub_conf_data.update({'collaborator_filters': collaborator_filters})
 
+    # Set the SARIF output format
+    sarif_output_format = str(scrub_conf_data.get('sarif_output_format') or 'pretty').lower()
+    if sarif_output_format not in ('pretty', 'compact', 'gzip'):
+        print('WARNING: Unknown SARIF_OUTPUT_FORMAT value {}. Using pretty instead.'.format(sarif_output_format))
+        sarif_output_format = 'pretty'
+    scrub_conf_data.update({'sarif_output_format': sarif_output_format})
+
     # Set the SCRUB working directory
     if (scrub_conf_data.get('scrub_working_dir') is None) or (scrub_conf_data.get('scrub_working_dir') == ''):
         scrub_working_dir = scrub_conf_data.get('scrub_analysis_dir')
@@ -441,6 +485,26 @@ def parse_common_configs(user_conf_file, raw_override_values):
     filtering_output_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('SCRUBAnalysisFilteringList')
     scrub_conf_data.update({'filtering_output_file': filtering_output_file})
 
+    # Add the suppression index file
+    suppression_index_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('suppression_index.json')
+    scrub_conf_data.update({'suppression_index_file': suppression_index_file})
+
+    # Add the results database file
+    results_database_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('results.db')
+    scrub_conf_data.update({'results_database_file': results_database_file})
+
+    # Add the SARIF import cache directory
+    sarif_import_cache_dir = scrub_conf_data.get('scrub_analysis_dir').joinpath('sarif_import_cache')
+    scrub_conf_data.update({'sarif_import_cache_dir': sarif_import_cache_dir})
+
+    # Add the merged SARIF output file
+    merged_sarif_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('scrub_all.sarif')
+    scrub_conf_data.update({'merged_sarif_file': merged_sarif_file})
+
+    # Add the filtering profile file
+    filter_profile_file = scrub_conf_data.get('scrub_analysis_dir').joinpath('filter_profile.json')
+    scrub_conf_data.update({'filter_profile_file': filter_profile_file})
+
     return scrub_conf_data
 
 
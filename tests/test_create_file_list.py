@@ -0,0 +1,69 @@
+import re
+import pytest
+import pathlib
+from scrub.utils.filtering import create_file_list
+
+
+FILE_LIST = ['/src/a.c', '/src/a.h', '/src/lib/b.c', '/src/lib/b.h', '/src/test/test_a.c', '/src/test/data/c.c',
+             '/src/test/test_a.c', '/src/lib/b.c']
+
+FILTERING_OPTIONS = [
+    # Overlapping include and exclude options
+    [('-', r'/test/'), ('+', r'test_'), ('-', r'\.c$')],
+    # Repeated include options must be undone by the same number of exclude options
+    [('+', r'/lib/'), ('+', r'b\.c'), ('-', r'/lib/'), ('-', r'\.c$')],
+    [('+', r'/lib/'), ('+', r'/lib/'), ('-', r'/lib/'), ('-', r'/lib/'), ('-', r'\.h$')],
+    # Exclude options never remove more references than there are
+    [('-', r'\.h$'), ('-', r'\.h$'), ('+', r'a\.h')],
+    # Options with group references are applied one at a time
+    [('-', r'/(test)/\1_'), ('+', r'(lib)/b'), ('-', r'(?P<ext>\.h)$'), ('-', r'^/src/[a-z]\.(h)$')],
+    # Invalid options are skipped
+    [('-', r'['), ('-', r'a\.c$'), ('+', r'.*a.*')],
+    []
+]
+
+
+def create_reference_list(file_list, filtering_options):
+    # Apply every option to the list in order, the same way the original implementation did
+    filtered_file_list = file_list.copy()
+    for option_type, option_pattern in filtering_options:
+        try:
+            option_regex = re.compile(option_pattern).search
+        except re.error:
+            continue
+        for file_path in list(filter(option_regex, file_list)):
+            if option_type == '-' and file_path in filtered_file_list:
+                filtered_file_list.remove(file_path)
+            elif option_type == '+':
+                filtered_file_list.append(file_path)
+    return sorted(set(filtered_file_list))
+
+
+@pytest.mark.parametrize('filtering_options', FILTERING_OPTIONS)
+def test_check_file(filtering_options):
+    compiled_options = create_file_list.compile_filtering_options(filtering_options)
+
+    included_files = [file_path for file_path in set(FILE_LIST)
+                      if create_file_list.check_file(file_path, *compiled_options)]
+    assert sorted(included_files) == create_reference_list(FILE_LIST, filtering_options)
+
+    # The result is the same when every option is applied one at a time
+    assert [create_file_list.check_file(file_path, compiled_options[0], None, None) for file_path in FILE_LIST] == \
+        [create_file_list.check_file(file_path, *compiled_options) for file_path in FILE_LIST]
+
+
+@pytest.mark.parametrize('filtering_options', FILTERING_OPTIONS)
+def test_create_file_list(tmp_path, filtering_options):
+    initial_filtering_list = tmp_path.joinpath('initial_list')
+    initial_filtering_list.write_text(''.join(file_path + '\n\n' for file_path in FILE_LIST + ['/src/.git/config']))
+    filtering_options_file = tmp_path.joinpath('SCRUBFilters')
+    filtering_options_file.write_text(''.join('{} {}\n'.format(*option) for option in filtering_options))
+    filtering_output_file = tmp_path.joinpath('SCRUBAnalysisFilesList')
+    create_file_list.create_file_list('/src', filtering_output_file, filtering_options_file, initial_filtering_list)
+
+    # Every file is listed once, and the default options are applied last
+    default_options = create_file_list.parse_filtering_file(pathlib.Path(create_file_list.__file__).parent
+                                                            .joinpath('FilteringDefaults'))
+    assert filtering_output_file.read_text().splitlines() == \
+        [file_path[len('/src/'):] for file_path in create_reference_list(FILE_LIST + ['/src/.git/config'],
+                                                                         filtering_options + default_options)]
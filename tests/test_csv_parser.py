@@ -0,0 +1,40 @@
+from scrub.tools.parsers import csv_parser
+from scrub.tools.parsers import translate_results
+from scrub.utils import results_database
+
+
+def create_results_dir(tmp_path):
+    source_root = tmp_path.resolve()
+    scrub_root = source_root.joinpath('.scrub')
+    scrub_root.mkdir()
+    warnings = [translate_results.create_warning('codeql{:03d}'.format(i), source_root.joinpath('src/a.c'), i,
+                                                 ['Description, {}'.format(i)], 'codeql', 'Low', 'rule')
+                for i in range(1, 4)]
+    translate_results.create_scrub_output_file(warnings, scrub_root.joinpath('codeql.scrub'))
+    return scrub_root
+
+
+def read_output(scrub_root):
+    return [output_file.read_text() for output_file in scrub_root.joinpath('csv_output').glob('*.csv')]
+
+
+def test_parse_warnings(tmp_path, monkeypatch):
+    scrub_root = create_results_dir(tmp_path)
+
+    # Without a results database, the SCRUB files are read
+    csv_parser.parse_warnings(scrub_root, 'generic')
+    expected_output = read_output(scrub_root)
+    assert expected_output == ['ID,Query,Description,Priority,File,Line\n'
+                               'codeql001,rule,Description 1,Low,src/a.c,1\n'
+                               'codeql002,rule,Description 2,Low,src/a.c,2\n'
+                               'codeql003,rule,Description 3,Low,src/a.c,3\n']
+
+    # With an up to date results database, the SCRUB files are not read
+    results_database.update_results_database(scrub_root.joinpath('results.db'), scrub_root, scrub_root.parent)
+
+    def iterate_results(scrub_file, source_root):
+        raise AssertionError(scrub_file)
+
+    monkeypatch.setattr(translate_results, 'iterate_results', iterate_results)
+    csv_parser.parse_warnings(scrub_root, 'generic')
+    assert read_output(scrub_root) == expected_output
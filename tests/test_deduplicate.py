@@ -0,0 +1,108 @@
+import pathlib
+from scrub.tools.parsers import translate_results
+from scrub.utils.filtering import deduplicate
+
+
+def test_normalize_rule():
+    # Rules in the mapping table are linked across tools
+    assert deduplicate.normalize_rule('-Wunused-variable') == 'unused variable'
+    assert deduplicate.normalize_rule('cpp/unused-local-variable') == 'unused variable'
+    assert deduplicate.normalize_rule('cpp:S1481') == 'unused variable'
+    assert deduplicate.normalize_rule(' unused-variable ') == 'unused variable'
+    assert deduplicate.normalize_rule('LANG.MEM.NPD') == deduplicate.normalize_rule('FORWARD_NULL')
+
+    # Other rules are compared by their normalized names
+    assert deduplicate.normalize_rule('-Wfloat-equal') == 'equal float'
+    assert deduplicate.normalize_rule('misc/float_equal') == 'equal float'
+    assert deduplicate.normalize_rule('-Wno-float-equal') == 'equal float'
+    assert deduplicate.normalize_rule('') == ''
+
+
+def test_rule_categories_are_unique():
+    rule_names = [rule_name for rule_names in deduplicate.RULE_CATEGORIES.values() for rule_name in rule_names]
+
+    assert len(rule_names) == len(set(rule_names))
+    assert all(rule_name == rule_name.lower() for rule_name in rule_names)
+
+
+def test_get_rule_name():
+    compiler_warning = translate_results.create_warning(
+        'gcc001', pathlib.Path('/src/a.c'), 5, ['GCC Compiler Warning:',
+                                                "\ta.c:5:9: warning: unused variable 'x' [-Wunused-variable]"], 'gcc')
+    unknown_warning = translate_results.create_warning('gcc002', pathlib.Path('/src/a.c'), 5, ['Unknown'], 'gcc')
+
+    assert deduplicate.get_rule_name(compiler_warning) == '-Wunused-variable'
+    assert deduplicate.get_duplicate_key(compiler_warning) == ('/src/a.c', 5, 'unused variable')
+    assert deduplicate.get_duplicate_key(unknown_warning) is None
+
+
+def test_add_contributing_tool():
+    warning = translate_results.create_warning('codeql001', pathlib.Path('/src/a.c'), 5, ['Unused'], 'codeql')
+
+    assert deduplicate.add_contributing_tool(warning, 'sonarqube')
+    assert not deduplicate.add_contributing_tool(warning, 'sonarqube')
+    assert not deduplicate.add_contributing_tool(warning, 'codeql')
+    assert deduplicate.add_contributing_tool(warning, 'gcc')
+    assert warning['also_reported_by'] == ['sonarqube', 'gcc']
+    assert warning['description'] == ['Unused']
+
+
+def write_results(results_file, warnings):
+    translate_results.create_scrub_output_file(warnings, results_file)
+
+
+def test_deduplicate_results(tmp_path):
+    source_root = tmp_path.resolve()
+    source_file = source_root.joinpath('a.c')
+    codeql_file = source_root.joinpath('codeql.scrub')
+    compiler_file = source_root.joinpath('compiler.scrub')
+    sonarqube_file = source_root.joinpath('sonarqube.scrub')
+    write_results(codeql_file, [
+        translate_results.create_warning('codeql001', source_file, 5, ['Variable x is not used.'], 'codeql', 'Low',
+                                         'cpp/unused-local-variable'),
+        translate_results.create_warning('codeql002', source_file, 5, ['Variable y is not used.'], 'codeql', 'Low',
+                                         'cpp/unused-local-variable')])
+    write_results(compiler_file, [
+        translate_results.create_warning('gcc001', source_file, 5, ["unused variable 'x' [-Wunused-variable]"],
+                                         'gcc'),
+        translate_results.create_warning('gcc002', source_file, 5, ['Something without a flag'], 'gcc'),
+        translate_results.create_warning('gcc003', source_file, 6, ["unused variable 'z' [-Wunused-variable]"],
+                                         'gcc')])
+    write_results(sonarqube_file, [
+        translate_results.create_warning('sonarqube001', source_file, 5, ['Remove the unused variable.'],
+                                         'sonarqube', 'Low', 'cpp:S1481'),
+        translate_results.create_warning('sonarqube002', source_file, 5, ['Shadowed declaration.'], 'sonarqube',
+                                         'Low', 'cpp:S1117')])
+    results_files = [codeql_file, compiler_file, sonarqube_file]
+
+    assert deduplicate.deduplicate_results(results_files, source_root) == 2
+
+    # Findings from the same tool, on other lines, in other categories, or without a rule are kept
+    codeql_warnings = translate_results.parse_scrub(codeql_file, source_root)
+    assert [warning['id'] for warning in codeql_warnings] == ['codeql001', 'codeql002']
+    assert [warning['id'] for warning in translate_results.parse_scrub(compiler_file, source_root)] == \
+        ['gcc002', 'gcc003']
+    assert [warning['id'] for warning in translate_results.parse_scrub(sonarqube_file, source_root)] == \
+        ['sonarqube002']
+
+    # The contributing tools are recorded on the canonical finding, and are read back from the output file
+    translate_results.clear_results_cache()
+    codeql_warnings = translate_results.parse_scrub(codeql_file, source_root)
+    assert codeql_warnings[0]['also_reported_by'] == ['gcc', 'sonarqube']
+    assert codeql_warnings[0]['description'] == ['Variable x is not used.']
+    assert codeql_warnings[1]['also_reported_by'] == []
+
+    # Deduplicating again does not remove anything else
+    assert deduplicate.deduplicate_results(results_files, source_root) == 0
+
+
+def test_sarif_properties(tmp_path):
+    source_root = tmp_path.resolve()
+    source_file = source_root.joinpath('a.c')
+    source_file.write_text('int x;\n')
+    warning = translate_results.create_warning('codeql001', source_file, 1, ['Unused'], 'codeql', 'Low',
+                                               'cpp/unused-local-variable', also_reported_by=['gcc'])
+    sarif_file = source_root.joinpath('codeql.sarif')
+    translate_results.create_sarif_output_file([warning], '2.1.0', sarif_file, source_root, 'codeql')
+
+    assert translate_results.parse_sarif(sarif_file, source_root)[0]['also_reported_by'] == ['gcc']
@@ -0,0 +1,48 @@
+import json
+from sarif import loader
+from sarif.operations import diff_op
+from scrub.tools.parsers import translate_results
+from scrub.utils import results_database
+from scrub.utils import diff_results
+from scrub.utils import scrub_utilities
+from scrub.utils.filtering import do_filtering
+
+
+def create_results_dir(source_root, shift):
+    scrub_root = source_root.joinpath('.scrub')
+    scrub_root.joinpath('sarif_results').mkdir(parents=True)
+    source_root.joinpath('a.c').write_text('int x;\n' * 50)
+    for tool, warning_count in (('codeql', 6), ('gcc', 4)):
+        warnings = [translate_results.create_warning('{}{:03d}'.format(tool, i), source_root.joinpath('a.c'),
+                                                     (i * 3 + shift) % 40 + 1, ['Message {}'.format(i % 3)], tool,
+                                                     ('Low', 'Med', 'High')[i % 3], 'rule{}'.format(i % 2 + shift))
+                    for i in range(warning_count + shift)]
+        translate_results.create_scrub_output_file(warnings, scrub_root.joinpath(tool + '.scrub'))
+    do_filtering.generate_sarif({'source_dir': source_root, 'scrub_analysis_dir': scrub_root,
+                                 'sarif_results_dir': scrub_root.joinpath('sarif_results'),
+                                 'sarif_output_format': 'pretty'})
+    results_database.update_results_database(scrub_root.joinpath('results.db'), scrub_root, source_root)
+    return scrub_root
+
+
+def test_diff_results_database(tmp_path, monkeypatch):
+    baseline_root = create_results_dir(tmp_path.resolve().joinpath('baseline'), 0)
+    comparison_root = create_results_dir(tmp_path.resolve().joinpath('comparison'), 1)
+    monkeypatch.chdir(tmp_path)
+
+    # The results databases are diffed without running the sarif command
+    def execute_command(call_string, my_env, output_file=None, interactive=False):
+        raise AssertionError(call_string)
+
+    monkeypatch.setattr(scrub_utilities, 'execute_command', execute_command)
+    diff_results.diff(baseline_root, comparison_root)
+
+    # The diff matches the diff of the SARIF files
+    for tool in ('codeql', 'gcc'):
+        sarif_name = tool + '.sarif'
+        diff_op.print_diff(loader.load_sarif_files(str(baseline_root.joinpath('sarif_results', sarif_name))),
+                           loader.load_sarif_files(str(comparison_root.joinpath('sarif_results', sarif_name))),
+                           str(tmp_path.joinpath('expected.json')))
+        tool_diff = json.loads(tmp_path.joinpath('diff_' + sarif_name + '.json').read_text())
+        assert tool_diff == json.loads(tmp_path.joinpath('expected.json').read_text())
+        assert tool_diff['all']['+'] > 0
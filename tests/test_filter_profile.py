@@ -0,0 +1,75 @@
+import json
+from scrub.utils.filtering import filter_profile
+
+
+def test_disabled_profile():
+    filter_profile.record_stage(None, 'micro', 1.0, 10, 2)
+    filter_profile.record_rule(None, 'SCRUBFilters', 'vendor/.*', 3)
+
+
+def test_record_stage():
+    profile = filter_profile.create_profile()
+    filter_profile.record_stage(profile, 'micro', 0.5, 10, 2)
+    filter_profile.record_stage(profile, 'micro', 0.25, 5, 1)
+    filter_profile.record_stage(profile, 'query', 0.1, 8, 0)
+
+    assert profile['stages'] == {'micro': {'time': 0.75, 'checked': 15, 'removed': 3},
+                                 'query': {'time': 0.1, 'checked': 8, 'removed': 0}}
+
+
+def test_record_rule():
+    profile = filter_profile.create_profile()
+    filter_profile.record_rule(profile, 'SCRUBFilters', 'vendor/.*', 3, 0.5)
+    filter_profile.record_rule(profile, 'SCRUBFilters', 'vendor/.*', 2)
+    filter_profile.record_rule(profile, 'SCRUBFilterRules', 'Unused rule', 0)
+
+    assert profile['rules'] == {'SCRUBFilters': {'vendor/.*': {'hits': 5, 'time': 0.5}},
+                                'SCRUBFilterRules': {'Unused rule': {'hits': 0, 'time': 0.0}}}
+
+
+def test_merge_profiles():
+    profile = filter_profile.create_profile()
+    other_profile = filter_profile.create_profile()
+    filter_profile.record_stage(profile, 'micro', 1.0, 10, 2)
+    filter_profile.record_stage(other_profile, 'micro', 2.0, 20, 4)
+    filter_profile.record_rule(other_profile, 'SCRUBExcludeQueries', 'gcc:-Wshadow', 7, 0.25)
+    filter_profile.merge_profiles(profile, other_profile)
+
+    assert profile['stages']['micro'] == {'time': 3.0, 'checked': 30, 'removed': 6}
+    assert profile['rules']['SCRUBExcludeQueries']['gcc:-Wshadow'] == {'hits': 7, 'time': 0.25}
+
+    # Empty profiles can be merged
+    filter_profile.merge_profiles(profile, {})
+    assert profile['stages']['micro']['checked'] == 30
+
+
+def test_write_profile(tmp_path):
+    profile_file = tmp_path.joinpath('filter_profile.json')
+    first_profile = filter_profile.create_profile()
+    filter_profile.record_stage(first_profile, 'micro', 1.0, 10, 2)
+    filter_profile.record_rule(first_profile, 'SCRUBFilters', 'cheap', 1, 0.1)
+    filter_profile.write_profile(first_profile, profile_file)
+
+    # Later filtering passes are added to the existing profile
+    second_profile = filter_profile.create_profile()
+    filter_profile.record_stage(second_profile, 'micro', 1.0, 5, 1)
+    filter_profile.record_rule(second_profile, 'SCRUBFilters', 'expensive', 0, 2.0)
+    filter_profile.record_rule(second_profile, 'SCRUBFilters', 'cheap', 1, 0.1)
+    filter_profile.write_profile(second_profile, profile_file)
+
+    with open(profile_file, 'r') as input_fh:
+        written_profile = json.load(input_fh)
+    assert written_profile['stages'] == {'micro': {'time': 2.0, 'checked': 15, 'removed': 3}}
+    assert list(written_profile['rules']['SCRUBFilters']) == ['expensive', 'cheap']
+    assert written_profile['rules']['SCRUBFilters']['cheap'] == {'hits': 2, 'time': 0.2}
+
+
+def test_write_profile_replaces_invalid_file(tmp_path):
+    profile_file = tmp_path.joinpath('filter_profile.json')
+    profile_file.write_text('not json')
+    profile = filter_profile.create_profile()
+    filter_profile.record_stage(profile, 'parse', 0.5, 4, 0)
+    filter_profile.write_profile(profile, profile_file)
+
+    with open(profile_file, 'r') as input_fh:
+        assert json.load(input_fh) == {'stages': {'parse': {'time': 0.5, 'checked': 4, 'removed': 0}}, 'rules': {}}
@@ -0,0 +1,150 @@
+import os
+from scrub.utils.filtering import filter_rules
+
+
+def create_warning(tool='gcc', priority='Low', line=10, query='-Wconversion', description=('Implicit conversion',)):
+    return {'tool': tool, 'priority': priority, 'line': line, 'query': query, 'description': list(description)}
+
+
+def test_parse_filter_rules(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    rules_file.write_text('[Vendored code]\n'
+                          'path = vendor/*, third_party/*\n'
+                          '\n'
+                          '[Low priority conversions]\n'
+                          'tool = GCC, codeql\n'
+                          'priority = Low\n'
+                          'lines = 5-\n'
+                          'rule = -W*conversion*\n'
+                          'description = [Cc]onversion\n')
+
+    rules = filter_rules.parse_filter_rules(rules_file)
+    assert [rule['name'] for rule in rules] == ['Vendored code', 'Low priority conversions']
+    assert rules[0]['path'].fullmatch('vendor/lib/file.c')
+    assert not rules[0]['path'].fullmatch('src/vendor/file.c')
+    assert rules[1]['tool'] == {'gcc', 'codeql'}
+    assert rules[1]['priority'] == {'low'}
+    assert rules[1]['lines'] == (5, None)
+
+
+def test_parse_line_range():
+    assert filter_rules.parse_line_range('5-10') == (5, 10)
+    assert filter_rules.parse_line_range('-10') == (0, 10)
+    assert filter_rules.parse_line_range('5-') == (5, None)
+    assert filter_rules.parse_line_range('7') == (7, 7)
+
+
+def test_invalid_rules(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    rules_file.write_text('[Bad priority]\n'
+                          'priority = urgent\n'
+                          '\n'
+                          '[Unknown field]\n'
+                          'severity = low\n'
+                          '\n'
+                          '[Bad line range]\n'
+                          'lines = ten-twenty\n'
+                          '\n'
+                          '[Bad expression]\n'
+                          'description = (unclosed\n'
+                          '\n'
+                          '[Valid]\n'
+                          'tool = gcc\n')
+
+    assert [rule['name'] for rule in filter_rules.parse_filter_rules(rules_file)] == ['Valid']
+
+
+def test_unreadable_rules_file(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    rules_file.write_text('[Duplicate]\n'
+                          'tool = gcc\n'
+                          '[Duplicate]\n'
+                          'tool = codeql\n')
+
+    assert filter_rules.parse_filter_rules(rules_file) == []
+
+
+def test_default_section_rejected(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    rules_file.write_text('[DEFAULT]\n'
+                          'tool = gcc\n'
+                          '\n'
+                          '[Generated code]\n'
+                          'path = generated/*\n')
+
+    # The default fields are not merged into the other rules
+    rules = filter_rules.parse_filter_rules(rules_file)
+    assert [rule['name'] for rule in rules] == ['Generated code']
+    assert 'tool' not in rules[0]
+
+
+def test_predicate(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    rules_file.write_text('[Conversions]\n'
+                          'tool = gcc\n'
+                          'priority = low\n'
+                          'lines = 5-20\n'
+                          'rule = -W*conversion*\n'
+                          '\n'
+                          '[Vendored code]\n'
+                          'path = vendor/*\n')
+    predicate = filter_rules.compile_filter_rules(filter_rules.parse_filter_rules(rules_file))
+
+    assert predicate(create_warning(), 'src/file.c') == 'Conversions'
+    assert predicate(create_warning(line=30), 'src/file.c') is None
+    assert predicate(create_warning(priority='High'), 'src/file.c') is None
+    assert predicate(create_warning(tool='codeql'), 'src/file.c') is None
+    assert predicate(create_warning(tool='codeql'), 'vendor/file.c') == 'Vendored code'
+
+    # Rules are checked in the order of the file
+    assert predicate(create_warning(), 'vendor/file.c') == 'Conversions'
+
+
+class RecordingWarning(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.accessed_fields = []
+
+    def __getitem__(self, key):
+        self.accessed_fields.append(key)
+        return super().__getitem__(key)
+
+
+def test_selectivity_order(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    rules_file.write_text('[Generated tables]\n'
+                          'priority = low, med\n'
+                          'path = generated/*\n')
+    predicate = filter_rules.compile_filter_rules(filter_rules.parse_filter_rules(rules_file))
+
+    # Every test is performed while sampling, with the cheaper priority test first
+    warning = RecordingWarning(create_warning(priority='Low'))
+    assert predicate(warning, 'src/file.c') is None
+    assert warning.accessed_fields == ['tool', 'priority']
+    for i in range(filter_rules.SELECTIVITY_SAMPLE_SIZE - 1):
+        assert predicate(create_warning(priority='Low'), 'src/file_{}.c'.format(i)) is None
+
+    # The path test rejected every sampled warning, so it is now performed first
+    warning = RecordingWarning(create_warning(priority='Low'))
+    assert predicate(warning, 'src/file.c') is None
+    assert warning.accessed_fields == ['tool']
+    assert predicate(create_warning(priority='Low'), 'generated/table.c') == 'Generated tables'
+    assert predicate(create_warning(priority='High'), 'generated/table.c') is None
+
+
+def test_get_filter_predicate(tmp_path):
+    rules_file = tmp_path.joinpath('SCRUBFilterRules')
+    assert filter_rules.get_filter_predicate(rules_file) is None
+
+    # Empty files do not create a predicate
+    rules_file.write_text('')
+    assert filter_rules.get_filter_predicate(rules_file) is None
+
+    # The predicate is reused until the file changes
+    rules_file.write_text('[All gcc]\ntool = gcc\n')
+    predicate = filter_rules.get_filter_predicate(rules_file)
+    assert predicate(create_warning(), 'src/file.c') == 'All gcc'
+    assert filter_rules.get_filter_predicate(rules_file) is predicate
+    rules_file.write_text('[All codeql]\ntool = codeql\n')
+    os.utime(str(rules_file), ns=(0, 0))
+    assert filter_rules.get_filter_predicate(rules_file)(create_warning(), 'src/file.c') is None
@@ -0,0 +1,147 @@
+from scrub.tools.parsers import fingerprints
+from scrub.tools.parsers import translate_results
+from scrub.utils import line_cache
+
+
+def create_source_file(tmp_path, lines):
+    source_file = tmp_path.resolve().joinpath('file.c')
+    source_file.write_text(''.join(line + '\n' for line in lines))
+    fingerprints.clear()
+    line_cache.source_line_cache.clear()
+    return source_file
+
+
+def create_warning(source_file, line, query='cpp/unused-local-variable'):
+    return translate_results.create_warning('codeql001', source_file, line, ['Unused'], 'codeql', 'Low', query)
+
+
+def test_whitespace_changes(tmp_path):
+    source_file = create_source_file(tmp_path, ['int a;', 'int b;', 'int c;'])
+    original_fingerprint = fingerprints.create_fingerprint(create_warning(source_file, 2), tmp_path)
+
+    source_file = create_source_file(tmp_path, ['int a;', '    int   b;\r', 'int c;'])
+    assert fingerprints.create_fingerprint(create_warning(source_file, 2), tmp_path) == original_fingerprint
+
+
+def test_unrelated_changes(tmp_path):
+    lines = ['line {}'.format(i) for i in range(1, 21)]
+    source_file = create_source_file(tmp_path, lines)
+    original_fingerprint = fingerprints.create_fingerprint(create_warning(source_file, 10), tmp_path)
+
+    # Lines added far from the warning move it without changing its fingerprint
+    source_file = create_source_file(tmp_path, ['new line'] * 3 + lines)
+    assert fingerprints.create_fingerprint(create_warning(source_file, 13), tmp_path) == original_fingerprint
+
+    # Changes to the surrounding lines change the fingerprint
+    source_file = create_source_file(tmp_path, lines[:10] + ['changed'] + lines[11:])
+    assert fingerprints.create_fingerprint(create_warning(source_file, 10), tmp_path) != original_fingerprint
+
+    # So does the rule
+    assert fingerprints.create_fingerprint(create_warning(source_file, 10, 'cpp/other'), tmp_path) != \
+        fingerprints.create_fingerprint(create_warning(source_file, 10), tmp_path)
+
+
+def test_clear(tmp_path):
+    source_file = create_source_file(tmp_path, ['int a;', 'int b;', 'int c;'])
+    original_fingerprint = fingerprints.create_fingerprint(create_warning(source_file, 2), tmp_path)
+
+    # Changed files are read again once the cache has been cleared
+    source_file.write_text('int a;\nint changed;\nint c;\n')
+    assert fingerprints.create_fingerprint(create_warning(source_file, 2), tmp_path) == original_fingerprint
+    fingerprints.clear()
+    assert fingerprints.create_fingerprint(create_warning(source_file, 2), tmp_path) != original_fingerprint
+
+
+def test_lines_past_end_of_file(tmp_path):
+    source_file = create_source_file(tmp_path, ['int a;', 'int b;'])
+
+    assert fingerprints.get_context_hash(source_file, 2) != fingerprints.get_context_hash(source_file, 3)
+    assert fingerprints.get_context_hash(source_file, 5) != fingerprints.get_context_hash(source_file, 6)
+    assert fingerprints.create_fingerprint(create_warning(source_file, 5), tmp_path) != \
+        fingerprints.create_fingerprint(create_warning(source_file, 6), tmp_path)
+
+
+def test_unreadable_file(tmp_path):
+    fingerprints.clear()
+    missing_file = tmp_path.resolve().joinpath('missing.c')
+
+    assert fingerprints.get_context_hash(missing_file, 1) is None
+    assert fingerprints.create_fingerprint(create_warning(missing_file, 1), tmp_path) != \
+        fingerprints.create_fingerprint(create_warning(missing_file, 2), tmp_path)
+
+
+def test_partial_fingerprints(tmp_path):
+    source_file = create_source_file(tmp_path, ['int a;'])
+    fingerprint_counts = {}
+    first = fingerprints.create_partial_fingerprints(create_warning(source_file, 1), tmp_path, fingerprint_counts)
+    second = fingerprints.create_partial_fingerprints(create_warning(source_file, 1), tmp_path, fingerprint_counts)
+
+    assert first[fingerprints.FINGERPRINT_KEY].endswith(':1')
+    assert second[fingerprints.FINGERPRINT_KEY] == first[fingerprints.FINGERPRINT_KEY][:-1] + '2'
+
+
+def test_cache_budget(tmp_path, monkeypatch):
+    fingerprints.clear()
+    monkeypatch.setattr(fingerprints, 'LINE_HASH_BYTE_BUDGET', 10 * fingerprints.HASH_SIZE)
+    source_files = []
+    for i in range(3):
+        source_file = tmp_path.joinpath('file_{}.c'.format(i))
+        source_file.write_text('line\n' * 4)
+        source_files.append(source_file)
+
+    # Each file has four lines, so only two files fit in the budget
+    for source_file in source_files:
+        assert len(fingerprints.get_line_hashes(source_file)) == 4 * fingerprints.HASH_SIZE
+    assert list(fingerprints.line_hash_cache) == [str(source_file) for source_file in source_files[1:]]
+    assert fingerprints.cached_bytes == 8 * fingerprints.HASH_SIZE
+
+    fingerprints.clear()
+    assert not fingerprints.line_hash_cache
+    assert fingerprints.cached_bytes == 0
+
+
+def create_physical_location(line):
+    return {'artifactLocation': {'uri': 'file.c'}, 'region': {'startLine': line}}
+
+
+def test_add_sarif_snippets(tmp_path):
+    lines = ['line {}'.format(i) for i in range(1, 11)]
+    source_file = create_source_file(tmp_path, lines)
+    context_lines = translate_results.SNIPPET_CONTEXT_LINES
+
+    # The line of interest and the lines that surround it are added
+    physical_location = create_physical_location(5)
+    translate_results.add_sarif_snippets(physical_location, source_file, 5)
+    assert physical_location['region'] == {'startLine': 5, 'snippet': {'text': 'line 5\n'}}
+    assert physical_location['contextRegion'] == {
+        'startLine': 5 - context_lines,
+        'endLine': 5 + context_lines,
+        'snippet': {'text': ''.join(line + '\n' for line in lines[4 - context_lines:5 + context_lines])}
+    }
+
+    # The context is clamped at the start and end of the file
+    for line, first_line, last_line in [(1, 1, 1 + context_lines), (10, 10 - context_lines, 10)]:
+        physical_location = create_physical_location(line)
+        translate_results.add_sarif_snippets(physical_location, source_file, line)
+        assert physical_location['region']['snippet'] == {'text': 'line {}\n'.format(line)}
+        assert physical_location['contextRegion'] == {
+            'startLine': first_line,
+            'endLine': last_line,
+            'snippet': {'text': ''.join(source_line + '\n' for source_line in lines[first_line - 1:last_line])}
+        }
+
+    # Nothing is added for lines that do not exist
+    for line in (0, -1, 11, 11 + context_lines):
+        physical_location = create_physical_location(line)
+        translate_results.add_sarif_snippets(physical_location, source_file, line)
+        assert physical_location == create_physical_location(line)
+
+
+def test_add_sarif_snippets_unreadable_file(tmp_path):
+    line_cache.source_line_cache.clear()
+
+    # Nothing is added for files that can not be read
+    for source_file in (tmp_path.resolve().joinpath('missing.c'), tmp_path.resolve()):
+        physical_location = create_physical_location(1)
+        translate_results.add_sarif_snippets(physical_location, source_file, 1)
+        assert physical_location == create_physical_location(1)
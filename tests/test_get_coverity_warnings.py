@@ -0,0 +1,63 @@
+import json
+import pathlib
+from scrub.tools.parsers import get_coverity_warnings
+from scrub.tools.parsers import translate_results
+
+
+def create_issue(file, line, checker, impact, events):
+    return {'mainEventFilePathname': file, 'mainEventLineNumber': line, 'checkerName': checker,
+            'checkerProperties': {'subcategoryLongDescription': 'Description of ' + checker, 'impact': impact},
+            'events': events}
+
+
+def create_event(tag, line, description):
+    return {'eventTag': tag, 'strippedFilePathname': 'src/a.c', 'lineNumber': line, 'eventDescription': description}
+
+
+def create_results_file(tmp_path):
+    issues = [create_issue('/src/a.c', 10, 'CHECKED_RETURN', 'High',
+                           [create_event('check_return', 10, 'Calling "read" without checking the return value.'),
+                            create_event('caretline', 10, '^')]),
+              create_issue('/src/b.c', '20', 'UNINIT', 'Medium', [create_event('var_decl', 18, 'Declaring x')]),
+              create_issue('/src/c.c', 30, 'DEADCODE', 'Audit', []),
+              {'mainEventFilePathname': '/src/d.c', 'mainEventLineNumber': 40, 'checkerName': 'MISSING_PROPERTIES'}]
+    results_file = tmp_path.joinpath('coverity.json')
+    results_file.write_text(json.dumps({'type': 'Coverity issues', 'formatVersion': 8, 'issues': issues}))
+    return results_file
+
+
+def test_parse_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_coverity_warnings, 'warning_count', 1)
+    warnings = get_coverity_warnings.parse_json(create_results_file(tmp_path))
+
+    # Issues are converted lazily
+    assert not isinstance(warnings, list)
+    warnings = list(warnings)
+
+    # Every issue is converted, ranked by its impact
+    assert [(warning['id'], str(warning['file']), warning['line'], warning['query'], warning['priority'])
+            for warning in warnings] == [('coverity001', '/src/a.c', 10, 'CHECKED_RETURN', 'High'),
+                                         ('coverity002', '/src/b.c', 20, 'UNINIT', 'Med'),
+                                         ('coverity003', '/src/c.c', 30, 'DEADCODE', 'Low'),
+                                         ('coverity004', '/src/d.c', 40, 'MISSING_PROPERTIES', 'Low')]
+    assert warnings[0]['description'] == ['Description of CHECKED_RETURN']
+    assert warnings[3]['description'] == ['MISSING_PROPERTIES']
+
+    # Events become the code flow, except for caret lines
+    assert warnings[0]['code_flow'] == [translate_results.create_code_flow(
+        pathlib.Path('src/a.c'), 10, 'check_return: Calling "read" without checking the return value.')]
+    assert warnings[1]['code_flow'] == [translate_results.create_code_flow(pathlib.Path('src/a.c'), 18,
+                                                                           'var_decl: Declaring x')]
+    assert warnings[2]['code_flow'] == []
+
+
+def test_parse_warnings(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_coverity_warnings, 'warning_count', 1)
+    create_results_file(tmp_path)
+    tool_config_data = {'coverity_cc_threshold': '-1', 'coverity_json': True, 'raw_results_dir': tmp_path,
+                        'source_dir': tmp_path}
+    get_coverity_warnings.parse_warnings(tmp_path, tool_config_data)
+
+    # The findings are written out as they are parsed
+    warnings = translate_results.parse_scrub(tmp_path.joinpath('coverity_raw.scrub'), tmp_path)
+    assert [warning['id'] for warning in warnings] == ['coverity001', 'coverity002', 'coverity003', 'coverity004']
@@ -75,6 +75,10 @@ def test_parser(raw_file, capsys):
     assert output_file.exists()
     assert output_file.stat().st_size > 0
     output_file.unlink()
+    try:
+        output_file.with_suffix('.scrubbin').unlink()
+    except FileNotFoundError:
+        pass
 
 # Testcase | Class       | Description            | Expected Outcome   |
 # -------- + ----------- + ---------------------- + ------------------ |
@@ -0,0 +1,112 @@
+import io
+import json
+import pytest
+from scrub.utils import json_codec
+
+
+def test_loads():
+    value = {'text': 'é "quoted"', 'numbers': [1, -2, 3.5], 'empty': None, 'flag': True}
+    assert json_codec.loads(json.dumps(value)) == value
+    assert json_codec.loads(json.dumps(value).encode('utf-8')) == value
+
+
+def test_load(tmp_path):
+    value = {'issues': [{'checkerName': 'CHECKED_RETURN', 'text': 'é'}]}
+    input_file = tmp_path.joinpath('input.json')
+    input_file.write_text(json.dumps(value, ensure_ascii=False), encoding='utf-8')
+
+    with open(input_file, 'rb') as input_fh:
+        assert json_codec.load(input_fh) == value
+    with open(input_file, 'r', encoding='utf-8') as input_fh:
+        assert json_codec.load(input_fh) == value
+
+
+def test_dumps():
+    value = {'uri': 'src/file.c', 'text': 'é', 'numbers': [1, 2.5], 'empty': None}
+    assert json.loads(json_codec.dumps(value)) == value
+    assert ' ' not in json_codec.dumps([1, 2, {'a': 3}])
+
+    # Integers larger than 64 bits fall back to the standard library
+    assert json_codec.dumps([2 ** 70]) == '[{}]'.format(2 ** 70)
+
+    # Indented output does not depend on the backend
+    assert json_codec.dumps(value, indent=4) == json.dumps(value, indent=4)
+
+
+def test_dump():
+    output_fh = io.StringIO()
+    json_codec.dump({'a': [1, 2]}, output_fh)
+    assert json.loads(output_fh.getvalue()) == {'a': [1, 2]}
+
+
+def test_create_backend():
+    assert json_codec.create_backend('nonexistent_json_module') is None
+
+    backend_loads, backend_dumps = json_codec.create_backend('json')
+    assert backend_loads('{"a":[1]}') == {'a': [1]}
+    assert backend_dumps({'a': [1]}) == '{"a":[1]}'
+
+
+def test_find_backend(monkeypatch):
+    backend_name, backend = json_codec.find_backend()
+    assert backend_name == json_codec.BACKEND_NAME
+    assert backend_name in json_codec.BACKEND_NAMES
+
+    # The standard library is used when no other backend is installed
+    monkeypatch.setattr(json_codec, 'BACKEND_NAMES', ('nonexistent_json_module', 'json'))
+    backend_name, (backend_loads, backend_dumps) = json_codec.find_backend()
+    assert backend_name == 'json'
+    assert backend_loads(backend_dumps({'a': 'é'})) == {'a': 'é'}
+
+
+def test_dumps_fallback(monkeypatch):
+    def unsupported(value):
+        raise TypeError('Unsupported value')
+
+    # Values the backend can not encode are encoded by the standard library
+    monkeypatch.setattr(json_codec, 'backend_dumps', unsupported)
+    assert json_codec.dumps({'a': [1, 2]}) == '{"a":[1,2]}'
+
+
+def create_document(issue_count):
+    return {'type': 'Coverity issues', 'formatVersion': 8,
+            'desktopAnalysisSettings': {'note': 'not the "issues": [] array}'},
+            'issues': [{'checkerName': 'CHECKED_RETURN', 'mainEventLineNumber': i, 'text': 'é' * (i % 7),
+                        'events': [{'lineNumber': i + j} for j in range(i % 3)]} for i in range(issue_count)],
+            'error': None}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64, json_codec.STREAM_CHUNK_SIZE])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_iterate_array(chunk_size, indent):
+    document = create_document(50)
+    input_fh = io.StringIO(json.dumps(document, indent=indent, ensure_ascii=False))
+
+    # Items split across chunk boundaries are decoded whole
+    assert list(json_codec.iterate_array(input_fh, 'issues', chunk_size)) == document['issues']
+
+
+def test_iterate_array_numbers():
+    # Numbers that end at a chunk boundary may continue in the next chunk
+    input_fh = io.StringIO('{"issues": [12345, 6.75e2, -1, true, null, "x"]}')
+    assert list(json_codec.iterate_array(input_fh, 'issues', 3)) == [12345, 675.0, -1, True, None, 'x']
+
+
+def test_iterate_array_missing():
+    assert list(json_codec.iterate_array(io.StringIO('{}'), 'issues', 1)) == []
+    assert list(json_codec.iterate_array(io.StringIO('{"other": [1]}'), 'issues', 1)) == []
+    assert list(json_codec.iterate_array(io.StringIO(' { "issues" : [ ] } '), 'issues', 1)) == []
+
+
+@pytest.mark.parametrize('data', ['', '[1]', '{"issues": 5}', '{"issues": [1 2]}', '{"issues": [1, 2'])
+def test_iterate_array_invalid(data):
+    with pytest.raises(ValueError):
+        list(json_codec.iterate_array(io.StringIO(data), 'issues', 4))
+
+
+def test_load_array(tmp_path):
+    document = create_document(10)
+    input_file = tmp_path.joinpath('coverity.json')
+    input_file.write_text(json.dumps(document, ensure_ascii=False), encoding='utf-8')
+
+    assert list(json_codec.load_array(input_file, 'issues')) == document['issues']
@@ -0,0 +1,84 @@
+from scrub.utils import line_cache
+
+
+def test_index_lines():
+    assert list(line_cache.LineCache.index_lines(b'')) == [0]
+    assert list(line_cache.LineCache.index_lines(b'a\nbc\n')) == [0, 2, 5]
+    assert list(line_cache.LineCache.index_lines(b'a\nbc')) == [0, 2, 4]
+    assert list(line_cache.LineCache.index_lines(b'\n\n')) == [0, 1, 2]
+
+
+def test_get_lines(tmp_path):
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_bytes(b'first\nsecond\r\nthird')
+    cache = line_cache.LineCache()
+
+    assert cache.get_lines(source_file, 1, 3) == ['first\n', 'second\r\n', 'third']
+    assert cache.get_lines(source_file, 2, 2) == ['second\r\n']
+
+    # Ranges are clamped to the lines that exist
+    assert cache.get_lines(source_file, -5, 1) == ['first\n']
+    assert cache.get_lines(source_file, 3, 100) == ['third']
+    assert cache.get_lines(source_file, 4, 10) == []
+
+
+def test_get_line(tmp_path):
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_bytes(b'first\nsecond\n')
+    cache = line_cache.LineCache()
+
+    assert cache.get_line(source_file, 1) == 'first\n'
+    assert cache.get_line(source_file, 2) == 'second\n'
+    assert cache.get_line(source_file, 0) is None
+    assert cache.get_line(source_file, 3) is None
+
+
+def test_invalid_utf8(tmp_path):
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_bytes(b'ok\n\xff\xfebad\n')
+
+    assert line_cache.LineCache().get_line(source_file, 2) == 'bad\n'
+
+
+def test_file_read_once(tmp_path):
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_bytes(b'original\n')
+    cache = line_cache.LineCache()
+    assert cache.get_line(source_file, 1) == 'original\n'
+
+    # Cached contents are used until the cache is cleared
+    source_file.write_bytes(b'changed\n')
+    assert cache.get_line(source_file, 1) == 'original\n'
+    cache.clear()
+    assert cache.cached_bytes == 0
+    assert cache.get_line(source_file, 1) == 'changed\n'
+
+
+def test_eviction(tmp_path):
+    source_files = []
+    for i in range(3):
+        source_file = tmp_path.joinpath('file_{}.c'.format(i))
+        source_file.write_bytes(b'x' * 99 + b'\n')
+        source_files.append(source_file)
+
+    # Each entry is 100 bytes of data plus two 8 byte offsets
+    cache = line_cache.LineCache(byte_budget=250)
+    cache.get_file(source_files[0])
+    cache.get_file(source_files[1])
+    assert cache.cached_bytes == 232
+
+    # Using the first file makes the second file the least recently used
+    cache.get_file(source_files[0])
+    cache.get_file(source_files[2])
+    assert list(cache.entries) == [str(source_files[0]), str(source_files[2])]
+    assert cache.cached_bytes == 232
+
+
+def test_file_larger_than_budget(tmp_path):
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_bytes(b'x' * 1000 + b'\n')
+    cache = line_cache.LineCache(byte_budget=100)
+
+    assert cache.get_line(source_file, 1) == 'x' * 1000 + '\n'
+    assert not cache.entries
+    assert cache.cached_bytes == 0
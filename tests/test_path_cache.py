@@ -0,0 +1,77 @@
+import os
+from scrub.utils import path_cache
+
+
+def test_resolve_path(tmp_path):
+    path_cache.clear()
+    source_root = tmp_path.joinpath('src')
+    source_root.mkdir()
+    source_file = source_root.joinpath('file.c')
+    source_file.write_text('int x;\n')
+
+    # Absolute and relative paths resolve to the same canonical path
+    assert path_cache.resolve_path(str(source_file)) == source_file.resolve()
+    assert path_cache.resolve_path('file.c', source_root) == source_file.resolve()
+    assert path_cache.resolve_path('../src/./file.c', source_root) == source_file.resolve()
+
+
+def test_resolve_path_symlink(tmp_path):
+    path_cache.clear()
+    source_root = tmp_path.joinpath('src')
+    source_root.mkdir()
+    source_root.joinpath('file.c').write_text('int x;\n')
+    link_root = tmp_path.joinpath('link')
+    link_root.symlink_to(source_root)
+
+    assert path_cache.resolve_path(link_root.joinpath('file.c')) == source_root.resolve().joinpath('file.c')
+
+
+def test_working_dir_captured_once(tmp_path, monkeypatch):
+    path_cache.clear()
+    first_dir = tmp_path.joinpath('first')
+    second_dir = tmp_path.joinpath('second')
+    first_dir.mkdir()
+    second_dir.mkdir()
+
+    # Count the calls to getcwd
+    getcwd_calls = []
+    real_getcwd = os.getcwd
+
+    def counting_getcwd():
+        getcwd_calls.append(1)
+        return real_getcwd()
+
+    monkeypatch.chdir(first_dir)
+    monkeypatch.setattr(os, 'getcwd', counting_getcwd)
+    assert path_cache.resolve_path('a.c') == first_dir.resolve().joinpath('a.c')
+    assert path_cache.resolve_path('b.c') == first_dir.resolve().joinpath('b.c')
+    assert len(getcwd_calls) == 1
+
+    # The working directory is only read again after the cache is cleared
+    monkeypatch.chdir(second_dir)
+    assert path_cache.resolve_path('a.c') == first_dir.resolve().joinpath('a.c')
+    path_cache.clear()
+    assert path_cache.resolve_path('a.c') == second_dir.resolve().joinpath('a.c')
+    assert len(getcwd_calls) == 2
+
+
+def test_root_info(tmp_path):
+    path_cache.clear()
+    source_root = tmp_path.resolve()
+    inside_path = source_root.joinpath('src', 'file.c')
+    outside_path = source_root.parent.joinpath('other.c')
+
+    assert path_cache.get_root_info(inside_path, source_root) == (True, inside_path.relative_to(source_root))
+    assert path_cache.is_in_root(inside_path, source_root)
+    assert not path_cache.is_in_root(outside_path, source_root)
+    assert path_cache.get_relative_path(outside_path, source_root) == outside_path
+
+
+def test_clear(tmp_path):
+    path_cache.resolve_path('file.c', tmp_path)
+    path_cache.get_root_info(tmp_path.joinpath('file.c'), tmp_path)
+    path_cache.clear()
+
+    assert not path_cache.canonical_paths
+    assert not path_cache.root_paths
+    assert path_cache.working_dir is None
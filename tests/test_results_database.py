@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import pathlib
+from scrub.tools.parsers import translate_results
+from scrub.utils import results_database
+
+
+def create_results_file(analysis_dir, tool, warning_count, code_flow_steps=1):
+    warnings = []
+    for i in range(1, warning_count + 1):
+        code_flow = [translate_results.create_code_flow(pathlib.Path('src/{}.c'.format(i)), step + 1,
+                                                        '{}{} step {}'.format(tool, i, step))
+                     for step in range(code_flow_steps)]
+        warnings.append(translate_results.create_warning('{}{:03d}'.format(tool, i), pathlib.Path('src/{}.c'.format(i)),
+                                                         i, ['Description {}'.format(i)], tool,
+                                                         'High' if i % 2 else 'Low', 'rule{}'.format(i % 3),
+                                                         code_flow=code_flow,
+                                                         also_reported_by=['sonarqube'] if i == 1 else None))
+    translate_results.create_scrub_output_file(warnings, analysis_dir.joinpath(tool + '.scrub'))
+
+
+def create_metrics_file(analysis_dir, tool):
+    analysis_dir.joinpath(tool + '_metrics.csv').write_text('File,Tool,Lines,Comments\n'
+                                                            'Project,{0},100,10\n'
+                                                            'src/1.c,{0},40,4\n'.format(tool))
+
+
+def count_rows(database_file, table, source):
+    connection = sqlite3.connect(str(database_file))
+    try:
+        return connection.execute('SELECT COUNT(*) FROM {} WHERE source = ?'.format(table), (source,)).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_update_and_query(tmp_path):
+    source_root = tmp_path.resolve()
+    analysis_dir = source_root.joinpath('.scrub')
+    analysis_dir.mkdir()
+    database_file = analysis_dir.joinpath('results.db')
+    create_results_file(analysis_dir, 'gcc', 5, 2)
+    create_results_file(analysis_dir, 'codeql', 3)
+    create_metrics_file(analysis_dir, 'codeql')
+
+    assert not results_database.is_current(database_file, analysis_dir)
+    results_database.update_results_database(database_file, analysis_dir, source_root)
+    assert results_database.is_current(database_file, analysis_dir)
+
+    # Query every finding
+    all_findings = results_database.query_findings(database_file, source_root)
+    assert len(all_findings) == 8
+    assert all(len(warning['code_flow']) == 2 for warning in all_findings if warning['tool'] == 'gcc')
+    assert [warning['id'] for warning in all_findings if warning['also_reported_by'] == ['sonarqube']] == \
+        ['codeql001', 'gcc001']
+
+    # A sparse selection only gets its own code flows
+    selected = results_database.query_findings(database_file, source_root, sources=['gcc'], rules=['rule1'])
+    assert [warning['id'] for warning in selected] == ['gcc001', 'gcc004']
+    assert [flow['description'] for flow in selected[0]['code_flow']] == ['gcc1 step 0', 'gcc1 step 1']
+    assert [flow['description'] for flow in selected[1]['code_flow']] == ['gcc4 step 0', 'gcc4 step 1']
+
+    # Select by file
+    selected = results_database.query_findings(database_file, source_root,
+                                               files=[source_root.joinpath('src/2.c')], priorities=['Low'])
+    assert [warning['id'] for warning in selected] == ['codeql002', 'gcc002']
+    assert selected[1]['file'] == source_root.joinpath('src/2.c')
+
+    # Query the metrics
+    metrics = results_database.query_metrics(database_file, source_root, 'codeql')
+    assert metrics['project'] == {'Lines': 100.0, 'Comments': 10.0}
+    assert metrics[str(source_root.joinpath('src/1.c'))] == {'Comments': 4.0}
+
+
+def test_incremental_update(tmp_path):
+    source_root = tmp_path.resolve()
+    analysis_dir = source_root.joinpath('.scrub')
+    analysis_dir.mkdir()
+    database_file = analysis_dir.joinpath('results.db')
+    create_results_file(analysis_dir, 'gcc', 5)
+    create_results_file(analysis_dir, 'codeql', 3)
+    results_database.update_results_database(database_file, analysis_dir, source_root)
+
+    # Mark the unchanged file, so it can be seen that it was not rebuilt
+    connection = sqlite3.connect(str(database_file))
+    with connection:
+        connection.execute("UPDATE findings SET description = 'unchanged' WHERE source = 'codeql'")
+    connection.close()
+
+    # Change one file, and make sure the edit is detected even if the modification time does not change
+    gcc_file = analysis_dir.joinpath('gcc.scrub')
+    original_mtime = gcc_file.stat().st_mtime_ns
+    create_results_file(analysis_dir, 'gcc', 2)
+    os.utime(gcc_file, ns=(original_mtime, original_mtime))
+    assert not results_database.is_current(database_file, analysis_dir)
+    results_database.update_results_database(database_file, analysis_dir, source_root)
+
+    assert count_rows(database_file, 'findings', 'gcc') == 2
+    assert all(warning['description'] == ['unchanged']
+               for warning in results_database.query_findings(database_file, source_root, sources=['codeql']))
+
+    # Remove a file
+    analysis_dir.joinpath('codeql.scrub').unlink()
+    results_database.update_results_database(database_file, analysis_dir, source_root)
+    assert count_rows(database_file, 'findings', 'codeql') == 0
+    assert results_database.is_current(database_file, analysis_dir)
+
+
+def test_outdated_database_is_replaced(tmp_path):
+    source_root = tmp_path.resolve()
+    analysis_dir = source_root.joinpath('.scrub')
+    analysis_dir.mkdir()
+    database_file = analysis_dir.joinpath('results.db')
+    database_file.write_bytes(b'not a database')
+    create_results_file(analysis_dir, 'gcc', 1)
+
+    assert not results_database.is_current(database_file, analysis_dir)
+    results_database.update_results_database(database_file, analysis_dir, source_root)
+    assert results_database.is_current(database_file, analysis_dir)
+    assert len(results_database.query_findings(database_file, source_root)) == 1
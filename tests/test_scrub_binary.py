@@ -0,0 +1,105 @@
+import os
+import pathlib
+import pytest
+from scrub.tools.parsers import scrub_binary
+from scrub.tools.parsers import translate_results
+
+
+def create_warnings():
+    code_flow = [translate_results.create_code_flow(pathlib.Path('a.c'), 3, 'var_decl: Declaring x'),
+                 translate_results.create_code_flow(pathlib.Path('b.c'), '7', 'use: Using x')]
+    return [translate_results.create_warning('gcc001', pathlib.Path('a.c'), 5, ['Line one', '  Line two  '], 'gcc',
+                                             'Low', 'unused-variable'),
+            translate_results.create_warning('gcc002', pathlib.Path('b.c'), '12', ['Unicode é中'], 'gcc',
+                                             'High', ' shadow ', code_flow=code_flow,
+                                             also_reported_by=['codeql', 'sonarqube']),
+            translate_results.create_warning('gcc003', pathlib.Path('c.c'), 1, ['Suppressed'], 'gcc', 'Low', 'x',
+                                             suppress=True)]
+
+
+def test_create_records():
+    records = scrub_binary.create_records(create_warnings())
+
+    assert len(records) == 2
+    assert records[0] == ('gcc001', 'a.c', 5, 'gcc', 'Low', 'unused-variable', ('Line one', 'Line two'), (), ())
+    assert records[1][2] == 12
+    assert records[1][5] == 'shadow'
+    assert records[1][7] == (('a.c', 3, 'var_decl: Declaring x'), ('b.c', 7, 'use: Using x'))
+    assert records[1][8] == ('codeql', 'sonarqube')
+
+
+def test_round_trip(tmp_path):
+    records = scrub_binary.create_records(create_warnings())
+    binary_file = tmp_path.joinpath('gcc.scrubbin')
+    scrub_binary.write_binary_file(records, binary_file, (123, 456))
+
+    assert scrub_binary.read_binary_file(binary_file) == records
+    assert scrub_binary.read_source_signature(binary_file) == (123, 456)
+
+
+def test_round_trip_empty(tmp_path):
+    binary_file = tmp_path.joinpath('empty.scrubbin')
+    scrub_binary.write_binary_file([], binary_file, (0, 0))
+
+    assert scrub_binary.read_binary_file(binary_file) == []
+
+
+def test_unsupported_format(tmp_path):
+    binary_file = tmp_path.joinpath('bad.scrubbin')
+    binary_file.write_bytes(b'NOTSCRUB' + bytes(20))
+
+    with pytest.raises(scrub_binary.BinaryFormatError):
+        scrub_binary.read_binary_file(binary_file)
+    assert scrub_binary.read_source_signature(binary_file) is None
+    assert scrub_binary.read_source_signature(tmp_path.joinpath('missing.scrubbin')) is None
+
+
+def test_is_current(tmp_path):
+    scrub_file = tmp_path.joinpath('gcc.scrub')
+    scrub_file.write_text('original')
+    binary_file = scrub_binary.get_binary_file(scrub_file)
+    scrub_binary.write_binary_file([], binary_file, scrub_binary.get_source_signature(scrub_file))
+
+    assert binary_file == tmp_path.joinpath('gcc.scrubbin')
+    assert scrub_binary.is_current(scrub_file, binary_file)
+
+    # An edit within the same timestamp tick is detected by the change in size
+    original_mtime = scrub_file.stat().st_mtime_ns
+    scrub_file.write_text('edited contents')
+    os.utime(scrub_file, ns=(original_mtime, original_mtime))
+    assert not scrub_binary.is_current(scrub_file, binary_file)
+
+    # A newer binary file is not current if the source signature does not match
+    os.utime(binary_file, ns=(original_mtime + 10 ** 9, original_mtime + 10 ** 9))
+    assert not scrub_binary.is_current(scrub_file, binary_file)
+
+    # A missing SCRUB file is never current
+    assert not scrub_binary.is_current(tmp_path.joinpath('missing.scrub'), binary_file)
+
+
+def test_create_scrub_output_file_creates_binary(tmp_path):
+    source_root = tmp_path.resolve()
+    scrub_file = source_root.joinpath('gcc.scrub')
+    binary_file = scrub_binary.get_binary_file(scrub_file)
+    translate_results.create_scrub_output_file(create_warnings(), scrub_file)
+    translate_results.clear_results_cache()
+
+    # Writing the text file also creates the binary file
+    assert scrub_file.exists()
+    assert scrub_binary.is_current(scrub_file, binary_file)
+
+    # The binary file is preferred to the text file
+    binary_warnings = translate_results.parse_scrub(scrub_file, source_root)
+    assert binary_warnings[1]['also_reported_by'] == ['codeql', 'sonarqube']
+    assert binary_warnings[1]['description'] == ['Unicode é中']
+
+    # The binary file contains the same warnings as the text file
+    assert list(translate_results.iterate_scrub(scrub_file, source_root)) == binary_warnings
+
+    # Edits made in the same timestamp tick are respected
+    original_mtime = scrub_file.stat().st_mtime_ns
+    scrub_file.write_text(scrub_file.read_text().split('\n\n')[0] + '\n\n')
+    os.utime(scrub_file, ns=(original_mtime, original_mtime))
+    translate_results.clear_results_cache()
+    assert [warning['id'] for warning in translate_results.parse_scrub(scrub_file, source_root)] == ['gcc001']
+    assert binary_file.exists()
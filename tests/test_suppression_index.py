@@ -0,0 +1,114 @@
+import json
+from scrub.utils import path_cache
+from scrub.utils.filtering import filter_results
+from scrub.utils.filtering import suppression_index
+
+
+def test_scan_data():
+    data = (b'int a;\n'
+            b'int b; // scrub_ignore_warning gcc\n'
+            b'int c; /* @suppress coverity */\n'
+            b'int d; // SCRUB_IGNORE_BEGIN codeql\n'
+            b'int e;\n'
+            b'// scrub_ignore_end\n')
+
+    suppressed_lines, suppressed_regions = suppression_index.scan_data(data)
+    assert suppressed_lines == {2: 'int b; // scrub_ignore_warning gcc', 3: 'int c; /* @suppress coverity */'}
+    assert suppressed_regions == [[4, 6, 'int d; // scrub_ignore_begin codeql']]
+
+
+def test_find_regions():
+    region_index = suppression_index.create_region_index([[3, 5, 'a'], [10, 12, 'b']])
+
+    assert suppression_index.find_regions(region_index, 1) == ()
+    assert suppression_index.find_regions(region_index, 3) == ('a',)
+    assert suppression_index.find_regions(region_index, 5) == ('a',)
+    assert suppression_index.find_regions(region_index, 6) == ()
+    assert suppression_index.find_regions(region_index, 12) == ('b',)
+    assert suppression_index.find_regions(region_index, 13) == ()
+
+
+def test_create_suppression_index(tmp_path):
+    path_cache.clear()
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_text('int a; // scrub_ignore_warning gcc\n')
+    index_file = tmp_path.joinpath('suppression_index.json')
+
+    index = suppression_index.create_suppression_index([source_file], index_file)
+    assert index[str(source_file.resolve())]['lines'] == {1: 'int a; // scrub_ignore_warning gcc'}
+
+    # Unchanged files are reused from the persistent index
+    with open(index_file, 'r') as input_fh:
+        stored_index = json.load(input_fh)
+    stored_index[str(source_file.resolve())]['lines'] = {'1': 'reused'}
+    with open(index_file, 'w') as output_fh:
+        json.dump(stored_index, output_fh)
+    index = suppression_index.create_suppression_index([source_file], index_file)
+    assert index[str(source_file.resolve())]['lines'] == {1: 'reused'}
+
+
+def test_symlinked_source_root(tmp_path):
+    path_cache.clear()
+    real_root = tmp_path.joinpath('real')
+    real_root.mkdir()
+    real_root.joinpath('file.c').write_text('int a;\nint b; // scrub_ignore_warning gcc\n')
+    link_root = tmp_path.joinpath('link')
+    link_root.symlink_to(real_root)
+
+    # The index is created from the linked root, while warnings use canonical paths
+    index = suppression_index.create_suppression_index([link_root.joinpath('file.c')],
+                                                       tmp_path.joinpath('suppression_index.json'))
+    warning_file = path_cache.resolve_path(link_root.joinpath('file.c'))
+    index_size = len(index)
+    assert filter_results.micro_filter_check(warning_file, 2, ['gcc'], index)
+    assert not filter_results.micro_filter_check(warning_file, 1, ['gcc'], index)
+    assert len(index) == index_size
+
+
+def test_nested_regions(tmp_path):
+    path_cache.clear()
+    source_file = tmp_path.joinpath('file.c')
+    source_file.write_text('int a;\n'
+                           '// SCRUB_IGNORE_BEGIN cmp\n'
+                           'int b;\n'
+                           '// SCRUB_IGNORE_BEGIN codeql Generated parser tables\n'
+                           'int c;\n'
+                           '// SCRUB_IGNORE_END\n'
+                           'int d;\n'
+                           '// SCRUB_IGNORE_END\n'
+                           'int e;\n')
+
+    # Each end closes the most recent begin
+    suppressed_lines, suppressed_regions = suppression_index.scan_file(source_file)
+    assert suppressed_lines == {}
+    assert sorted(suppressed_regions) == [[2, 8, '// scrub_ignore_begin cmp'],
+                                          [4, 6, '// scrub_ignore_begin codeql generated parser tables']]
+
+    # The inner region only applies to CodeQL, the outer region only applies to the compilers
+    codeql_types = filter_results.filtering_aliases['codeql']
+    gcc_types = filter_results.filtering_aliases['gcc']
+    assert [filter_results.micro_filter_check(source_file, line, codeql_types) for line in range(1, 10)] == \
+        [False, False, False, True, True, True, False, False, False]
+    assert [filter_results.micro_filter_check(source_file, line, gcc_types) for line in range(1, 10)] == \
+        [False, True, True, True, True, True, True, True, False]
+
+
+def test_unclosed_regions():
+    data = (b'// scrub_ignore_end\n'
+            b'int a;\n'
+            b'// SCRUB_IGNORE_BEGIN codeql\n'
+            b'int b;\n'
+            b'// SCRUB_IGNORE_BEGIN cmp\n'
+            b'int c;')
+
+    # Unmatched ends are ignored and unclosed regions continue to the end of the file
+    suppressed_lines, suppressed_regions = suppression_index.scan_data(data)
+    assert suppressed_lines == {}
+    assert sorted(suppressed_regions) == [[3, 6, '// scrub_ignore_begin codeql'], [5, 6, '// scrub_ignore_begin cmp']]
+
+    region_index = suppression_index.create_region_index(suppressed_regions)
+    assert suppression_index.find_regions(region_index, 2) == ()
+    assert suppression_index.find_regions(region_index, 4) == ('// scrub_ignore_begin codeql',)
+    assert set(suppression_index.find_regions(region_index, 6)) == {'// scrub_ignore_begin codeql',
+                                                                   '// scrub_ignore_begin cmp'}
+    assert suppression_index.find_regions(region_index, 7) == ()
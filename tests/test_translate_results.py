@@ -0,0 +1,164 @@
+import os
+import gzip
+import json
+import pytest
+import pathlib
+import concurrent.futures
+from scrub.tools.parsers import translate_results
+from scrub.utils import path_cache
+
+
+def create_result(uri, line, base_id=None):
+    artifact_location = {'uri': uri}
+    if base_id:
+        artifact_location['uriBaseId'] = base_id
+    return {'ruleId': 'rule', 'message': {'text': 'Message {}'.format(line)},
+            'locations': [{'physicalLocation': {'artifactLocation': artifact_location, 'region': {'startLine': line}}}]}
+
+
+def create_multi_run_file(tmp_path):
+    source_root = tmp_path.resolve()
+    sarif_runs = [{'tool': {'driver': {'name': 'CodeQL'}},
+                   'results': [create_result('a.c', 1), create_result('b.c', 2)]},
+                  {'tool': {'driver': {'name': 'CodeSonar'}},
+                   'originalUriBaseIds': {'SRCROOT0': {'uri': 'file://' + str(source_root.joinpath('src'))}},
+                   'results': [create_result('c.c', 3, 'SRCROOT0')]},
+                  {'tool': {'driver': {'name': 'Other'}}, 'results': []},
+                  {'tool': {'driver': {'name': 'CodeQL'}}, 'results': [create_result('d.c', 4)]}]
+    sarif_file = source_root.joinpath('merged.sarif')
+    sarif_file.write_text(json.dumps({'version': '2.1.0', 'runs': sarif_runs}))
+    path_cache.clear()
+    return sarif_file, source_root
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_parse_sarif_runs(tmp_path, monkeypatch, max_workers):
+    sarif_file, source_root = create_multi_run_file(tmp_path)
+    pool_sizes = []
+
+    class RecordingExecutor(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, max_workers):
+            pool_sizes.append(max_workers)
+            super().__init__(max_workers)
+
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', RecordingExecutor)
+    warnings = translate_results.parse_sarif(sarif_file, source_root, max_workers)
+
+    # Only the requested pool is started, with one worker for each share of the runs
+    assert pool_sizes == ([] if max_workers == 1 else [2])
+
+    # Every run uses its own driver name and base URIs
+    assert [(warning['id'], warning['tool'], warning['file'], warning['line']) for warning in warnings] == \
+        [('codeql001', 'codeql', source_root.joinpath('a.c'), 1),
+         ('codeql002', 'codeql', source_root.joinpath('b.c'), 2),
+         ('codesonar001', 'codesonar', source_root.joinpath('src/c.c'), 3),
+         ('codeql003', 'codeql', source_root.joinpath('d.c'), 4)]
+
+
+def test_parse_sarif_no_runs(tmp_path):
+    sarif_file = tmp_path.joinpath('empty.sarif')
+    sarif_file.write_text(json.dumps({'version': '2.1.0', 'runs': []}))
+
+    with pytest.raises(Exception):
+        translate_results.parse_sarif(sarif_file, tmp_path)
+
+
+def test_iterate_results(tmp_path):
+    source_root = tmp_path.resolve()
+    scrub_file = source_root.joinpath('gcc.scrub')
+    warnings = [translate_results.create_warning('gcc{:03d}'.format(i), source_root.joinpath('a.c'), i, ['Unused'],
+                                                 'gcc', 'Low', '-Wunused',
+                                                 code_flow=[translate_results.create_code_flow('a.c', i, 'step')])
+                for i in range(1, 4)]
+    translate_results.create_scrub_output_file(iter(warnings), scrub_file)
+
+    # Warnings are read lazily from memory, then from the binary file, then from the text file
+    cached_warnings = translate_results.iterate_results(scrub_file, source_root)
+    assert next(cached_warnings)['id'] == 'gcc001'
+    assert [warning['id'] for warning in cached_warnings] == ['gcc002', 'gcc003']
+    translate_results.clear_results_cache()
+    binary_warnings = list(translate_results.iterate_results(scrub_file, source_root))
+    scrub_file.with_suffix('.scrubbin').unlink()
+    text_warnings = list(translate_results.iterate_results(scrub_file, source_root))
+    assert binary_warnings == text_warnings == translate_results.parse_scrub(scrub_file, source_root)
+    assert text_warnings[2]['code_flow'] == [translate_results.create_code_flow(pathlib.Path('a.c'), 3, 'step')]
+
+
+def test_clear_results_cache(tmp_path):
+    raw_dir = tmp_path.resolve().joinpath('raw_results')
+    raw_dir.mkdir()
+    raw_file = raw_dir.joinpath('gcc_raw.scrub')
+    filtered_file = tmp_path.resolve().joinpath('gcc.scrub')
+    for scrub_file in (raw_file, filtered_file):
+        translate_results.create_scrub_output_file([], scrub_file)
+
+    # Only the results in the directory that is kept remain in memory
+    translate_results.clear_results_cache(raw_dir)
+    assert list(translate_results.results_cache) == [raw_file]
+
+    # Results are removed once they are no longer needed
+    translate_results.discard_results([raw_file])
+    assert translate_results.results_cache == {}
+
+
+def read_sarif_file(sarif_file):
+    if sarif_file.suffix == '.gz':
+        with gzip.open(sarif_file, 'rt', encoding='utf-8') as input_fh:
+            return json.loads(input_fh.read())
+    return json.loads(sarif_file.read_text())
+
+
+@pytest.mark.parametrize('output_format', translate_results.SARIF_OUTPUT_FORMATS)
+def test_write_sarif_file(tmp_path, output_format):
+    run_headers = [{'tool': {'driver': {'name': 'gcc', 'rules': []}}, 'artifacts': []},
+                   {'tool': {'driver': {'name': 'codeql', 'rules': [{'id': 'rule'}]}}, 'artifacts': [{'a': 'b'}]}]
+    run_results = [[], [{'ruleId': 'rule', 'message': {'text': 'Line\none'}}, {'ruleId': 'rule'}]]
+
+    # Documents without runs, with empty runs, and with several runs are all valid
+    for run_count in range(3):
+        sarif_file = translate_results.get_sarif_output_path(tmp_path.joinpath('{}.sarif'.format(run_count)),
+                                                             output_format)
+        translate_results.write_sarif_file(sarif_file, '2.1.0', zip(run_headers[:run_count],
+                                                                    (iter(results) for results in run_results)),
+                                           output_format)
+        assert read_sarif_file(sarif_file) == {
+            'version': '2.1.0',
+            '$schema': translate_results.SARIF_SCHEMA,
+            'runs': [dict(run_header, results=results)
+                     for run_header, results in zip(run_headers[:run_count], run_results)]
+        }
+        assert (sarif_file.suffix == '.gz') == (output_format == 'gzip')
+        if output_format != 'gzip':
+            assert (len(sarif_file.read_text().splitlines()) > 1) == (output_format == 'pretty')
+
+
+@pytest.mark.parametrize('output_format', translate_results.SARIF_OUTPUT_FORMATS)
+def test_create_merged_sarif_output_file(tmp_path, output_format):
+    source_root = tmp_path.resolve()
+    gcc_warnings = [translate_results.create_warning('gcc001', pathlib.Path('a.c'), 1, ['Unused'], 'gcc',
+                                                     'Low', '-Wunused'),
+                    translate_results.create_warning('gcc002', pathlib.Path('b.c'), 2, ['Unused'], 'gcc',
+                                                     'Low', '-Wunused')]
+    code_flow = [translate_results.create_code_flow(pathlib.Path('c.c'), 4, 'a'),
+                 translate_results.create_code_flow(pathlib.Path('b.c'), 3, 'b')]
+    codeql_warnings = [translate_results.create_warning('codeql001', pathlib.Path('b.c'), 3, ['Overflow'],
+                                                        'codeql', 'Low', 'cpp/overflow', code_flow=code_flow),
+                       translate_results.create_warning('codeql002', pathlib.Path('a.c'), 5, ['Unused'],
+                                                        'codeql', 'Low', 'cpp/unused')]
+    sarif_file = translate_results.get_sarif_output_path(source_root.joinpath('merged.sarif'), output_format)
+    path_cache.clear()
+    translate_results.create_merged_sarif_output_file([('gcc', gcc_warnings), ('codeql', codeql_warnings)],
+                                                      sarif_file, source_root, output_format)
+
+    # Every run has its own rules and artifacts tables, and its results reference them by index
+    sarif_runs = read_sarif_file(sarif_file)['runs']
+    assert [run['tool']['driver']['name'] for run in sarif_runs] == ['gcc', 'codeql']
+    assert [[rule['id'] for rule in run['tool']['driver']['rules']] for run in sarif_runs] == \
+        [['-Wunused'], ['cpp/overflow', 'cpp/unused']]
+    assert [[artifact['location']['uri'] for artifact in run['artifacts']] for run in sarif_runs] == \
+        [['a.c', 'b.c'], ['b.c', 'c.c', 'a.c']]
+    assert [[(result['ruleIndex'], result['locations'][0]['physicalLocation']['artifactLocation']['index'])
+             for result in run['results']] for run in sarif_runs] == [[(0, 0), (0, 1)], [(0, 0), (1, 2)]]
+    assert [location['location']['physicalLocation']['artifactLocation']['index']
+            for location in sarif_runs[1]['results'][0]['codeFlows'][0]['threadFlows'][0]['locations']] == [1, 0]
@@ -0,0 +1,90 @@
+import os
+import pytest
+import pathlib
+from scrub.tools.parsers import translate_results
+
+
+def create_sarif_file(source_root, tool, warning_count):
+    warnings = [translate_results.create_warning('{}{:03d}'.format(tool, i), pathlib.Path('src/{}.c'.format(i)), i,
+                                                 ['Description {}'.format(i)], tool, 'Low', 'rule{}'.format(i))
+                for i in range(1, warning_count + 1)]
+    sarif_file = source_root.joinpath(tool + '.sarif')
+    translate_results.create_sarif_output_file(warnings, '2.1.0', sarif_file, source_root, tool)
+    return sarif_file
+
+
+def test_upload_cache(tmp_path, monkeypatch):
+    source_root = tmp_path.resolve()
+    cache_dir = source_root.joinpath('cache')
+    cache_dir.mkdir()
+    sarif_file = create_sarif_file(source_root, 'codeql', 3)
+    output_file = source_root.joinpath('output.sarif')
+
+    # Entries for other files and formats are never removed
+    other_entries = [cache_dir.joinpath('codesonar.gcc.0.sarif'), cache_dir.joinpath('sonarqube.codeql.0.sarif')]
+    for other_entry in other_entries:
+        other_entry.write_text('{}')
+
+    # The first import creates the cache entry
+    assert not translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'codesonar',
+                                                                cache_dir)
+    cache_file = translate_results.get_upload_cache_file(sarif_file, source_root, 'codesonar', cache_dir)
+    assert cache_file.read_text() == output_file.read_text()
+    original_output = output_file.read_text()
+    assert 'External-Codeql rule1' in original_output
+
+    # An unchanged file is copied from the cache, without being parsed
+    def format_sarif_for_upload(input_file, output_file, source_root, upload_format):
+        raise AssertionError(input_file)
+
+    output_file.unlink()
+    with monkeypatch.context() as patch:
+        patch.setattr(translate_results, 'format_sarif_for_upload', format_sarif_for_upload)
+        assert translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'codesonar',
+                                                                cache_dir)
+    assert output_file.read_text() == original_output
+
+    # The cache key depends on the contents of the file, the source root, and the format
+    assert translate_results.get_upload_cache_file(sarif_file, source_root.joinpath('src'), 'codesonar',
+                                                   cache_dir) != cache_file
+    assert translate_results.get_upload_cache_file(sarif_file, source_root, 'sonarqube', cache_dir) != cache_file
+    create_sarif_file(source_root, 'codeql', 2)
+    new_cache_file = translate_results.get_upload_cache_file(sarif_file, source_root, 'codesonar', cache_dir)
+    assert new_cache_file != cache_file
+
+    # A changed file is parsed again, and replaces the previous entry
+    assert not translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'codesonar',
+                                                                cache_dir)
+    assert output_file.read_text() != original_output
+    assert sorted(cache_dir.iterdir()) == sorted(other_entries + [new_cache_file])
+
+
+def test_upload_cache_failure(tmp_path, monkeypatch):
+    source_root = tmp_path.resolve()
+    cache_dir = source_root.joinpath('cache')
+    cache_dir.mkdir()
+    sarif_file = create_sarif_file(source_root, 'codeql', 3)
+    output_file = source_root.joinpath('output.sarif')
+
+    # A failed import leaves nothing behind
+    def replace(source_file, destination_file):
+        raise OSError(destination_file)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, 'replace', replace)
+        with pytest.raises(OSError):
+            translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'codesonar',
+                                                             cache_dir)
+    assert list(cache_dir.iterdir()) == []
+    assert not output_file.exists()
+
+    # Formats that are not supported do not create a cache entry
+    assert not translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'other',
+                                                                cache_dir)
+    assert list(cache_dir.iterdir()) == []
+
+    # The next import succeeds
+    assert not translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'codesonar',
+                                                                cache_dir)
+    assert translate_results.format_sarif_for_upload_cached(sarif_file, output_file, source_root, 'codesonar',
+                                                            cache_dir)
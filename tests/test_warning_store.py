@@ -0,0 +1,62 @@
+import pathlib
+from scrub.tools.parsers import translate_results
+from scrub.utils.filtering import warning_store
+
+
+def create_warnings():
+    return [translate_results.create_warning('gcc001', pathlib.Path('/src/a.c'), 1, ['a'], 'gcc', 'Low', 'unused'),
+            translate_results.create_warning('gcc002', pathlib.Path('/src/b.c'), 2, ['b'], 'gcc', 'Med', 'unused'),
+            translate_results.create_warning('gcc003', pathlib.Path('/src/a.c'), 3, ['c'], 'gcc', 'High', 'shadow'),
+            translate_results.create_warning('codeql001', pathlib.Path('/src/a.c'), 4, ['d'], 'codeql', 'Low',
+                                             'unused')]
+
+
+def test_intern_column():
+    value_table, value_ids = warning_store.intern_column(['b', 'a', 'b', 'c', 'a'])
+
+    assert value_table == ['b', 'a', 'c']
+    assert list(value_ids) == [0, 1, 0, 2, 1]
+
+
+def test_create_warning_store():
+    store = warning_store.create_warning_store(create_warnings())
+
+    assert store['size'] == 4
+    assert store['file_table'] == [pathlib.Path('/src/a.c'), pathlib.Path('/src/b.c')]
+    assert list(store['file_ids']) == [0, 1, 0, 0]
+    assert store['query_table'] == [('gcc', 'unused'), ('gcc', 'shadow'), ('codeql', 'unused')]
+    assert list(store['query_ids']) == [0, 0, 1, 2]
+    assert list(store['lines']) == [1, 2, 3, 4]
+
+
+def test_create_warning_store_empty():
+    store = warning_store.create_warning_store([])
+
+    assert store['size'] == 0
+    assert warning_store.count_mask(warning_store.create_mask(store['size'])) == 0
+
+
+def test_evaluate_table_calls_predicate_once_per_value():
+    store = warning_store.create_warning_store(create_warnings())
+    checked_values = []
+
+    def predicate(value):
+        checked_values.append(value)
+        return value.name == 'a.c'
+
+    mask = warning_store.evaluate_table(store['file_table'], store['file_ids'], predicate)
+
+    assert mask == b'\x01\x00\x01\x01'
+    assert len(checked_values) == 2
+
+
+def test_combine_and_select():
+    first_mask = warning_store.create_mask(4)
+    second_mask = b'\x00\x01\x00\x01'
+    combined_mask = warning_store.combine_masks(first_mask, second_mask)
+
+    assert combined_mask == second_mask
+    assert warning_store.combine_masks(b'\x01\x01\x00\x00', second_mask) == b'\x00\x01\x00\x00'
+    assert warning_store.count_mask(combined_mask) == 2
+    assert warning_store.select_rows(['a', 'b', 'c', 'd'], combined_mask) == ['b', 'd']
+    assert warning_store.create_mask(3, False) == b'\x00\x00\x00'